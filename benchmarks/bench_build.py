@@ -0,0 +1,162 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+End to end benchmark: generates sites of a few scales and times Synamic.load(), Sites.build() and the key queries.
+Every scale runs in a fresh process. Results are appended to benchmarks/results/build.jsonl and compared with the
+previous result of the same scale.
+
+    python benchmarks/bench_build.py --scales 1000 10000 100000
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_PATH = os.path.join(BENCHMARKS_DIR, 'results', 'build.jsonl')
+
+QUERIES = (
+    'type == post :sortby created_on desc',
+    'tags contains Tag 3 :sortby created_on desc',
+    'categories contains Category 1 & type == post',
+    'title != Home :sortby title',
+)
+
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_one(site_root, workers, query_repeat):
+    """Runs in a child process - returns the timings of one generated site"""
+    sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+    from synamic.core.synamic import Synamic
+
+    timings = {}
+    synamic = Synamic(site_root)
+    timings['load'], _ = _timed(synamic.load)
+
+    root_site = synamic.sites.root_site
+    for query in QUERIES:
+        query_timings = []
+        for _ in range(query_repeat):
+            query_time, _ = _timed(root_site.object_manager.query_cfields, query)
+            query_timings.append(query_time)
+        timings[f'query: {query}'] = statistics.median(query_timings)
+
+    timings['build'], succeeded = _timed(synamic.sites.build, workers=workers)
+    if not succeeded:
+        raise Exception('Build failed')
+    # the first incremental build writes the manifest, the second one has nothing to do.
+    synamic.sites.build(workers=workers, incremental=True)
+    timings['build: incremental, nothing changed'], _ = _timed(
+        synamic.sites.build, workers=workers, incremental=True
+    )
+    return {'timings': timings, 'peak_rss_kb': _peak_rss_kb()}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stderr=subprocess.DEVNULL
+        ).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_results():
+    previous = {}
+    if os.path.exists(RESULTS_PATH):
+        with open(RESULTS_PATH, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    result = json.loads(line)
+                    previous[result['scale']] = result
+    return previous
+
+
+def _print_comparison(result, previous):
+    print(f'Scale {result["scale"]} posts, peak rss {result["peak_rss_kb"]} KB')
+    if previous is None:
+        print(f'    no previous result of this scale in {RESULTS_PATH}')
+    for name, seconds in result['timings'].items():
+        line = f'    {seconds:>10.4f}s  {name}'
+        if previous is not None and name in previous['timings'] and previous['timings'][name] > 0:
+            change = (seconds - previous['timings'][name]) / previous['timings'][name] * 100
+            line += f'  ({change:+.1f}% from {previous["commit"]})'
+        print(line)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='End to end build benchmark of synamic.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000], help='Number of posts')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--query-repeat', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help='Keep the generated sites')
+    parser.add_argument('--no-record', action='store_true', help='Do not append the results to the results file')
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.run_one is not None:
+        print(json.dumps(run_one(args.run_one, args.workers, args.query_repeat)))
+        return
+
+    from site_generator import generate_site
+    previous_results = _previous_results()
+    for scale in args.scales:
+        site_root = tempfile.mkdtemp(prefix=f'synamic-bench-{scale}-')
+        try:
+            generate_site(site_root, posts=scale)
+            cmd = [sys.executable, os.path.abspath(__file__), '--run-one', site_root,
+                   '--query-repeat', str(args.query_repeat)]
+            if args.workers is not None:
+                cmd.extend(['--workers', str(args.workers)])
+            output = subprocess.check_output(cmd, cwd=BENCHMARKS_DIR).decode('utf-8')
+            result = json.loads(output.strip().splitlines()[-1])
+        finally:
+            if args.keep:
+                print(f'Generated site kept at {site_root}')
+            else:
+                shutil.rmtree(site_root, ignore_errors=True)
+
+        result.update({
+            'scale': scale,
+            'workers': args.workers,
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        _print_comparison(result, previous_results.get(scale, None))
+        if not args.no_record:
+            os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+            with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result, sort_keys=True) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Import time benchmark: imports synamic in fresh interpreters with `python -X importtime` and reports
+the total, the slowest imports and the heavy dependencies that got imported. Results are appended to
+benchmarks/results/import.jsonl and compared with the previous result of the same module.
+
+    python benchmarks/bench_import.py [--module synamic] [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_PATH = os.path.join(BENCHMARKS_DIR, 'results', 'import.jsonl')
+
+# must only be imported when they are used - not by importing synamic. sly is not among them: the syd, model and query
+# parsers are made from it and are used by every load.
+HEAVY_MODULES = ('jinja2', 'PIL', 'mistune', 'aiohttp')
+
+
+def import_times(module):
+    """Imports the module in a fresh interpreter - returns {imported module: (self us, cumulative us)}"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (os.path.join(REPO_DIR, 'src'), env.get('PYTHONPATH', None))))
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env, cwd=BENCHMARKS_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    if process.returncode != 0:
+        raise Exception(f'Importing {module} failed:\n{process.stderr.decode("utf-8", "replace")}')
+    times = {}
+    for line in process.stderr.decode('utf-8').splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stderr=subprocess.DEVNULL
+        ).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_result(module):
+    previous = None
+    if os.path.exists(RESULTS_PATH):
+        with open(RESULTS_PATH, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    result = json.loads(line)
+                    if result['module'] == module:
+                        previous = result
+    return previous
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Import time benchmark of synamic.')
+    parser.add_argument('--module', default='synamic')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters - the median is reported')
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to print')
+    parser.add_argument('--no-record', action='store_true', help='Do not append the result to the results file')
+    args = parser.parse_args(args)
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    total_us = statistics.median(run[args.module][1] for run in runs)
+    last_run = runs[-1]
+    heavy_modules = sorted(name for name in last_run if name.split('.')[0] in HEAVY_MODULES)
+
+    result = {
+        'module': args.module,
+        'total_us': total_us,
+        'modules': len(last_run),
+        'heavy_modules': sorted({name.split('.')[0] for name in heavy_modules}),
+        'repeat': args.repeat,
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+    line = f'import {args.module}: {total_us / 1000:.1f}ms, {result["modules"]} modules'
+    previous = _previous_result(args.module)
+    if previous is not None and previous['total_us'] > 0:
+        change = (total_us - previous['total_us']) / previous['total_us'] * 100
+        line += f'  ({change:+.1f}% from {previous["commit"]})'
+    print(line)
+    print('Slowest imports (cumulative, of the last run):')
+    for name, (self_us, cumulative_us) in sorted(last_run.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f'    {cumulative_us / 1000:>8.1f}ms  {name}')
+    if heavy_modules:
+        print(f'Heavy modules imported: {", ".join(result["heavy_modules"])}')
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, sort_keys=True) + '\n')
+    return 1 if heavy_modules else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+The micro benchmarks. Each one sets up with the fixtures and returns the callable that is timed.
+"""
+import fixtures
+from harness import benchmark
+
+
+@benchmark('content_splitter: small')
+def content_splitter_small(fx):
+    from synamic.core.services.content.content_splitter import content_splitter
+    return lambda: content_splitter(fx.file_path, fixtures.SMALL_CONTENT)
+
+
+@benchmark('content_splitter: large')
+def content_splitter_large(fx):
+    from synamic.core.services.content.content_splitter import content_splitter
+    return lambda: content_splitter(fx.file_path, fixtures.LARGE_CONTENT)
+
+
+@benchmark('ContentUrl.path_to_ccomponents')
+def path_to_ccomponents(fx):
+    from synamic.core.synamic.router.url import ContentUrl
+    paths = fixtures.URL_PATHS
+
+    def run():
+        for path in paths:
+            ContentUrl.path_to_ccomponents(path)
+    return run
+
+
+@benchmark('ContentUrl.parse_requested_url')
+def parse_requested_url(fx):
+    from synamic.core.synamic.router.url import ContentUrl
+    synamic = fx.synamic
+    urls = fixtures.REQUESTED_URLS
+
+    def run():
+        for url in urls:
+            ContentUrl.parse_requested_url(synamic, url)
+    return run
+
+
+@benchmark('FsObjectManager.make_syd')
+def make_syd(fx):
+    from synamic.core.object_managers.fs_object_manager.fs_object_manager import FsObjectManager
+    return lambda: FsObjectManager.make_syd(fixtures.SYD_TEXT)
+
+
+def _query_benchmark(query_str, cached=False):
+    def setup(fx):
+        object_manager = fx.root_site.object_manager
+        if cached:
+            return lambda: object_manager.query_cfields(query_str)
+
+        def run():
+            # the results are cached until the marked cfields change - time answering the query, not the cache.
+            object_manager.clear_query_results()
+            object_manager.query_cfields(query_str)
+        return run
+    return setup
+
+
+benchmark('FsObjectManager.query_cfields: equality')(_query_benchmark('type == post'))
+benchmark('FsObjectManager.query_cfields: contains and sort')(
+    _query_benchmark('tags contains Tag 3 :sortby created_on desc')
+)
+benchmark('FsObjectManager.query_cfields: and')(_query_benchmark('categories contains Category 1 & type == post'))
+benchmark('FsObjectManager.query_cfields: cached')(_query_benchmark('type == post', cached=True))
+
+
+@benchmark('_ContentFields.get: conversions')
+def cfields_get(fx):
+    site = fx.root_site
+    content_service = site.get_service('contents')
+    cached = fx.get_cfields('contents/blog/section-1/2001/post-21.md')
+
+    def run():
+        # fresh cfields every time - converted values are cached in the instance.
+        cfields = content_service.make_cfields(
+            cached.cpath, cached.curl, cached.cmodel, cached.cdoctype, cached.mimetype, cached.raw
+        )
+        for key in ('title', 'tags', 'categories', 'author', 'created_on', 'updated_on', 'meta_description'):
+            cfields.get(key)
+    return run
+
+
+@benchmark('PaginationPage.paginate_cfields')
+def paginate_cfields(fx):
+    from synamic.core.services.content.paginated_content import PaginationPage
+    site = fx.root_site
+    object_manager = site.object_manager
+    origin_content = object_manager.get_marked_content('blog.md')
+    queried_cfields_s = object_manager.query_cfields('type == post :sortby created_on desc')
+    return lambda: PaginationPage.paginate_cfields(site, origin_content, queried_cfields_s, 10)
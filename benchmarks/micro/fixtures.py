@@ -0,0 +1,133 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Fixtures of the micro benchmarks - fixed texts and a loaded synamic over a generated site. Everything is made on first
+use, so that a filtered run does not pay for what it does not use.
+"""
+import os
+import sys
+import shutil
+import tempfile
+
+MICRO_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS_DIR = os.path.dirname(MICRO_DIR)
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+SITE_POSTS = 2000
+
+SMALL_CONTENT = '''
+---
+title: A small post
+id: small-post
+tags: (Tag 1, Tag 2)
+categories: (Category 1)
+---
+
+# A small post
+
+A paragraph of text.
+'''
+
+LARGE_CONTENT = '''
+---
+title: A large post
+id: large-post
+tags: (Tag 1, Tag 2, Tag 3, Tag 4)
+categories: (Category 1)
+author: user_1
+meta_description ~ {
+    A large post with many lines of body text that is split from its front matter.
+}
+pagination: {
+    query: type == post :sortby created_on desc
+    per_page: 10
+}
+---
+
+''' + '\n\n'.join(
+    f'## Section {i}\n\n' + 'Some body text with **markdown** and a [link](http://localhost/). ' * 8
+    for i in range(200)
+)
+
+SYD_TEXT = '''
+title: Syd document
+id: syd-document
+tags: (Tag 1, Tag 2, Tag 3)
+number: 42
+description ~ {
+    A multi line
+    text value.
+}
+nested: {
+    key: value
+    list: [
+        { title: One
+          id: one }
+        { title: Two
+          id: two }
+    ]
+}
+'''
+
+URL_PATHS = (
+    '/',
+    '/blog/',
+    '/blog/section-1/2001/post-10/',
+    'blog/section-3/2002/post-99',
+    ('blog', 'section-3', '2002', 'post-99'),
+    '/themes/base/assets/css/style.css',
+)
+
+REQUESTED_URLS = (
+    'http://localhost/',
+    'http://localhost/blog/_/page/3/',
+    'http://localhost/blog/section-1/2001/post-10/',
+    'http://localhost//sub0/blog/',
+    'http://localhost/_/m/tags/tag_3/',
+)
+
+
+class _FilePath:
+    """Stands in for a cpath where only the relative path is used - for error messages"""
+    relative_path = 'contents/benchmark.md'
+
+
+class Fixtures:
+    def __init__(self):
+        self.__site_root = None
+        self.__synamic = None
+
+    file_path = _FilePath()
+
+    @property
+    def synamic(self):
+        """Loaded synamic of a generated site with SITE_POSTS posts"""
+        if self.__synamic is None:
+            from site_generator import generate_site
+            from synamic.core.synamic import Synamic
+            self.__site_root = tempfile.mkdtemp(prefix='synamic-micro-')
+            generate_site(self.__site_root, posts=SITE_POSTS, subsites=1)
+            synamic = Synamic(self.__site_root)
+            synamic.load()
+            self.__synamic = synamic
+        return self.__synamic
+
+    @property
+    def root_site(self):
+        return self.synamic.sites.root_site
+
+    def get_cfields(self, path):
+        return self.root_site.object_manager.get_cfields(path)
+
+    def close(self):
+        if self.__site_root is not None:
+            shutil.rmtree(self.__site_root, ignore_errors=True)
+            self.__site_root = None
@@ -0,0 +1,139 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Micro benchmark harness for the functions that are called per content or per url.
+
+    python benchmarks/micro/harness.py                      # run all and compare with the baseline
+    python benchmarks/micro/harness.py -k query             # only the ones with `query` in their names
+    python benchmarks/micro/harness.py --save-baseline      # run and make the results the new baseline
+
+The exit status is 1 when any benchmark is slower than its baseline by more than --threshold percent.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import statistics
+
+MICRO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(MICRO_DIR, 'baseline.json')
+
+_benchmarks = []
+
+
+def benchmark(name):
+    """Registers a benchmark. The decorated function receives the fixtures and returns the callable to time - so that
+    the per benchmark setup is not timed."""
+    def decorator(setup_func):
+        _benchmarks.append((name, setup_func))
+        return setup_func
+    return decorator
+
+
+def time_callable(func, repeat=7, min_time=0.2):
+    """Seconds per call: the number of calls per round is raised until a round takes `min_time`, then `repeat` rounds
+    are timed. Returns (best, median) of the rounds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1000000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    rounds = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            rounds.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return min(rounds), statistics.median(rounds)
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(results):
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results,
+        }, f, indent=1, sort_keys=True)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Micro benchmarks of synamic hot functions.')
+    parser.add_argument('-k', dest='keyword', default=None, help='Run only the benchmarks with this in their names')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per round')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression threshold in percent')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args(args)
+
+    sys.path.insert(0, MICRO_DIR)
+    import fixtures
+    import cases  # registers the benchmarks
+    # cases register to the `harness` module - it is not this module when this file runs as a script.
+    import harness
+    del cases
+
+    baseline = load_baseline()
+    if not baseline and not args.save_baseline:
+        print(f'No baseline at {BASELINE_PATH} - nothing to compare with. Record one with --save-baseline.')
+    results = {}
+    regressions = []
+    fixture_set = fixtures.Fixtures()
+    try:
+        for name, setup_func in harness._benchmarks:
+            if args.keyword is not None and args.keyword not in name:
+                continue
+            func = setup_func(fixture_set)
+            best, median = time_callable(func, repeat=args.repeat, min_time=args.min_time)
+            results[name] = {'best': best, 'median': median}
+            line = f'{best * 1e6:>12.2f}us {median * 1e6:>12.2f}us  {name}'
+            base = baseline.get(name, None)
+            if base is not None:
+                change = (best - base['best']) / base['best'] * 100
+                line += f'  ({change:+.1f}%)'
+                if change > args.threshold:
+                    regressions.append(name)
+                    line += '  REGRESSION'
+            print(line)
+    finally:
+        fixture_set.close()
+
+    if args.save_baseline:
+        baseline.update(results)
+        save_baseline(baseline)
+        print(f'Baseline saved to {BASELINE_PATH}')
+    elif regressions:
+        print(f'{len(regressions)} regression(s) over {args.threshold}%: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
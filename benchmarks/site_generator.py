@@ -0,0 +1,244 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Deterministic generator of synthetic sites for benchmarking. The same arguments always produce the same files.
+
+    python benchmarks/site_generator.py <empty or non existing dir> --posts 1000
+"""
+import os
+import random
+import argparse
+
+_WORDS = (
+    'synamic static dynamic site content template marker pagination query theme asset build output render '
+    'markdown syd meta user menu data cache speed memory python jinja page post list tag category author'
+).split()
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+
+
+def _write_bytes(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _sentence(rnd, min_words=6, max_words=18):
+    words = [rnd.choice(_WORDS) for _ in range(rnd.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraphs(rnd, count):
+    return '\n\n'.join(' '.join(_sentence(rnd) for _ in range(rnd.randint(3, 7))) for _ in range(count))
+
+
+def _marks_syd(title, marker_type, prefix, count, is_public=True):
+    marks = '\n'.join(
+        f'    {{\n        title: {prefix.capitalize()} {i}\n        id: {prefix}_{i}\n'
+        f'        description: {prefix.capitalize()} number {i}\n    }}'
+        for i in range(count)
+    )
+    public = '' if is_public else 'is_public: 0\n'
+    return f'title: {title}\ntype: {marker_type}\n{public}marks: [\n{marks}\n]\n'
+
+
+_BASE_TEMPLATE = '''<!doctype html>
+<html>
+    <head>
+        <title>{% block title %}{{ content.title }}{% endblock %}</title>
+        <link rel="stylesheet" href="/themes/base/assets/css/style.css">
+    </head>
+    <body>
+        {% include "menu.html" %}
+        {% block body %}{% endblock %}
+    </body>
+</html>
+'''
+
+_MENU_TEMPLATE = '''<nav>
+{% for menu in site.object_manager.get_menu('primary').menus %}<a href="{{ menu.link }}">{{ menu.title }}</a>
+{% endfor %}</nav>
+'''
+
+_DEFAULT_TEMPLATE = '''{% extends "base.html" %}
+{% block body %}
+<article>
+    <h1>{{ content.title }}</h1>
+    {{ content.body.as_markup }}
+</article>
+{% if content.pagination %}
+<ul>
+{% for item in content.pagination.contents %}    <li><a href="{{ item.curl.url }}">{{ item.title }}</a></li>
+{% endfor %}</ul>
+{% endif %}
+{% endblock %}
+'''
+
+_MARK_TEMPLATE = '''{% extends "base.html" %}
+{% block title %}{{ mark.title }}{% endblock %}
+{% block body %}
+<h1>{{ marker.title }}: {{ mark.title }}</h1>
+<ul>
+{% for item in mark.contents %}    <li><a href="{{ item.curl.url }}">{{ item.title }}</a></li>
+{% endfor %}</ul>
+{% endblock %}
+'''
+
+_USER_TEMPLATE = '''{% extends "base.html" %}
+{% block title %}{{ user.name }}{% endblock %}
+{% block body %}
+<h1>{{ user.name }}</h1>
+{% endblock %}
+'''
+
+
+def _generate_one_site(site_root, rnd, posts, tags, categories, users, static_files, list_pages, depth):
+    # settings
+    _write(os.path.join(site_root, 'settings.syd'), (
+        'templates: {\n'
+        '    user: user.html\n'
+        '    mark: mark.html\n'
+        '}\n'
+        'pagination: {\n'
+        '    per_page: 10\n'
+        '}\n'
+    ))
+
+    # themes - templates at the root of the templates dir and a theme with assets
+    themes_dir = os.path.join(site_root, 'themes')
+    _write(os.path.join(themes_dir, 'base.html'), _BASE_TEMPLATE)
+    _write(os.path.join(themes_dir, 'menu.html'), _MENU_TEMPLATE)
+    _write(os.path.join(themes_dir, 'default.html'), _DEFAULT_TEMPLATE)
+    _write(os.path.join(themes_dir, 'mark.html'), _MARK_TEMPLATE)
+    _write(os.path.join(themes_dir, 'user.html'), _USER_TEMPLATE)
+    _write(os.path.join(themes_dir, 'base', 'theme.syd'), 'id: base\ntitle: Base\n')
+    assets_dir = os.path.join(themes_dir, 'base', 'assets')
+    _write(os.path.join(assets_dir, 'css', 'style.css'), 'body { font-family: sans-serif; }\n' * 200)
+    _write(os.path.join(assets_dir, 'js', 'site.js'), 'console.log("synamic");\n' * 200)
+
+    # metas
+    metas_dir = os.path.join(site_root, 'metas')
+    markers_dir = os.path.join(metas_dir, 'markers')
+    _write(os.path.join(markers_dir, 'tags.syd'), _marks_syd('Tags', 'multiple', 'tag', tags))
+    _write(os.path.join(markers_dir, 'categories.syd'), _marks_syd('Categories', 'multiple', 'category', categories))
+    _write(os.path.join(markers_dir, 'type.syd'), (
+        'title: Type\ntype: single\nis_public: 0\nmarks: [\n'
+        '    {\n        title: Post\n        id: post\n    }\n'
+        '    {\n        title: Page\n        id: page\n    }\n'
+        ']\n'
+    ))
+    for i in range(users):
+        _write(os.path.join(metas_dir, 'users', f'user_{i}.syd'), (
+            f'name: User {i}\ntitle: Profile of User {i}\n\ndescription ~ {{\n    {_sentence(rnd)}\n}}\n'
+        ))
+    _write(os.path.join(metas_dir, 'menus', 'primary.syd'), (
+        'menus: [\n'
+        '    {\n        title: Home\n        link: /\n    }\n'
+        '    {\n        title: Blog\n        link: /blog/\n'
+        '        menus: [\n            {\n                title: Page 2\n                link: /blog/_/page/2/\n'
+        '            }\n        ]\n    }\n'
+        ']\n'
+    ))
+    _write(os.path.join(metas_dir, 'data', 'links.syd'), 'home: http://localhost/\nsource: https://github.com/\n')
+    os.makedirs(os.path.join(metas_dir, 'models'), exist_ok=True)
+
+    # contents: nested sections with dir metas
+    contents_dir = os.path.join(site_root, 'contents')
+    _write(os.path.join(contents_dir, '.meta.syd'), 'type: post\nlanguage: en\n')
+    _write(os.path.join(contents_dir, 'home.md'), (
+        '---\ntitle: Home\npath: /\nid: home\ntype: page\n---\n\n' + _paragraphs(rnd, 2) + '\n'
+    ))
+    _write(os.path.join(contents_dir, 'blog.md'), (
+        '---\ntitle: Blog\npath: /blog/\nid: blog\ntype: page\n'
+        'pagination: {\n    query: type == post :sortby created_on desc\n    per_page: 10\n}\n'
+        '---\n\nAll the posts.\n'
+    ))
+    for i in range(list_pages):
+        category = i % categories
+        _write(os.path.join(contents_dir, 'lists', f'category-{category}-list-{i}.md'), (
+            f'---\ntitle: Category {category} list {i}\ntype: page\n'
+            f'pagination: {{\n    query: categories contains Category {category} :sortby created_on desc\n'
+            f'    per_page: 20\n}}\n---\n\nPosts of category {category}.\n'
+        ))
+
+    sections = max(1, min(20, posts // 100))
+    for section in range(sections):
+        section_dir = os.path.join(contents_dir, 'blog', f'section-{section}')
+        _write(os.path.join(section_dir, '.meta.syd'), f'author: user_{section % users}\n')
+        for year in range(depth):
+            _write(os.path.join(section_dir, f'{2000 + year}', '.meta.syd'), f'meta_description: Year {2000 + year}\n')
+
+    for i in range(posts):
+        section = i % sections
+        year = (i // sections) % depth
+        post_tags = ', '.join(f'Tag {t}' for t in sorted(rnd.sample(range(tags), min(tags, rnd.randint(1, 4)))))
+        post_category = f'Category {rnd.randrange(categories)}'
+        post_path = os.path.join(contents_dir, 'blog', f'section-{section}', f'{2000 + year}', f'post-{i}.md')
+        _write(post_path, (
+            f'---\ntitle: Post {i} {_sentence(rnd, 2, 5)}\nid: post-{i}\n'
+            f'tags: ({post_tags})\ncategories: ({post_category})\n---\n\n'
+            f'# Post {i}\n\n{_paragraphs(rnd, rnd.randint(2, 6))}\n\n'
+            f'- item one\n- item two\n\n```python\nprint({i})\n```\n'
+        ))
+
+    # static files in contents
+    for i in range(static_files):
+        size = rnd.choice((2 * 1024, 20 * 1024, 200 * 1024))
+        data = rnd.getrandbits(size * 8).to_bytes(size, 'little')
+        _write_bytes(os.path.join(contents_dir, 'images', f'image-{i}.png'), data)
+
+
+def generate_site(root, posts=1000, subsites=2, tags=50, categories=10, users=10, static_files=None, list_pages=None,
+                  depth=3, seed=0):
+    """Generates a root site with `posts` posts and `subsites` subsites (each with a tenth of the posts) under `root`.
+    Returns `root`."""
+    if os.path.exists(root) and os.listdir(root):
+        raise ValueError(f'Directory is not empty: {root}')
+    rnd = random.Random(seed)
+    if static_files is None:
+        static_files = max(1, posts // 20)
+    if list_pages is None:
+        list_pages = max(1, posts // 1000)
+
+    _write(os.path.join(root, '.gitignore'), '_outputs\n_cache\nsettings.private.syd\n')
+    _generate_one_site(root, rnd, posts, tags, categories, users, static_files, list_pages, depth)
+    for i in range(subsites):
+        site_root = os.path.join(root, 'sites', f'sub{i}')
+        sub_posts = max(1, posts // 10)
+        _generate_one_site(
+            site_root, rnd, sub_posts, max(1, tags // 5), max(1, categories // 2), max(1, users // 2),
+            max(1, static_files // 10), 1, depth
+        )
+    return root
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic synamic site for benchmarking.')
+    parser.add_argument('root', help='Empty or non existing directory')
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--subsites', type=int, default=2)
+    parser.add_argument('--tags', type=int, default=50)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--static-files', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(args)
+    generate_site(
+        args.root, posts=args.posts, subsites=args.subsites, tags=args.tags, categories=args.categories,
+        users=args.users, static_files=args.static_files, seed=args.seed
+    )
+    print(f'Generated site at {args.root}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,2 @@
 from synamic.core.default_data._manager import DefaultDataManager
+from synamic.core.default_data._syd_cache import SydCache, get_syd_cache
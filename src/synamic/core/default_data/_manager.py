@@ -1,6 +1,6 @@
 import os
-from synamic.core.parsing_systems.curlybrace_parser import SydParser
 from synamic.core.parsing_systems.model_parser import ModelParser
+from synamic.core.default_data._syd_cache import get_syd_cache
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
@@ -23,10 +23,10 @@ class DefaultDataManager:
         if name in self.__loaded_syds:
             sydC = self.__loaded_syds[name]
         else:
-            text = get_file_contents(name + '.syd', None)
-            if text is None:
+            full_fn = os.path.join(_BASE_DIR, name + '.syd')
+            if not os.path.exists(full_fn):
                 return default
-            sydC = SydParser(text).parse()
+            sydC = get_syd_cache().get_syd(full_fn)
             self.__loaded_syds[name] = sydC
         return sydC
 
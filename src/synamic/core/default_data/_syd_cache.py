@@ -0,0 +1,77 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import os
+import pickle
+from synamic.core.parsing_systems.curlybrace_parser import SydParser
+from synamic.core.standalones.classes.persistent_parse_cache import PersistentParseCache
+
+
+def _cache_dir_path():
+    """SYNAMIC_CACHE_DIR or the user's cache dir - for the default data, that is parsed before any site dir is known"""
+    cache_dir = os.environ.get('SYNAMIC_CACHE_DIR', None)
+    if cache_dir is None:
+        cache_dir = os.path.join(
+            os.environ.get('XDG_CACHE_HOME', None) or os.path.join(os.path.expanduser('~'), '.cache'),
+            'synamic'
+        )
+    return cache_dir
+
+
+class SydCache:
+    """Parsed syd files of every process kept on disk, by the absolute paths of the files.
+    A file is parsed again only when it changed since it was cached. The object manager keeps one in the cache dir of
+    every site for the syd files of the site."""
+    file_name = 'syds.pickle'
+    # must be increased whenever the pickled syd classes change.
+    version = 1
+
+    def __init__(self, cache_file_path):
+        self.__parse_cache = PersistentParseCache(cache_file_path, self.version).load()
+        self.__is_changed = False
+
+    def get_syd(self, abs_path, encoding='utf-8'):
+        """The parsed syd of the file - raises whatever reading or parsing the file raises"""
+        try:
+            syd = self.__parse_cache.get(abs_path, abs_path, None)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):  # cannot be unpickled anymore
+            syd = None
+        if syd is None:
+            with open(abs_path, 'rb') as f:
+                data = f.read()
+            # newlines are translated like reading in text mode does.
+            text = data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+            syd = SydParser(text).parse()
+            self.__parse_cache.put(abs_path, abs_path, syd, data=data)
+            self.__is_changed = True
+        return syd
+
+    def save(self):
+        """Saves when any file was parsed since the last save - dropping the entries of deleted files then. Failing to
+        save is not an error - it is only a cache."""
+        if not self.__is_changed:
+            return
+        self.__parse_cache.retain(abs_path for abs_path in self.__parse_cache.keys() if os.path.exists(abs_path))
+        try:
+            self.__parse_cache.save()
+        except OSError as e:
+            print(f'Syd cache could not be saved: {e!r}')
+        else:
+            self.__is_changed = False
+
+
+_syd_cache = None
+
+
+def get_syd_cache():
+    """The syd cache of the default data - one per process"""
+    global _syd_cache
+    if _syd_cache is None:
+        _syd_cache = SydCache(os.path.join(_cache_dir_path(), SydCache.file_name))
+    return _syd_cache
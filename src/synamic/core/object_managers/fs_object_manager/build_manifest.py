@@ -0,0 +1,229 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import os
+import json
+import hashlib
+from collections import namedtuple
+
+# path: output file path relative to the root site, content_hash: sha1 of the written bytes, inputs: {input key: sig}
+# path and content_hash are None when the output was up to date and thus skipped.
+BuildRecord = namedtuple('BuildRecord', ('url', 'path', 'content_hash', 'inputs'))
+
+
+def file_signature(abs_path):
+    """[size, mtime in nanoseconds] of a file or None when it does not exist. List - so that it compares equal to
+    what comes back from json."""
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def file_input_key(abs_path, root_path):
+    return 'file:' + os.path.relpath(abs_path, root_path)
+
+
+def file_inputs(abs_paths, root_path):
+    """(input key, signature) pairs of files"""
+    for abs_path in abs_paths:
+        yield file_input_key(abs_path, root_path), file_signature(abs_path)
+
+
+def list_dir_files(abs_dir, exclude_dirs=()):
+    """All file paths under a directory, `exclude_dirs` are absolute paths of directories to skip"""
+    exclude_dirs = {os.path.normcase(os.path.abspath(d)) for d in exclude_dirs}
+    paths = []
+    for dir_path, dir_names, file_names in os.walk(abs_dir):
+        dir_names[:] = [
+            dn for dn in dir_names if os.path.normcase(os.path.join(dir_path, dn)) not in exclude_dirs
+        ]
+        for fn in file_names:
+            paths.append(os.path.join(dir_path, fn))
+    return paths
+
+
+def files_digest(abs_paths):
+    """Digest over the signatures of the files - changes when any file is added, removed or modified"""
+    h = hashlib.sha1()
+    for abs_path in sorted(abs_paths):
+        h.update(abs_path.encode('utf-8'))
+        h.update(repr(file_signature(abs_path)).encode('utf-8'))
+    return h.hexdigest()
+
+
+def site_input_digests(site):
+    """Digests of the inputs that are shared by many outputs of a site. Calculated once per build.
+    @layout: templates (without theme assets), metas, settings of the site and its parents, dir metas & all the front
+    matters - anything that can appear on any page.
+    @marked: every marked content file - list like outputs (marks, users, paginations, sitemap) depend on them.
+    @pre_process: pre process dir and theme sass dirs.
+    """
+    object_manager = site.object_manager
+    themes = site.get_service('templates').themes
+    dir_meta_file_name = site.system_settings['configs.dir_meta_file_name']
+
+    layout_paths = []
+    templates_cdir = site.cpaths.templates_cdir
+    if templates_cdir.exists():
+        layout_paths.extend(
+            list_dir_files(templates_cdir.abs_path, exclude_dirs=[theme.assets_cdir.abs_path for theme in themes])
+        )
+    metas_cdir = site.cpaths.metas_cdir
+    if metas_cdir.exists():
+        layout_paths.extend(list_dir_files(metas_cdir.abs_path))
+    for specific_site in object_manager.sites_up():
+        for settings_fn in ('settings.syd', 'settings.private.syd'):
+            layout_paths.append(specific_site.path_tree.create_file_cpath(settings_fn).abs_path)
+
+    marked_paths = []
+    dir_meta_paths = set()
+    for cfields in object_manager.get_all_cached_marked_cfields():
+        marked_paths.append(cfields.cpath.abs_path)
+        for dir_cpath in cfields.cpath.parent_cpaths:
+            dir_meta_paths.add(dir_cpath.join(dir_meta_file_name, is_file=True).abs_path)
+    layout_paths.extend(dir_meta_paths)
+
+    layout_digest = hashlib.sha1(files_digest(layout_paths).encode('utf-8'))
+    for rel_path, fm_digest in sorted(object_manager.get_front_matter_digests().items()):
+        layout_digest.update(rel_path.encode('utf-8'))
+        layout_digest.update(fm_digest.encode('utf-8'))
+
+    pre_process_paths = []
+    pre_process_cdir = site.cpaths.pre_process_cdir
+    if pre_process_cdir.exists():
+        pre_process_paths.extend(list_dir_files(pre_process_cdir.abs_path))
+    for theme in themes:
+        if theme.sass_cdir.exists():
+            pre_process_paths.extend(list_dir_files(theme.sass_cdir.abs_path))
+
+    return {
+        '@layout': layout_digest.hexdigest(),
+        '@marked': files_digest(marked_paths),
+        '@pre_process': files_digest(pre_process_paths),
+    }
+
+
+def content_build_inputs(site, content, site_digests):
+    """The inputs an output depends on. Static contents depend only on their files, marked contents on their
+    files and the layout, everything else (generated contents) on the whole site.
+    The files recorded in the dependency graph during the last rendering are added by the build after rendering."""
+    content_service = site.get_service('contents')
+    root_path = site.synamic.abs_root_path
+    inputs = {}
+    if content_service.is_type_static_content(content):
+        inputs.update(file_inputs((content.cfields.cpath.abs_path,), root_path))
+    elif content_service.is_type_cfields(content.cfields):
+        inputs.update(file_inputs((content.cfields.cpath.abs_path,), root_path))
+        inputs['@layout'] = site_digests['@layout']
+        if content.cfields.raw.get('pagination', None) is not None:
+            inputs['@marked'] = site_digests['@marked']
+    else:
+        inputs.update(site_digests)
+    return inputs
+
+
+class BuildManifest:
+    """Persisted record of what the last build of a site wrote - lives in the site's cache dir.
+    Each output url has its output path (relative to the root site), the hash of the written content and the inputs
+    (with signatures) that produced it."""
+    file_name = 'build_manifest.json'
+    version = 2
+
+    def __init__(self, site):
+        self.__site = site
+        self.__root_path = site.synamic.abs_root_path
+        self.__manifest_cfile = site.cpaths.cache_cdir.join(self.file_name, is_file=True)
+        self.__previous_records = {}
+        self.__current_records = {}
+
+    def load(self):
+        if self.__manifest_cfile.exists():
+            with self.__manifest_cfile.open('r', encoding='utf-8') as f:
+                try:
+                    manifest = json.load(f)
+                except ValueError:
+                    manifest = {}
+            if manifest.get('version', None) == self.version:
+                self.__previous_records = manifest.get('outputs', {})
+        return self
+
+    def abs_output_path(self, rel_path):
+        return os.path.join(self.__root_path, rel_path)
+
+    def rel_output_path(self, abs_path):
+        return os.path.relpath(abs_path, self.__root_path)
+
+    def is_up_to_date(self, url, inputs):
+        """`inputs` must match the previous ones and the files recorded as dependencies in the previous build must
+        not have changed"""
+        record = self.__previous_records.get(url, None)
+        if record is None:
+            return False
+        previous_inputs = record['inputs']
+        for key, signature in inputs.items():
+            if previous_inputs.get(key, None) != signature:
+                return False
+        for key, signature in previous_inputs.items():
+            if key not in inputs and key.startswith('file:'):
+                if file_signature(self.abs_output_path(key[len('file:'):])) != signature:
+                    return False
+        return file_signature(self.abs_output_path(record['path'])) is not None
+
+    def add(self, build_record):
+        if build_record.path is None:
+            # skipped - the previous record is still valid.
+            self.__current_records[build_record.url] = self.__previous_records[build_record.url]
+        else:
+            self.__current_records[build_record.url] = {
+                'path': build_record.path,
+                'hash': build_record.content_hash,
+                'inputs': build_record.inputs,
+            }
+
+    def get_path(self, url):
+        """Output path of the url (relative to the root site) in this build or else in the previous one"""
+        record = self.__current_records.get(url, None) or self.__previous_records.get(url, None)
+        return None if record is None else record['path']
+
+    @property
+    def orphaned_paths(self):
+        """Output paths of the previous build that the current build did not produce."""
+        current_paths = {record['path'] for record in self.__current_records.values()}
+        orphaned = set()
+        for url, record in self.__previous_records.items():
+            if url not in self.__current_records and record['path'] not in current_paths:
+                orphaned.add(record['path'])
+        return tuple(sorted(orphaned))
+
+    def remove_orphans(self):
+        outputs_abs_path = self.__site.synamic.path_tree.create_dir_cpath(
+            self.__site.synamic.system_settings['dirs.outputs.outputs']
+        ).abs_path
+        for rel_path in self.orphaned_paths:
+            abs_path = self.abs_output_path(rel_path)
+            if os.path.isfile(abs_path):
+                print(f'Removing {abs_path}')
+                os.remove(abs_path)
+                # remove the directories that became empty - but never the outputs dir itself.
+                dir_path = os.path.dirname(abs_path)
+                while os.path.normcase(dir_path) != os.path.normcase(outputs_abs_path) and not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+                    dir_path = os.path.dirname(dir_path)
+
+    def save(self):
+        cache_cdir = self.__site.cpaths.cache_cdir
+        if not cache_cdir.exists():
+            cache_cdir.makedirs()
+        with self.__manifest_cfile.open('w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.version,
+                'outputs': self.__current_records
+            }, f, indent=1, sort_keys=True)
@@ -0,0 +1,179 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class DependencyGraph:
+    """Edges between the things that are read (inputs) and the things that read them.
+    A node is a tuple of (kind, site id, key) - file nodes have None as site id and path relative to the root site as
+    key, so that a file read by many sites is one node.
+
+    Edges are added explicitly with `add_edge()` or recorded: every node `record()`-ed while a `recording()` frame is
+    active becomes an input of all the active frames. The build records inside an output frame, so whatever the
+    rendering reads - contents, templates, data, queries, markers - becomes an input of the output."""
+    FILE = 'file'
+    CONTENT = 'content'
+    TEMPLATE = 'template'
+    DATA = 'data'
+    QUERY = 'query'
+    MARKER = 'marker'  # the marker definition file
+    MARKS = 'marks'  # membership of a marker - contents add marks to it
+    FRONT_MATTERS = 'front_matters'  # front matter of any content - queries can match new contents on their change
+    OUTPUT = 'output'
+
+    def __init__(self, root_path):
+        self.__root_path = root_path
+        self.__dependencies = defaultdict(set)  # node to input nodes
+        self.__dependents = defaultdict(set)  # input node to nodes
+        self.__frames = []
+
+    def file_node(self, path):
+        """`path` is either an absolute path or a cpath"""
+        abs_path = path if isinstance(path, str) else path.abs_path
+        return self.FILE, None, os.path.relpath(abs_path, self.__root_path)
+
+    def abs_file_path(self, file_node):
+        assert file_node[0] == self.FILE
+        return os.path.join(self.__root_path, file_node[2])
+
+    def content_node(self, site, cpath):
+        return self.CONTENT, site.id, cpath.relative_path
+
+    @classmethod
+    def template_node(cls, site, template_name):
+        return cls.TEMPLATE, site.id, template_name
+
+    @classmethod
+    def data_node(cls, site, data_name):
+        return cls.DATA, site.id, data_name
+
+    @classmethod
+    def query_node(cls, site, query_str):
+        return cls.QUERY, site.id, query_str
+
+    @classmethod
+    def marker_node(cls, site, marker_id):
+        return cls.MARKER, site.id, marker_id
+
+    @classmethod
+    def marks_node(cls, site, marker_id):
+        return cls.MARKS, site.id, marker_id
+
+    @classmethod
+    def front_matters_node(cls, site):
+        return cls.FRONT_MATTERS, site.id, None
+
+    @classmethod
+    def output_node(cls, site, url):
+        return cls.OUTPUT, site.id, url
+
+    def add_edge(self, node, input_node):
+        if node == input_node:
+            return
+        self.__dependencies[node].add(input_node)
+        self.__dependents[input_node].add(node)
+
+    def record(self, input_node):
+        for node in self.__frames:
+            self.add_edge(node, input_node)
+
+    @contextmanager
+    def recording(self, node, fresh=False):
+        """Records the inputs read inside the with block for the `node`. With `fresh` the previously recorded inputs of
+        the node are dropped first - for re-rendering an output."""
+        if fresh:
+            self.remove_dependencies(node)
+        self.__frames.append(node)
+        try:
+            yield node
+        finally:
+            popped = self.__frames.pop()
+            assert popped == node
+
+    @property
+    def is_recording(self):
+        return bool(self.__frames)
+
+    def remove_dependencies(self, node):
+        for input_node in self.__dependencies.pop(node, ()):
+            dependents = self.__dependents.get(input_node, None)
+            if dependents is not None:
+                dependents.discard(node)
+                if not dependents:
+                    del self.__dependents[input_node]
+
+    def site_edges(self, site_id):
+        """(node, input node) pairs of the nodes of a site"""
+        return [
+            (node, input_node)
+            for node, input_nodes in self.__dependencies.items() if node[1] == site_id
+            for input_node in input_nodes
+        ]
+
+    def add_edges(self, edges):
+        for node, input_node in edges:
+            self.add_edge(node, input_node)
+
+    def remove_site(self, site_id):
+        """Removes the edges recorded for the nodes of a site - when the site is reloaded"""
+        for node in [n for n in self.__dependencies if n[1] == site_id]:
+            self.remove_dependencies(node)
+
+    def clear(self):
+        self.__dependencies.clear()
+        self.__dependents.clear()
+
+    @staticmethod
+    def __walk(start_nodes, edges):
+        seen = set()
+        stack = list(start_nodes)
+        while stack:
+            node = stack.pop()
+            for next_node in edges.get(node, ()):
+                if next_node not in seen:
+                    seen.add(next_node)
+                    stack.append(next_node)
+        return seen
+
+    def has_dependencies(self, node):
+        return bool(self.__dependencies.get(node, None))
+
+    def direct_dependencies(self, node):
+        return frozenset(self.__dependencies.get(node, ()))
+
+    def direct_dependents(self, node):
+        return frozenset(self.__dependents.get(node, ()))
+
+    def dependencies(self, *nodes):
+        """All the nodes the `nodes` depend on - directly or through other nodes"""
+        return self.__walk(nodes, self.__dependencies)
+
+    def dependents(self, *nodes):
+        """All the nodes that depend on the `nodes` - directly or through other nodes"""
+        return self.__walk(nodes, self.__dependents)
+
+    def file_dependencies(self, node):
+        """Absolute paths of all the files a node depends on"""
+        return sorted(self.abs_file_path(n) for n in self.dependencies(node) if n[0] == self.FILE)
+
+    def outputs_to_rebuild(self, changed_paths, front_matter_changed=False):
+        """Urls of the recorded outputs that depend on any of the changed files. `front_matter_changed` tells that the
+        front matter of a changed content file changed - any query result can change then.
+        Returns a dict of site id to a set of urls."""
+        changed_nodes = {self.file_node(path) for path in changed_paths}
+        if front_matter_changed:
+            changed_nodes.update(n for n in self.__dependents if n[0] == self.FRONT_MATTERS)
+        outputs = defaultdict(set)
+        for node in self.dependents(*changed_nodes):
+            if node[0] == self.OUTPUT:
+                outputs[node[1]].add(node[2])
+        return dict(outputs)
@@ -0,0 +1,162 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import os
+import errno
+import shutil
+from synamic.exceptions import SynamicSettingsError
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+# ioctl request number of FICLONE on linux: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+# errors that tell that the method is not supported for the files - the next method is tried then.
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EPERM,
+    errno.EBADF,
+}
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _hardlink(src_path, dst_path):
+    try:
+        os.link(src_path, dst_path)
+    except OSError as e:
+        if e.errno in _UNSUPPORTED_ERRNOS:
+            raise _Unsupported()
+        raise
+
+
+def _reflink(src_path, dst_path):
+    if fcntl is None:
+        raise _Unsupported()
+    with open(src_path, 'rb') as fr, open(dst_path, 'wb') as fw:
+        try:
+            fcntl.ioctl(fw.fileno(), _FICLONE, fr.fileno())
+        except OSError as e:
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                raise _Unsupported()
+            raise
+
+
+def _copy_file_range(src_path, dst_path):
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is None:
+        raise _Unsupported()
+    with open(src_path, 'rb') as fr, open(dst_path, 'wb') as fw:
+        remaining = os.fstat(fr.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = copy_file_range(fr.fileno(), fw.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError as e:
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                raise _Unsupported()
+            raise
+
+
+def _sendfile(src_path, dst_path):
+    sendfile = getattr(os, 'sendfile', None)
+    if sendfile is None:
+        raise _Unsupported()
+    with open(src_path, 'rb') as fr, open(dst_path, 'wb') as fw:
+        size = os.fstat(fr.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = sendfile(fw.fileno(), fr.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                raise _Unsupported()
+            raise
+
+
+def _copy(src_path, dst_path):
+    with open(src_path, 'rb') as fr, open(dst_path, 'wb') as fw:
+        shutil.copyfileobj(fr, fw, _COPY_BUFFER_SIZE)
+
+
+class StaticEmitter:
+    """Emits static files to the output directory without passing their bytes through python where the platform
+    allows it.
+    Modes:
+        hardlink: output is a hard link to the source - nothing is copied, but the output and the source are the same
+            file; so, editing the output edits the source.
+        reflink: copy on write clone (btrfs, xfs, ...) - nothing is copied until one of them is modified.
+        copy_file_range/sendfile: the kernel copies the bytes.
+        copy: plain copy with a large buffer.
+        auto: reflink and then the kernel copies - hard links are never made automatically.
+    When a method is not supported it falls back to the next one (in the order above) and is not tried again during
+    the lifetime of the emitter."""
+    __methods = (
+        ('hardlink', _hardlink),
+        ('reflink', _reflink),
+        ('copy_file_range', _copy_file_range),
+        ('sendfile', _sendfile),
+        ('copy', _copy),
+    )
+    modes = ('auto',) + tuple(name for name, _ in __methods)
+
+    def __init__(self, mode='auto'):
+        if mode not in self.modes:
+            raise SynamicSettingsError(
+                f'Invalid static emit mode {mode}, valid modes are: {", ".join(self.modes)}'
+            )
+        self.__mode = mode
+        start_name = 'reflink' if mode == 'auto' else mode
+        names = [name for name, _ in self.__methods]
+        self.__chain = self.__methods[names.index(start_name):]
+        self.__unsupported = set()
+        self.__counts = {}
+
+    @property
+    def mode(self):
+        return self.__mode
+
+    @property
+    def counts(self):
+        """Method name to the number of files emitted with it"""
+        return dict(self.__counts)
+
+    def emit(self, src_path, dst_path):
+        """Emits the file at `src_path` to `dst_path` and returns the name of the method that was used"""
+        for name, method in self.__chain:
+            if name in self.__unsupported:
+                continue
+            # never write through an existing output - it may be a hard link to a source file.
+            if os.path.lexists(dst_path):
+                os.remove(dst_path)
+            try:
+                method(src_path, dst_path)
+            except _Unsupported:
+                self.__unsupported.add(name)
+                continue
+            self.__counts[name] = self.__counts.get(name, 0) + 1
+            return name
+        raise AssertionError('Plain copy can never be unsupported')
@@ -0,0 +1,114 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import os
+from collections import deque
+from synamic.exceptions import SynamicFSError
+
+_DIR = 'dir'
+_FILE = 'file'
+
+
+class FsInventory:
+    """Listings of the directories of a site, each directory scanned once with os.scandir for as long as the site stays
+    loaded. Lists the same cpaths, in the same order, as cpath.list_files()/list_dirs() - without asking the file
+    system again for every listing and every entry."""
+    def __init__(self, site):
+        self.__site = site
+        self.__dir_entries = {
+            # abs dir path: ((name, _DIR, _FILE or None), ...)
+        }
+        self.__ignore_sw = None
+
+    def __scan_dir(self, abs_dir_path):
+        entries = self.__dir_entries.get(abs_dir_path, None)
+        if entries is None:
+            entries = []
+            try:
+                with os.scandir(abs_dir_path) as dir_entries:
+                    for entry in dir_entries:
+                        # is_dir() and is_file() follow symlinks - like os.path.isdir() and os.path.isfile() do.
+                        if entry.is_file():
+                            kind = _FILE
+                        elif entry.is_dir():
+                            kind = _DIR
+                        else:
+                            kind = None
+                        entries.append((entry.name, kind))
+            except OSError as e:
+                raise SynamicFSError(
+                    f'Synamic File System Error (occurred during listing path: {abs_dir_path}):\n'
+                    f'{str(e)}'
+                )
+            entries = self.__dir_entries[abs_dir_path] = tuple(entries)
+        return entries
+
+    def __get_ignore_sw(self):
+        if self.__ignore_sw is None:
+            configs = self.__site.system_settings['configs']
+            self.__ignore_sw = (
+                tuple(configs.get('ignore_dirs_sw', tuple())),
+                tuple(configs.get('ignore_files_sw', tuple()))
+            )
+        return self.__ignore_sw
+
+    def list_cpaths(self, cdir, files_only=None, directories_only=None, depth=None, checker=None,
+                    respect_settings=True):
+        """(dir cpaths, file cpaths) under `cdir`, breadth first"""
+        assert not (files_only is True and directories_only is True)
+        path_tree = self.__site.path_tree
+        ignore_dirs_sw, ignore_files_sw = self.__get_ignore_sw()
+        if depth is None:
+            depth = 2147483647
+        start_comps = cdir.path_comps
+        start_abs_path = cdir.abs_path
+
+        directories = []
+        files = []
+        to_travel = deque(
+            ((*start_comps, name), kind, os.path.join(start_abs_path, name), 1)
+            for name, kind in self.__scan_dir(start_abs_path)
+        )
+        while to_travel:
+            path_comps, kind, path_abs, path_depth = to_travel.popleft()
+            if path_depth > depth:
+                break
+            path_base = path_comps[-1]
+            if kind == _FILE and files_only in (True, None):
+                path_obj = path_tree.create_cpath(path_comps, is_file=True)
+                if checker is not None and not checker(path_obj):
+                    continue
+                if respect_settings and path_base.startswith(ignore_files_sw):
+                    continue
+                files.append(path_obj)
+            elif kind == _DIR and directories_only in (True, None):
+                path_obj = path_tree.create_cpath(path_comps, is_file=False)
+                if checker is not None and not checker(path_obj):
+                    continue
+                if respect_settings and path_base.startswith(ignore_dirs_sw):
+                    continue
+                directories.append(path_obj)
+                to_travel.extend(
+                    ((*path_comps, name), sub_kind, os.path.join(path_abs, name), path_depth + 1)
+                    for name, sub_kind in self.__scan_dir(path_abs)
+                )
+            elif kind is None:
+                raise Exception(f"ContentPath is neither dir, nor file: {path_abs}. Files only: {files_only} "
+                                f"Dirs only: {directories_only}. ")
+        return directories, files
+
+    def list_files(self, cdir, depth=None, checker=None, respect_settings=True):
+        _, cfiles = self.list_cpaths(cdir, files_only=True, depth=depth, checker=checker,
+                                     respect_settings=respect_settings)
+        return cfiles
+
+    def list_dirs(self, cdir, depth=None, checker=None, respect_settings=True):
+        cdirs, _ = self.list_cpaths(cdir, directories_only=True, depth=depth, checker=checker,
+                                    respect_settings=respect_settings)
+        return cdirs
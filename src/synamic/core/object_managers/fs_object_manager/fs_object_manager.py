@@ -1,12 +1,19 @@
+import os
+import sys
 import types
-from collections import defaultdict, OrderedDict
-from synamic.core.services.content.content_splitter import content_splitter
+import heapq
+import hashlib
+import itertools
+from collections import defaultdict, OrderedDict, namedtuple
+from synamic.core.services.content.content_splitter import content_splitter, scan_front_matter, read_body
 from synamic.core.parsing_systems.model_parser import ModelParser
 from synamic.core.standalones import SydContainer
+from synamic.core.standalones.classes.persistent_parse_cache import PersistentParseCache
 from synamic.core.parsing_systems.curlybrace_parser import SydParser
+from synamic.core.default_data import SydCache
 from synamic.core.standalones.functions.decorators import loaded, not_loaded
 from synamic.core.contracts import CDocType
-from .query import QueryNode, SimpleQueryParser
+from .query import SimpleQueryParser
 from synamic.core.parsing_systems.getc_parser import parse_getc
 from synamic.core.standalones.functions.sequence_ops import Sequence
 from synamic.exceptions import (
@@ -21,9 +28,30 @@ from synamic.exceptions import (
 )
 from synamic import Nil
 from .init_manager import InitManager
+from .parallel_build import ParallelBuilder
+from .parallel_load import parse_front_matters, MIN_FILES_FOR_PARALLEL_PARSE
+from .build_manifest import (
+    BuildManifest, BuildRecord, site_input_digests, content_build_inputs, file_inputs, file_signature
+)
+from .dependency_graph import DependencyGraph
+from .fs_inventory import FsInventory
+from .query_indexes import QueryIndexes
+from .query_plan import QueryPlan, split_query_window
+from .emitters import StaticEmitter
+from .output_sync import same_file_contents, sync_stream
+from .profiler import BuildProfiler
+from .snapshot import SiteSnapshot, contents_changed_only
+
+
+# where the body of a marked file starts and its parsed front matter - valid while the file signature is the same.
+_ContentParts = namedtuple('_ContentParts', ('signature', 'body_offset', 'front_matter_syd'))
 
 
 class FsObjectManager:
+    # must be increased whenever what is cached in the front matter parse caches changes - e.g. the syd parser.
+    front_matter_cache_version = 2
+    front_matter_cache_file_name = 'front_matters.pickle'
+
     def __init__(self, synamic):
         self.__synamic = synamic
 
@@ -31,6 +59,13 @@ class FsObjectManager:
         self.__site_settings = defaultdict(dict)
 
         self.__cache = self.__Cache(self.__synamic)
+        self.__dependency_graph = DependencyGraph(synamic.abs_root_path)
+        self.__load_profilers = {}  # site id to profiler with the load phase timings of the last load
+        # site id to {relative path: (front matter digest, fields syd, body offset)} of the marked contents that did not
+        # change since the snapshot of the site - taken by the next __cache_marked_cfields().
+        self.__reusable_contents = {}
+        self.__syd_caches = {}  # site id to the SydCache in the cache dir of the site
+        self.__build_profiler = None
 
         self.__is_loaded = False
 
@@ -52,46 +87,145 @@ class FsObjectManager:
 
     def __reload_for__(self, site):
         self.__cache.clear_cache(site)
+        self.__dependency_graph.remove_site(site.id)
         self.__load_for__(site)
 
     def __load_for__(self, site):
-        self.__cache_markers(site)
-        self.__cache_users(site)
-        self.__cache_marked_cfields(site)
-        self.__cache_menus(site)
-        self.__cache_data(site)
-        self.__cache_pre_processed_contents(site)
+        # load phases are always timed - it costs nothing compared to the phases. Profiled builds report them.
+        load_profiler = self.__load_profilers[site.id] = BuildProfiler()
+        snapshot = SiteSnapshot(site) if self.__synamic.env['snapshots'] else None
+        load_phases = (
+            self.__cache_markers,
+            self.__cache_users,
+            self.__cache_marked_cfields,
+            self.__cache_menus,
+            self.__cache_data,
+            self.__cache_pre_processed_contents,
+        )
+        if snapshot is not None:
+            with load_profiler.measure(BuildProfiler.LOAD_PHASES, 'restore_snapshot'):
+                restored = snapshot.restore()
+            if restored is not None:
+                state, changed_paths = restored
+                if not changed_paths:
+                    self.__cache.restore_snapshot(site, state['cache'])
+                    self.__dependency_graph.add_edges(state['dependency_edges'])
+                    return
+                if self.__restore_snapshot_partially(site, state, changed_paths):
+                    load_phases = (
+                        self.__cache_markers, self.__cache_marked_cfields, self.__cache_pre_processed_contents
+                    )
+            with load_profiler.measure(BuildProfiler.LOAD_PHASES, 'record_snapshot_inputs'):
+                snapshot.record_inputs()
+
+        for load_phase in load_phases:
+            with load_profiler.measure(BuildProfiler.LOAD_PHASES, load_phase.__name__):
+                load_phase(site)
+
+        if snapshot is not None:
+            with load_profiler.measure(BuildProfiler.LOAD_PHASES, 'save_snapshot'):
+                snapshot.save({
+                    'cache': self.__cache.get_snapshot(site),
+                    'dependency_edges': self.__dependency_graph.site_edges(site.id),
+                })
+
+    def __restore_snapshot_partially(self, site, state, changed_paths):
+        """When only marked content files (or the directories under the contents dir) changed since the snapshot,
+        restores everything but what is made from or for the marked contents - the markers get their marks from them
+        and the dir metas and syds are read again for them - and keeps the parsed front matters of the unchanged files
+        for __cache_marked_cfields(). Returns False - restoring nothing - when anything else changed."""
+        if not contents_changed_only(
+                changed_paths, site.cpaths.contents_cdir.abs_path, site.system_settings['configs.marked_extensions']):
+            return False
+        changed_paths = {os.path.normcase(os.path.normpath(abs_path)) for abs_path in changed_paths}
+
+        cache_snapshot = state['cache']
+        self.__cache.restore_snapshot(site, cache_snapshot, content_made=False)
+        reusable_contents = self.__reusable_contents[site.id] = {}
+        for cpath, content_parts in cache_snapshot['content_parts'].items():
+            if os.path.normcase(os.path.normpath(cpath.abs_path)) not in changed_paths:
+                reusable_contents[cpath.relative_path] = (
+                    cache_snapshot['front_matter_digests'][cpath.relative_path],
+                    content_parts.front_matter_syd, content_parts.body_offset
+                )
+        # the inputs of the contents and markers are recorded again when they are made again.
+        remade_kinds = (DependencyGraph.CONTENT, DependencyGraph.MARKER, DependencyGraph.MARKS)
+        self.__dependency_graph.add_edges(
+            (node, input_node) for node, input_node in state['dependency_edges'] if node[0] not in remade_kinds
+        )
+        return True
 
     def __cache_marked_cfields(self, site):
         marked_extensions = site.system_settings['configs.marked_extensions']
+        reusable_contents = self.__reusable_contents.pop(site.id, {})
         if site.synamic.env['backend'] == 'file':  # TODO: fix it.
             content_service = site.get_service('contents')
             content_cdir = site.cpaths.contents_cdir
             # for content
             if content_cdir.exists():  # check content dir existence before proceeding
-                file_cpaths = content_cdir.list_files()
+                file_cpaths = self.list_files(site, content_cdir)
                 all_cfields = []
 
+                # parsed front matters of the previous loads - files that did not change are not parsed again.
+                front_matter_cache = PersistentParseCache(
+                    site.cpaths.cache_cdir.join(self.front_matter_cache_file_name, is_file=True).abs_path,
+                    self.front_matter_cache_version
+                ).load()
+                marked_cpaths = [
+                    file_cpath for file_cpath in file_cpaths if file_cpath.extension.lower() in marked_extensions
+                ]
+                # No need to cache anything about static file.
+
+                # relative path: (front matter digest, fields syd, body offset) - of the files unchanged since the
+                # snapshot too.
+                front_matters = dict(reusable_contents)
+                for file_cpath in marked_cpaths:
+                    if file_cpath.relative_path in front_matters:
+                        continue
+                    cached = front_matter_cache.get(file_cpath.relative_path, file_cpath.abs_path)
+                    if cached is not None:
+                        front_matters[file_cpath.relative_path] = cached
+                self.__parse_front_matters_in_parallel(
+                    site, [cpath for cpath in marked_cpaths if cpath.relative_path not in front_matters],
+                    front_matters, front_matter_cache
+                )
+
                 # make the cfields
-                for file_cpath in file_cpaths:
-                    if file_cpath.extension.lower() in marked_extensions:
-                        text = self.get_raw_text_data(site, file_cpath)
-                        front_matter, body = content_splitter(file_cpath, text)
-                        del body
-                        try:
-                            fields_syd = self.make_syd(front_matter)
-                        except SynamicSydParseError as e:
-                            raise SynamicErrors(
-                                f'Synamic Syd parsing error during parsing front matter of file: '
-                                f'{file_cpath.relative_path}\n'
-                                f'<This error occurred during caching the cfileds of marked contents>',
-                                e
+                graph = self.__dependency_graph
+                for file_cpath in marked_cpaths:
+                    # records the content file, dir metas and markers as inputs of the content.
+                    with graph.recording(graph.content_node(site, file_cpath), fresh=True):
+                        cache_key = file_cpath.relative_path
+                        parsed = front_matters.get(cache_key, None)
+                        graph.record(graph.file_node(file_cpath))
+                        if parsed is not None:
+                            front_matter_digest, fields_syd, body_offset = parsed
+                        else:
+                            # only the header is read - bodies are read when rendered.
+                            front_matter, body_offset, header = scan_front_matter(file_cpath)
+                            front_matter_digest = hashlib.sha1(front_matter.encode('utf-8')).hexdigest()
+                            try:
+                                fields_syd = self.make_syd(front_matter)
+                            except SynamicSydParseError as e:
+                                raise SynamicErrors(
+                                    f'Synamic Syd parsing error during parsing front matter of file: '
+                                    f'{file_cpath.relative_path}\n'
+                                    f'<This error occurred during caching the cfileds of marked contents>',
+                                    e
+                                )
+                            front_matter_cache.put(
+                                cache_key, file_cpath.abs_path, (front_matter_digest, fields_syd, body_offset),
+                                data=header
                             )
+                        self.__cache.add_front_matter_digest(site, file_cpath, front_matter_digest)
+                        self.__cache.add_content_parts(site, file_cpath, _ContentParts(
+                            file_signature(file_cpath.abs_path), body_offset, fields_syd
+                        ))
                         cfields = content_service.build_cfields(fields_syd, file_cpath)
-                        all_cfields.append(cfields)
-                    else:
-                        # No need to cache anything about static file.
-                        pass
+                    all_cfields.append(cfields)
+
+                front_matter_cache.retain(file_cpath.relative_path for file_cpath in marked_cpaths)
+                front_matter_cache.save()
 
                 # add the cfields to cache
                 for cfields in all_cfields:
@@ -111,6 +245,26 @@ class FsObjectManager:
             raise NotImplemented
             # database backend is not implemented yet. AND there is nothing to do here for db, skip it when implemented
 
+    @staticmethod
+    def __parse_front_matters_in_parallel(site, file_cpaths, front_matters, front_matter_cache):
+        """With `parse_workers` > 1 in the synamic env, the front matters of the files are read, split and parsed by
+        that many processes and added to `front_matters` and the cache. Files that fail are left out - they are
+        parsed again in the main process to report the error."""
+        parse_workers = site.synamic.env.get('parse_workers', None)
+        if parse_workers is None or parse_workers < 2 or len(file_cpaths) < MIN_FILES_FOR_PARALLEL_PARSE:
+            return
+        abs_paths = {}
+        items = []
+        for file_cpath in file_cpaths:
+            abs_paths[file_cpath.relative_path] = file_cpath.abs_path
+            items.append((file_cpath.relative_path, file_cpath.abs_path))
+        for key, front_matter_digest, body_offset, header_digest, fields_syd in parse_front_matters(
+                items, parse_workers):
+            front_matters[key] = front_matter_digest, fields_syd, body_offset
+            front_matter_cache.put(
+                key, abs_paths[key], front_matters[key], length=body_offset, digest=header_digest
+            )
+
     def __cache_users(self, site):
         user_service = site.get_service('users')
         user_ids = user_service.get_user_ids()
@@ -121,8 +275,10 @@ class FsObjectManager:
     def __cache_markers(self, site):
         marker_service = site.get_service('markers')
         marker_ids = marker_service.get_marker_ids()
+        graph = self.__dependency_graph
         for marker_id in marker_ids:
-            marker = marker_service.make_marker(marker_id)
+            with graph.recording(graph.marker_node(site, marker_id), fresh=True):
+                marker = marker_service.make_marker(marker_id)
             self.__cache.add_marker(site, marker_id, marker)
             # self.__marker_by_id_cachemap[site.id][marker_id] = marker
 
@@ -152,8 +308,10 @@ class FsObjectManager:
     def __cache_data(self, site):
         data_service = site.get_service('data')
         data_names = data_service.get_data_names()
+        graph = self.__dependency_graph
         for data_name in data_names:
-            data_instance = data_service.make_data(data_name)
+            with graph.recording(graph.data_node(site, data_name), fresh=True):
+                data_instance = data_service.make_data(data_name)
             self.__cache.add_data(site, data_instance)
 
     def make_url_for_marked_content(self, site, file_cpath, path=None, slug=None, for_cdoctype=CDocType.TEXT_DOCUMENT):
@@ -241,6 +399,8 @@ class FsObjectManager:
         else:
             file_cpath = path
 
+        self.__dependency_graph.record(self.__dependency_graph.content_node(site, file_cpath))
+
         # check cache
         marked_content = self.__cache.get_marked_content_by_cpath(site, file_cpath, None)
         if marked_content is not None:
@@ -285,15 +445,36 @@ class FsObjectManager:
         # static files from contents dir
         contents_cdir = site.cpaths.contents_cdir
         if contents_cdir.exists():
-            paths.extend(contents_cdir.list_files(checker=lambda cp: cp.extension not in marked_extensions))
+            paths.extend(self.list_files(site, contents_cdir, checker=lambda cp: cp.extension not in marked_extensions))
 
         # static files from themes assets dir
         for theme in site.get_service('templates').themes:
             if theme.assets_cdir.exists():
-                paths.extend(theme.assets_cdir.list_files())
+                paths.extend(self.list_files(site, theme.assets_cdir))
 
         return paths
 
+    def get_dir_meta_syd(self, site, parent_cpaths):
+        """Dir metas of `parent_cpaths` (as cpath.parent_cpaths lists them) merged in that order. Every directory is
+        checked for its dir meta and merged only once - the result is reused for all the files under it."""
+        dir_meta_file_name = site.system_settings['configs.dir_meta_file_name']
+        merged_syd = self.empty_syd()
+        meta_cfiles = ()
+        for dir_cpath in parent_cpaths:
+            dir_meta = self.__cache.get_dir_meta(site, dir_cpath)
+            if dir_meta is None:
+                dir_meta_cfile = dir_cpath.join(dir_meta_file_name, is_file=True)
+                if dir_meta_cfile.exists():
+                    merged_syd = merged_syd.merged_new(self.get_syd(site, dir_meta_cfile))
+                    meta_cfiles += (dir_meta_cfile, )
+                self.__cache.add_dir_meta(site, dir_cpath, merged_syd, meta_cfiles)
+            else:
+                merged_syd, meta_cfiles = dir_meta
+        # the dir metas are inputs of whatever is recorded now - get_syd() records them only when first parsed.
+        for meta_cfile in meta_cfiles:
+            self.__dependency_graph.record(self.__dependency_graph.file_node(meta_cfile))
+        return merged_syd
+
     @staticmethod
     def empty_syd():
         return SydContainer()
@@ -302,6 +483,7 @@ class FsObjectManager:
         path_tree = self.get_path_tree(site)
         if not path_tree.is_type_cpath(path):
             path = path_tree.create_file_cpath(path)
+        self.__dependency_graph.record(self.__dependency_graph.file_node(path))
         with path.open('r', encoding=encoding) as f:
             text = f.read()
         return text
@@ -312,11 +494,13 @@ class FsObjectManager:
             cpath = path_tree.create_file_cpath(path)
         else:
             cpath = path
+        self.__dependency_graph.record(self.__dependency_graph.file_node(cpath))
         syd = self.__cache.get_syd(site, cpath, default=None)
         if syd is None and cpath.exists():
             try:
-                syd = SydParser(self.get_raw_text_data(site, cpath)).parse()
-            except (SynamicSydParseError, SynamicFSError) as e:
+                # parsed again only when the file changed since any earlier process parsed it.
+                syd = self.__get_syd_cache(site).get_syd(cpath.abs_path)
+            except (SynamicSydParseError, SynamicFSError, OSError) as e:
                 raise SynamicErrors(
                     f'Synamic error during parsing syd file: '
                     f'{cpath.relative_path}',
@@ -325,6 +509,19 @@ class FsObjectManager:
             self.__cache.add_syd(site, cpath, syd)
         return syd
 
+    def __get_syd_cache(self, site):
+        syd_cache = self.__syd_caches.get(site.id, None)
+        if syd_cache is None:
+            syd_cache = self.__syd_caches[site.id] = SydCache(
+                site.cpaths.cache_cdir.join(SydCache.file_name, is_file=True).abs_path
+            )
+        return syd_cache
+
+    def save_syd_caches(self):
+        """Saves the syd caches of the sites - once per load of synamic or of a lazily loaded site with its ancestors"""
+        for syd_cache in self.__syd_caches.values():
+            syd_cache.save()
+
     @staticmethod
     def make_syd(raw_data):
         syd = SydParser(raw_data).parse()
@@ -363,6 +560,15 @@ class FsObjectManager:
             return processed_model
 
     def get_content_parts(self, site, content_path):
+        """Front matter syd and body text of a marked file. The body is read from the offset found during load and the
+        front matter is not parsed again - unless the file changed since."""
+        path_tree = self.get_path_tree(site)
+        if not path_tree.is_type_cpath(content_path):
+            content_path = path_tree.create_file_cpath(content_path)
+        content_parts = self.__cache.get_content_parts(site, content_path)
+        if content_parts is not None and content_parts.signature == file_signature(content_path.abs_path):
+            self.__dependency_graph.record(self.__dependency_graph.file_node(content_path))
+            return content_parts.front_matter_syd, read_body(content_path, content_parts.body_offset)
         text = self.get_raw_text_data(site, content_path)
         front_matter, body = content_splitter(content_path, text)
         front_matter_syd = self.make_syd(front_matter)  # Or take it from cache.
@@ -535,6 +741,7 @@ class FsObjectManager:
         pass
 
     def get_marker(self, site, marker_id, default=None, error_out=False):
+        self.__dependency_graph.record(self.__dependency_graph.marker_node(site, marker_id))
         marker = self.__cache.get_marker(site, marker_id, default=None)
         if marker is None and error_out:
             raise SynamicMarkerNotFound(f'Marker does not exist: {marker_id}')
@@ -589,6 +796,7 @@ class FsObjectManager:
         for site in self.sites_up(site):
             data = self.__cache.get_data(site, data_name, default=None)
             if data is not None:
+                self.__dependency_graph.record(self.__dependency_graph.data_node(site, data_name))
                 break
 
         if data is None:
@@ -599,84 +807,116 @@ class FsObjectManager:
     def get_book_tocs(self, site):
         return self.__cache.get_book_tocs(site)
 
-    @staticmethod
-    def __convert_section_value(section, content_model):
-        # TODO: for converter that returns single value implement mechanism that will help use in !in for them.
-        converted_value = content_model[section.key].converter(section.value)
-        return SimpleQueryParser.QuerySection(key=section.key, comp_op=section.comp_op, value=converted_value)
-
-    def __query_cfields_left_right(self, section, result_set, content_model):
-        matched_result = set()
-        for cfields in result_set:
-            field_value = cfields.get(section.key, None)
-            converter = content_model[section.key].converter
-            if field_value is not None:
-                if converter.compare(section.comp_op, field_value, section.value):
-                    matched_result.add(cfields)
-            else:
-                if section.comp_op in ('!=', '!in'):
-                    matched_result.add(cfields)
-        return matched_result
-
-    def __query_cfields_by_node(self, node, result_set, content_model):
-        if isinstance(node, SimpleQueryParser.QuerySection):
-            # only one section here.
-            left_section = node
-            right_section = None
-            logic_op = None
-        else:
-            assert isinstance(node, QueryNode)
-            logic_op = node.logic_op
-            if isinstance(node.left, QueryNode):
-                return self.__query_cfields_by_node(node.left, result_set, content_model)
-            else:
-                left_section = node.left
-                right_section = None
-
-            if isinstance(node.right, QueryNode):
-                return self.__query_cfields_by_node(node.left, result_set, content_model)
-            else:
-                right_section = node.right
+    def get_front_matter_digests(self, site):
+        """Relative path of marked content files to the digest of their front matter text"""
+        return self.__cache.get_front_matter_digests(site)
 
-        left_section = self.__convert_section_value(left_section, content_model)
-        left_result = self.__query_cfields_left_right(left_section, result_set, content_model)
-        if right_section is not None:
-            right_section = self.__convert_section_value(right_section, content_model)
-            right_result = self.__query_cfields_left_right(right_section, result_set, content_model)
-        else:
-            right_result = None
+    def list_files(self, site, cdir, depth=None, checker=None, respect_settings=True):
+        """cdir.list_files() from the file system inventory of the site - every directory is scanned once per load"""
+        return self.__cache.get_fs_inventory(site).list_files(
+            cdir, depth=depth, checker=checker, respect_settings=respect_settings
+        )
 
-        if logic_op == '|':
-            left_result.update(right_result)
-        elif logic_op == '&':
-            left_result.intersection_update(right_result)
-        else:
-            # keep as is
-            pass
-        result_set.clear()
-        result_set.update(left_result)
-        return result_set
+    def list_dirs(self, site, cdir, depth=None, checker=None, respect_settings=True):
+        """cdir.list_dirs() from the file system inventory of the site"""
+        return self.__cache.get_fs_inventory(site).list_dirs(
+            cdir, depth=depth, checker=checker, respect_settings=respect_settings
+        )
 
-    def query_cfields(self, site, query_str):
-        content_model = site.object_manager.get_model('content')
-        node, sort = SimpleQueryParser(query_str).parse()
-        all_cfields_s = self.__cache.get_all_marked_cfields(site)
-        result = set(all_cfields_s)
-        if node is not None:
-            self.__query_cfields_by_node(node, result, content_model)
-        if sort is not None:
-            def sorting_key_func(f):
-                value = f[sort.by_key]
-                if value is None:
-                    value = Nil
-                return value
-            result = sorted(
-                result,
-                key=sorting_key_func,
-                reverse=True if sort.order == 'desc' else False
+    def get_dependency_graph(self, site=None):
+        """Graph of what depends on what - one graph for all the sites"""
+        return self.__dependency_graph
+
+    def get_build_profiler(self, site=None):
+        """Profiler of the running profiled build or None - one for all the sites"""
+        return self.__build_profiler
+
+    def set_build_profiler(self, site, profiler):
+        self.__build_profiler = profiler
+
+    def outputs_to_rebuild(self, site, changed_paths, front_matter_changed=False):
+        """Urls of the outputs of the site (recorded in this process) that depend on any of the changed files"""
+        outputs = self.__dependency_graph.outputs_to_rebuild(changed_paths, front_matter_changed=front_matter_changed)
+        return outputs.get(site.id, set())
+
+    def __run_query_plan(self, site, query_plan):
+        query_indexes = self.__cache.get_query_indexes(site)
+        bitmap = query_plan.evaluate(query_indexes)
+        ordered_cfields = query_indexes.ordered_cfields
+        offset = query_plan.offset
+        stop = None if query_plan.limit is None else offset + query_plan.limit
+        sort = query_plan.sort
+        if sort is None:
+            ordinals = itertools.islice(query_indexes.iter_ordinals(bitmap), offset, stop)
+            return tuple(ordered_cfields[ordinal] for ordinal in ordinals)
+
+        reverse = True if sort.order == 'desc' else False
+        if stop is not None:
+            # only the first ones are needed - read them from the sorted index of the field when it has one.
+            ordinals = query_indexes.iter_sorted_ordinals(bitmap, sort.by_key, query_plan.sort_converter, reverse)
+            if ordinals is not None:
+                return tuple(ordered_cfields[ordinal] for ordinal in itertools.islice(ordinals, offset, stop))
+
+        result = query_indexes.to_cfields(bitmap)
+        sort_values = [f[sort.by_key] for f in result]
+        if stop is not None and stop < len(result) and not any(value is None for value in sort_values):
+            # selects what sorted()[:stop] would - with a heap of `stop` items. Nil is not ordered, so not with it.
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            positions = select(stop, range(len(result)), key=sort_values.__getitem__)
+            return tuple(result[position] for position in positions[offset:])
+
+        def sorting_key_func(position):
+            value = sort_values[position]
+            if value is None:
+                value = Nil
+            return value
+        positions = sorted(range(len(result)), key=sorting_key_func, reverse=reverse)
+        return tuple(result[position] for position in positions[offset:stop])
+
+    def get_query_plan(self, site, query_str):
+        """The query compiled for the site - parsed once per process and compiled once per load of the site"""
+        query_plan = self.__cache.get_query_plan(site, query_str)
+        if query_plan is None:
+            # :limit and :offset are not part of the query language of the parser.
+            conditions_str, limit, offset = split_query_window(query_str)
+            parsed_query = self.__cache.get_parsed_query(conditions_str)
+            if parsed_query is None:
+                parsed_query = SimpleQueryParser(conditions_str).parse()
+                self.__cache.add_parsed_query(conditions_str, parsed_query)
+            node, sort = parsed_query
+            query_plan = QueryPlan.compile(
+                node, sort, site.object_manager.get_model('content'), limit=limit, offset=offset
             )
+            self.__cache.add_query_plan(site, query_str, query_plan)
+        return query_plan
 
-        return tuple(result)
+    def query_cfields(self, site, query_str):
+        query_plan = self.get_query_plan(site, query_str)
+        # the same query (written in any way) is answered once for as long as the marked cfields of the site stay same.
+        query_key = query_plan.key
+        result = None if query_key is None else self.__cache.get_query_result(site, query_key)
+        if result is None:
+            result = self.__run_query_plan(site, query_plan)
+            if query_key is not None:
+                self.__cache.add_query_result(site, query_key, result)
+
+        # query result depends on its members and - for new matches - on the front matter of all the contents.
+        graph = self.__dependency_graph
+        query_node = graph.query_node(site, query_str)
+        graph.record(query_node)
+        if not graph.has_dependencies(query_node):
+            graph.add_edge(query_node, graph.front_matters_node(site))
+            for cfields in result:
+                graph.add_edge(query_node, graph.content_node(site, cfields.cpath))
+        return result
+
+    def get_query_cache_stats(self, site):
+        """Hits and misses of the query result cache of the site since it was loaded"""
+        return self.__cache.get_query_cache_stats(site)
+
+    def clear_query_results(self, site):
+        """Drops the cached query results of the site - the next queries are answered from the indexes again"""
+        self.__cache.clear_query_results(site)
 
     def query_contents(self, site, query_str):
         cfields_s = self.query_cfields(site, query_str)
@@ -767,6 +1007,8 @@ class FsObjectManager:
             self.__marker_by_id_cachemap = defaultdict(dict)
             # syd cachemap
             self.__cpath_to_syd_cachemap = defaultdict(dict)
+            # dir cpath to (dir metas merged down to the dir, dir meta cfiles that were merged)
+            self.__dir_meta_cachemap = defaultdict(dict)
 
             # menus
             self.__menus_cachemap = defaultdict(dict)
@@ -783,15 +1025,64 @@ class FsObjectManager:
             # >>>>>>>>
             # CONTENTS
             self.__pre_processed_cachemap = defaultdict(dict)  # curl to content
-            self.__marked_contents_cachemap = defaultdict(dict)  # curl to content: default limit 100 per site. < limit not yet implemented
+            self.__marked_contents_cachemap = defaultdict(dict)  # curl to content: limited per site, see add_marked_content()
             self.__marked_cfields_cachemap = defaultdict(dict)  # curl to content
             self.__book_tocs_cachemap = defaultdict(dict)
 
             self.__cpath_to_pre_processed_contents = defaultdict(dict)
-            self.__cpath_to_marked_content = defaultdict(dict)
+            self.__cpath_to_marked_content = defaultdict(OrderedDict)  # in least recently used first order
             self.__cpath_to_marked_cfields = defaultdict(dict)
+            self.__front_matter_digests = defaultdict(dict)  # relative path to front matter digest
+            self.__cpath_to_content_parts = defaultdict(dict)
             # <<<<<<<<
 
+            # directory listings - made again for every load.
+            self.__fs_inventories = {}
+            # indexes over the marked cfields - made again when they change.
+            self.__query_indexes = {}
+            # query results by normalized query and generation of the marked cfields - a new generation starts whenever
+            # the marked cfields of a site change.
+            self.__parsed_queries = {}
+            self.__query_plans = defaultdict(dict)  # compiled against the content model of a site
+            self.__marked_cfields_generations = defaultdict(int)
+            self.__query_results = defaultdict(dict)
+            self.__query_cache_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+            # the maps that are saved in snapshots of sites - marked contents are made again when needed.
+            self.__snapshot_cachemaps = {
+                'markers': self.__marker_by_id_cachemap,
+                'syds': self.__cpath_to_syd_cachemap,
+                'dir_metas': self.__dir_meta_cachemap,
+                'menus': self.__menus_cachemap,
+                'models': self.__models_cachemap,
+                'users': self.__users_cachemap,
+                'data': self.__data,
+                'pre_processed_contents': self.__pre_processed_cachemap,
+                'marked_cfields': self.__marked_cfields_cachemap,
+                'book_tocs': self.__book_tocs_cachemap,
+                'cpath_to_pre_processed_contents': self.__cpath_to_pre_processed_contents,
+                'cpath_to_marked_cfields': self.__cpath_to_marked_cfields,
+                'front_matter_digests': self.__front_matter_digests,
+                'content_parts': self.__cpath_to_content_parts,
+            }
+            self.__content_made_cachemap_names = frozenset({
+                'markers', 'syds', 'dir_metas',
+                'pre_processed_contents', 'marked_cfields', 'book_tocs', 'cpath_to_pre_processed_contents',
+                'cpath_to_marked_cfields', 'front_matter_digests', 'content_parts',
+            })
+
+        def get_snapshot(self, site):
+            return {name: cachemap[site.id] for name, cachemap in self.__snapshot_cachemaps.items()}
+
+        def restore_snapshot(self, site, snapshot, content_made=True):
+            """Without `content_made` what is made from the marked contents (and the pre processed contents, e.g. the
+            sitemap, that are made from them), the markers that they add marks to and the syds and dir metas that are
+            read for them are left out."""
+            for name, cachemap in self.__snapshot_cachemaps.items():
+                if content_made or name not in self.__content_made_cachemap_names:
+                    cachemap[site.id] = snapshot[name]
+            self.__marked_cfields_changed(site)
+
         def add_pre_processed_content(self, site, pre_processed_content, cpath=None):
             """Pre processed content is one kind of generated content, sor we cannot rely on source-cpath and thus cpath
             parameter is needed explicitly"""
@@ -811,19 +1102,37 @@ class FsObjectManager:
             return tuple(self.__pre_processed_cachemap[site.id].values())
 
         def add_marked_content(self, site, marked_content):
-            # TODO: set limit to 100 or so
+            """Keeps at most `configs.marked_contents_cache_limit` marked contents of a site - the least recently used
+            ones are dropped. Cfields are kept forever, so a dropped content is made again cheaply when needed."""
+            limit = site.system_settings['configs.marked_contents_cache_limit']
+            cpath_to_marked_content = self.__cpath_to_marked_content[site.id]
             self.__marked_contents_cachemap[site.id][marked_content.curl] = marked_content
-            self.__cpath_to_marked_content[site.id][marked_content.cpath] = marked_content
+            cpath_to_marked_content[marked_content.cpath] = marked_content
+            cpath_to_marked_content.move_to_end(marked_content.cpath)
+            while len(cpath_to_marked_content) > limit:
+                _, dropped_content = cpath_to_marked_content.popitem(last=False)
+                self.__marked_contents_cachemap[site.id].pop(dropped_content.curl, None)
 
         def get_marked_content_by_curl(self, site, curl, default=None):
             return self.__marked_contents_cachemap[site.id].get(curl, default)
 
         def get_marked_content_by_cpath(self, site, cpath, default=None):
-            return self.__cpath_to_marked_content[site.id].get(cpath, default)
+            cpath_to_marked_content = self.__cpath_to_marked_content[site.id]
+            marked_content = cpath_to_marked_content.get(cpath, None)
+            if marked_content is None:
+                return default
+            cpath_to_marked_content.move_to_end(cpath)
+            return marked_content
 
         def add_marked_cfields(self, site, cfields):
             self.__marked_cfields_cachemap[site.id][cfields.curl] = cfields
             self.__cpath_to_marked_cfields[site.id][cfields.cpath] = cfields
+            self.__marked_cfields_changed(site)
+
+        def __marked_cfields_changed(self, site):
+            self.__query_indexes.pop(site.id, None)
+            self.__marked_cfields_generations[site.id] += 1
+            self.__query_results[site.id].clear()
 
         def get_marked_cfields_by_curl(self, site, curl, default=None):
             return self.__marked_cfields_cachemap[site.id].get(curl, default)
@@ -841,6 +1150,54 @@ class FsObjectManager:
         def get_all_marked_cfields(self, site):
             return tuple(self.__marked_cfields_cachemap[site.id].values())
 
+        def get_parsed_query(self, query_str, default=None):
+            return self.__parsed_queries.get(query_str, default)
+
+        def add_parsed_query(self, query_str, parsed_query):
+            self.__parsed_queries[query_str] = parsed_query
+
+        def get_query_plan(self, site, query_str, default=None):
+            return self.__query_plans[site.id].get(query_str, default)
+
+        def add_query_plan(self, site, query_str, query_plan):
+            self.__query_plans[site.id][query_str] = query_plan
+
+        def get_query_result(self, site, query_key, default=None):
+            stats = self.__query_cache_stats[site.id]
+            result = self.__query_results[site.id].get((self.__marked_cfields_generations[site.id], query_key), None)
+            if result is None:
+                stats['misses'] += 1
+                return default
+            stats['hits'] += 1
+            return result
+
+        def add_query_result(self, site, query_key, result):
+            self.__query_results[site.id][(self.__marked_cfields_generations[site.id], query_key)] = result
+
+        def get_query_cache_stats(self, site):
+            return dict(self.__query_cache_stats[site.id], entries=len(self.__query_results[site.id]))
+
+        def clear_query_results(self, site):
+            self.__query_results[site.id].clear()
+
+        def get_query_indexes(self, site):
+            query_indexes = self.__query_indexes.get(site.id, None)
+            if query_indexes is None:
+                query_indexes = self.__query_indexes[site.id] = QueryIndexes(self.get_all_marked_cfields(site))
+            return query_indexes
+
+        def add_front_matter_digest(self, site, cpath, digest):
+            self.__front_matter_digests[site.id][cpath.relative_path] = digest
+
+        def get_front_matter_digests(self, site):
+            return dict(self.__front_matter_digests[site.id])
+
+        def add_content_parts(self, site, cpath, content_parts):
+            self.__cpath_to_content_parts[site.id][cpath] = content_parts
+
+        def get_content_parts(self, site, cpath, default=None):
+            return self.__cpath_to_content_parts[site.id].get(cpath, default)
+
         def add_marker(self, site, marker_id, marker):
             self.__marker_by_id_cachemap[site.id][marker_id] = marker
 
@@ -856,6 +1213,12 @@ class FsObjectManager:
         def get_syd(self, site, cpath, default=None):
             return self.__cpath_to_syd_cachemap[site.id].get(cpath, default)
 
+        def add_dir_meta(self, site, dir_cpath, merged_syd, meta_cfiles):
+            self.__dir_meta_cachemap[site.id][dir_cpath] = merged_syd, meta_cfiles
+
+        def get_dir_meta(self, site, dir_cpath, default=None):
+            return self.__dir_meta_cachemap[site.id].get(dir_cpath, default)
+
         def add_menu(self, site, menu_name, menu):
             self.__menus_cachemap[site.id][menu_name] = menu
 
@@ -904,13 +1267,28 @@ class FsObjectManager:
             self.__cpath_to_pre_processed_contents[site.id].clear()
             self.__cpath_to_marked_content[site.id].clear()
             self.__cpath_to_marked_cfields[site.id].clear()
+            self.__front_matter_digests[site.id].clear()
+            self.__cpath_to_content_parts[site.id].clear()
             self.__book_tocs_cachemap[site.id].clear()
+            self.__marked_cfields_changed(site)
+            self.__query_cache_stats.pop(site.id, None)
+            self.__query_plans[site.id].clear()
+
+        def get_fs_inventory(self, site):
+            fs_inventory = self.__fs_inventories.get(site.id, None)
+            if fs_inventory is None:
+                fs_inventory = self.__fs_inventories[site.id] = FsInventory(site)
+            return fs_inventory
+
+        def clear_fs_inventory(self, site):
+            self.__fs_inventories.pop(site.id, None)
 
         def clear_marker_cache(self, site):
             self.__marker_by_id_cachemap[site.id].clear()
 
         def clear_syd_cache(self, site):
             self.__cpath_to_syd_cachemap[site.id].clear()
+            self.__dir_meta_cachemap[site.id].clear()
 
         def clear_menus_cache(self, site):
             self.__menus_cachemap[site.id].clear()
@@ -933,26 +1311,184 @@ class FsObjectManager:
             self.clear_model(site)
             self.clear_users(site)
             self.clear_data(site)
-
-    def build(self, site):
+            self.clear_fs_inventory(site)
+
+    def write_content(self, site, content, hash_obj=None, static_emitter=None, sync=False):
+        """Writes the content to the output directory and returns the output cfile.
+        `hash_obj` (from hashlib) is updated with the written bytes when provided.
+        Static contents are emitted by the `static_emitter` (a plain copying one when not provided) - their bytes do
+        not pass through python.
+        With `sync`, an existing output file is left untouched when it already has the same bytes."""
         output_dir = self.__synamic.system_settings['dirs.outputs.outputs']
         output_cdir = self.__synamic.path_tree.create_dir_cpath(output_dir)
-
-        c_iter = CIter(site)
-        for content in c_iter:
-            curl = content.curl
-            print(f'Writing {curl.url}')
-            with content.get_stream() as fr:
-                c_out_dir, fn = curl.to_dirfn_pair_w_site
-                c_out_cdir = output_cdir.join(c_out_dir, is_file=False)
-                if not c_out_cdir.exists():
-                    c_out_cdir.makedirs()
-                c_out_cfile = c_out_cdir.join(fn, is_file=True)
-                with c_out_cfile.open('wb') as fw:
-                    data = fr.read(1024)
+        curl = content.curl
+        c_out_dir, fn = curl.to_dirfn_pair_w_site
+        c_out_cdir = output_cdir.join(c_out_dir, is_file=False)
+        # worker processes of parallel builds can make the same directory at the same time.
+        os.makedirs(c_out_cdir.abs_path, exist_ok=True)
+        c_out_cfile = c_out_cdir.join(fn, is_file=True)
+
+        if site.get_service('contents').is_type_static_content(content):
+            if static_emitter is None:
+                static_emitter = StaticEmitter('copy')
+            src_path = content.cfields.cpath.abs_path
+            if not sync or not same_file_contents(src_path, c_out_cfile.abs_path):
+                static_emitter.emit(src_path, c_out_cfile.abs_path)
+            if hash_obj is not None:
+                with open(src_path, 'rb') as fr:
+                    data = fr.read(1024 * 1024)
                     while data:
-                        fw.write(data)
-                        data = fr.read(1024)
+                        hash_obj.update(data)
+                        data = fr.read(1024 * 1024)
+            return c_out_cfile
+
+        with content.get_stream() as fr:
+            if sync:
+                sync_stream(fr, c_out_cfile.abs_path, hash_obj=hash_obj)
+                return c_out_cfile
+            with c_out_cfile.open('wb') as fw:
+                data = fr.read(1024)
+                while data:
+                    fw.write(data)
+                    if hash_obj is not None:
+                        hash_obj.update(data)
+                    data = fr.read(1024)
+        return c_out_cfile
+
+    def __record_content_source(self, site, content):
+        """Records what an output is made of - templates of a pagination page may not read its origin content"""
+        graph = self.__dependency_graph
+        content_service = site.get_service('contents')
+        if content_service.is_type_static_content(content):
+            graph.record(graph.file_node(content.cfields.cpath))
+        elif content_service.is_type_cfields(content.cfields):
+            graph.record(graph.content_node(site, content.cfields.cpath))
+        elif content_service.is_type_paginated_content(content):
+            graph.record(graph.content_node(site, content.origin_cfields.cpath))
+
+    def build_content(self, site, content, manifest=None, site_digests=None, static_emitter=None, sync=False):
+        """Writes a content - when a manifest of the previous build is provided the content is skipped if its output
+        is up to date. Returns a build record, path of the record is None for skipped ones.
+        The files read during rendering are recorded in the dependency graph and added to the inputs of the record."""
+        url = content.curl.url
+        if manifest is None:
+            inputs = None
+            hash_obj = None
+        else:
+            inputs = content_build_inputs(site, content, site_digests)
+            if manifest.is_up_to_date(url, inputs):
+                return BuildRecord(url, None, None, inputs)
+            hash_obj = hashlib.sha1()
+        graph = self.__dependency_graph
+        output_node = graph.output_node(site, url)
+        profiler = self.__build_profiler
+        with graph.recording(output_node, fresh=True):
+            self.__record_content_source(site, content)
+            if profiler is None:
+                out_cfile = self.write_content(
+                    site, content, hash_obj=hash_obj, static_emitter=static_emitter, sync=sync
+                )
+            else:
+                with profiler.measure(BuildProfiler.URLS, url):
+                    out_cfile = self.write_content(
+                        site, content, hash_obj=hash_obj, static_emitter=static_emitter, sync=sync
+                    )
+        if site.get_service('contents').is_type_marked_content(content):
+            # written - other pages that need the body will render it again.
+            content.release_rendered()
+        if inputs is not None:
+            for key, signature in file_inputs(graph.file_dependencies(output_node), self.__synamic.abs_root_path):
+                inputs.setdefault(key, signature)
+        return BuildRecord(
+            url,
+            os.path.relpath(out_cfile.abs_path, self.__synamic.abs_root_path),
+            None if hash_obj is None else hash_obj.hexdigest(),
+            inputs
+        )
+
+    @staticmethod
+    def __print_build_record(build_record):
+        if build_record.path is None:
+            print(f'Up to date {build_record.url}')
+        else:
+            print(f'Writing {build_record.url}')
+
+    def build(self, site, workers=None, parallel_builder=None, incremental=False, static_emit='auto', profile=False,
+              profile_top=20, output_sync=None):
+        """Builds the site serially or, with `workers` > 1 or a `parallel_builder`, with worker processes.
+        With `incremental`, outputs that are up to date according to the build manifest of the previous build are
+        skipped and outputs that are no longer produced are removed.
+        `static_emit`: how static files are emitted - one of StaticEmitter.modes.
+        With `profile`, wall and cpu times of every url and template are recorded and reported along with the load
+        phase timings - the `profile_top` most time consuming ones are printed and all are saved to
+        build_profile.json in the site's cache dir.
+        With an `output_sync` (OutputSync), outputs are written only when their bytes changed and the output files of
+        the site are added to it - so that the rest can be pruned after all the sites are built."""
+        static_emitter = StaticEmitter(static_emit)
+        if parallel_builder is None and workers is not None and workers > 1:
+            with ParallelBuilder(self.__synamic, workers) as parallel_builder:
+                return self.build(
+                    site, parallel_builder=parallel_builder, incremental=incremental, static_emit=static_emit,
+                    profile=profile, profile_top=profile_top, output_sync=output_sync
+                )
+
+        sync = output_sync is not None
+        manifest = BuildManifest(site).load() if incremental else None
+        profiler = None
+        if profile:
+            profiler = BuildProfiler()
+            load_profiler = self.__load_profilers.get(site.id, None)
+            if load_profiler is not None:
+                profiler.merge(load_profiler.data)
+
+        if parallel_builder is not None:
+            total_contents = len(CIter(site))
+            build_records, failed_urls = parallel_builder.build(
+                site, total_contents, incremental=incremental, static_emit=static_emit, profiler=profiler, sync=sync
+            )
+            for build_record in build_records:
+                self.__print_build_record(build_record)
+        else:
+            site_digests = site_input_digests(site) if incremental else None
+            build_records, failed_urls = [], {}
+            self.__build_profiler = profiler
+            try:
+                for content in CIter(site):
+                    build_record = self.build_content(
+                        site, content, manifest=manifest, site_digests=site_digests, static_emitter=static_emitter,
+                        sync=sync
+                    )
+                    self.__print_build_record(build_record)
+                    build_records.append(build_record)
+            finally:
+                self.__build_profiler = None
+
+        if profiler is not None:
+            print(f'Build profile of site {site.id}:\n{profiler.report(profile_top)}')
+            query_cache_stats = self.get_query_cache_stats(site)
+            print(f'Query cache: {query_cache_stats["hits"]} hits, {query_cache_stats["misses"]} misses, '
+                  f'{query_cache_stats["entries"]} results')
+            cache_cdir = site.cpaths.cache_cdir
+            if not cache_cdir.exists():
+                cache_cdir.makedirs()
+            profiler.save(cache_cdir.join('build_profile.json', is_file=True), site=str(site.id))
+
+        for url, error in failed_urls.items():
+            print(f'Failed writing {url}\n{error}', file=sys.stderr)
+        if failed_urls:
+            print(f'{len(failed_urls)} of {len(build_records) + len(failed_urls)} contents failed to build for site '
+                  f'{site.id}', file=sys.stderr)
+            return False
+
+        if manifest is not None:
+            for build_record in build_records:
+                manifest.add(build_record)
+            manifest.remove_orphans()
+            manifest.save()
+        if output_sync is not None:
+            for build_record in build_records:
+                rel_path = build_record.path if build_record.path is not None else manifest.get_path(build_record.url)
+                output_sync.add_produced(os.path.join(self.__synamic.abs_root_path, rel_path))
         return True
 
     def init_site(self, site=None):
@@ -964,101 +1500,107 @@ class FsObjectManager:
 
 
 class CIter:
-    def __init__(self, site):
+    """Iterates over all the contents of a site to build. Nothing is made up front - elements are produced lazily and
+    turned into contents one at a time, so that the build does not hold all the contents in memory."""
+    def __init__(self, site, indexes=None):
+        """`indexes`: positions of the content list to iterate over - used for splitting the list across workers."""
         self.__site = site
+        self.__indexes = indexes
 
-    def __make_clist(self):
+    def __iter_elements(self):
         content_service = self.__site.get_service('contents')
-        # marked
-        clist = []
+        object_manager = self.__site.object_manager
 
-        all_cfields = self.__site.object_manager.get_all_cached_marked_cfields()
-        all_pre_content = self.__site.object_manager.get_all_pre_processed_contents()
-        all_static_cpaths = self.__site.object_manager.get_static_file_cpaths()
-        all_users = self.__site.object_manager.get_users()
-        all_marks = []
+        # marked
+        all_cfields = object_manager.get_all_cached_marked_cfields()
+        yield from all_cfields
+        yield from object_manager.get_all_pre_processed_contents()
+        yield from object_manager.get_static_file_cpaths()
+        yield from object_manager.get_users()
 
-        for marker in self.__site.object_manager.get_markers():
+        for marker in object_manager.get_markers():
             if not marker.is_public:
                 continue
-            marks = marker.marks
-            for mark in marks:
-                all_marks.append(mark.content)
-
-        clist.extend(all_cfields)
-        clist.extend(all_pre_content)
-        clist.extend(all_static_cpaths)
-        clist.extend(all_users)
-        clist.extend(all_marks)
+            for mark in marker.marks:
+                yield mark
 
         # pagination pages
-        pagination_pages = []
         for cfields in all_cfields:
             root_pagination = cfields.pagination
             if content_service.is_type_pagination_page(root_pagination):
                 for page_no in range(1, root_pagination.total_pagination):
                     sub_page = root_pagination.get_sub_page(page_no)
                     assert content_service.is_type_pagination_page(sub_page), f'Type: {type(sub_page)}'
-                    pagination_pages.append(sub_page)
-        clist.extend(pagination_pages)
-        return clist
+                    yield sub_page
 
-    def __iter__(self):
-        return self.__CListIterator(self.__make_clist(), self.__site)
+    def iter_selected_elements(self):
+        """Elements of the list - at `indexes` when given - that make_content() turns into contents"""
+        if self.__indexes is None:
+            yield from self.__iter_elements()
+        else:
+            indexes = set(self.__indexes)
+            last_index = max(indexes) if indexes else -1
+            for idx, elem in enumerate(self.__iter_elements()):
+                if idx > last_index:
+                    break
+                if idx in indexes:
+                    yield elem
 
-    class __CListIterator:
-        def __init__(self, clist, site):
-            self.__clist = clist
-            self.__idx = 0
-            self.__site = site
+    def __len__(self):
+        count = 0
+        for _ in self.iter_selected_elements():
+            count += 1
+        return count
+
+    @staticmethod
+    def element_url(elem, default=None):
+        """Url of the content of the element, as far as it can be known without making the content"""
+        try:
+            return elem.curl.url
+        except Exception:
+            relative_path = getattr(elem, 'relative_path', None)
+            return default if relative_path is None else relative_path
+
+    def make_content(self, elem):
+        """Content of an element of iter_selected_elements()"""
+        content_service = self.__site.get_service('contents')
+        markers_service = self.__site.get_service('markers')
+        users_service = self.__site.get_service('users')
+        path_tree = self.__site.path_tree
 
-            self.__content_service = self.__site.get_service('contents')
-            self.__markers_service = self.__site.get_service('markers')
-            self.__users_service = self.__site.get_service('users')
-            self.__path_tree = self.__site.path_tree
-
-        def __next__(self):
-            if self.__idx >= len(self.__clist):
-                del self.__clist
-                del self.__site
-                del self.__content_service
-                del self.__markers_service
-                del self.__users_service
-                del self.__path_tree
-                raise StopIteration
-
-            elem = self.__clist[self.__idx]
-            self.__idx += 1
-
-            # marked content
-            if self.__content_service.is_type_cfields(elem):
-                cfields = elem
-                content = self.__site.object_manager.get_marked_content(cfields.cpath)
-
-            elif self.__content_service.is_type_generated_content(elem):
-                content = elem
-
-            # static content
-            elif self.__path_tree.is_type_cpath(elem):
-                cpath = elem
-                content = self.__content_service.build_static_content(cpath)
-
-            # user
-            elif self.__users_service.is_type_user(elem):
-                user = elem
-                content = user.content
-
-            # mark
-            elif self.__markers_service.is_type_mark(elem):
-                mark = elem
-                content = mark.content
-
-            # pagination pages
-            elif self.__content_service.is_type_pagination_page(elem):
-                pagination_page = elem
-                content = pagination_page.host_content
+        # marked content
+        if content_service.is_type_cfields(elem):
+            cfields = elem
+            content = self.__site.object_manager.get_marked_content(cfields.cpath)
 
-            else:
-                raise Exception(f'Something impossible happened or you introduced a bug.')
+        elif content_service.is_type_generated_content(elem):
+            content = elem
+
+        # static content
+        elif path_tree.is_type_cpath(elem):
+            cpath = elem
+            content = content_service.build_static_content(cpath)
+
+        # user
+        elif users_service.is_type_user(elem):
+            user = elem
+            content = user.content
+
+        # mark
+        elif markers_service.is_type_mark(elem):
+            mark = elem
+            content = mark.content
 
-            return content
+        # pagination pages
+        elif content_service.is_type_pagination_page(elem):
+            pagination_page = elem
+            content = pagination_page.host_content
+
+        else:
+            raise Exception(f'Something impossible happened or you introduced a bug.')
+
+        return content
+
+    def __iter__(self):
+        for elem in self.iter_selected_elements():
+            yield self.make_content(elem)
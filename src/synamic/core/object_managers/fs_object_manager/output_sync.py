@@ -0,0 +1,119 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Syncing the output directory instead of wiping it: only the outputs whose bytes changed are written and the files that
+are not produced anymore are removed afterwards. Unchanged files keep their mtimes.
+"""
+import os
+import filecmp
+import tempfile
+
+_CHUNK_SIZE = 1024 * 1024
+# rendered outputs are compared in memory up to this size, bigger ones spill to a temporary file.
+_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def same_file_contents(src_path, dst_path):
+    """True when dst exists and has the same bytes as src"""
+    try:
+        if os.path.samefile(src_path, dst_path):  # hard linked by the previous build
+            return True
+    except OSError:
+        return False
+    return filecmp.cmp(src_path, dst_path, shallow=False)
+
+
+def sync_stream(stream, dst_path, hash_obj=None):
+    """Writes the stream to dst only when the bytes differ from what is already there. `hash_obj` is updated with all
+    the bytes of the stream. Returns True when written."""
+    try:
+        existing = open(dst_path, 'rb')
+    except FileNotFoundError:
+        existing = None
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as spool:
+        same = existing is not None
+        try:
+            data = stream.read(_CHUNK_SIZE)
+            while data:
+                if hash_obj is not None:
+                    hash_obj.update(data)
+                spool.write(data)
+                if same and existing.read(len(data)) != data:
+                    same = False
+                data = stream.read(_CHUNK_SIZE)
+            if same and existing.read(1):  # the existing one is longer
+                same = False
+        finally:
+            if existing is not None:
+                existing.close()
+        if same:
+            return False
+
+        if existing is not None:
+            # it may be a hard link to a source file - must not write through it.
+            os.remove(dst_path)
+        spool.seek(0)
+        with open(dst_path, 'wb') as fw:
+            data = spool.read(_CHUNK_SIZE)
+            while data:
+                fw.write(data)
+                data = spool.read(_CHUNK_SIZE)
+    return True
+
+
+class OutputSync:
+    """Collects the output files that the build produced (from all the sites) and prunes the rest of the output
+    directory after the build.
+    Files and directories starting with a dot at the top of the output directory are left alone - as the cleaning of
+    the output directory does."""
+    def __init__(self, outputs_abs_path):
+        self.__outputs_abs_path = os.path.abspath(outputs_abs_path)
+        self.__produced_paths = set()
+
+    @property
+    def outputs_abs_path(self):
+        return self.__outputs_abs_path
+
+    @property
+    def produced_paths(self):
+        return frozenset(self.__produced_paths)
+
+    def add_produced(self, abs_path):
+        self.__produced_paths.add(os.path.normcase(os.path.abspath(abs_path)))
+
+    def update_produced(self, abs_paths):
+        for abs_path in abs_paths:
+            self.add_produced(abs_path)
+
+    def prune(self):
+        """Removes the files that were not produced and the directories that became empty. Returns the removed file
+        paths."""
+        removed = []
+        outputs_abs_path = self.__outputs_abs_path
+        if not os.path.isdir(outputs_abs_path):
+            return removed
+        visited_dirs = []
+        for dir_path, dir_names, file_names in os.walk(outputs_abs_path):
+            if os.path.normcase(dir_path) == os.path.normcase(outputs_abs_path):
+                dir_names[:] = [dn for dn in dir_names if not dn.startswith('.')]
+                file_names = [fn for fn in file_names if not fn.startswith('.')]
+            else:
+                visited_dirs.append(dir_path)
+            for fn in file_names:
+                abs_path = os.path.join(dir_path, fn)
+                if os.path.normcase(abs_path) not in self.__produced_paths:
+                    print(f'Removing {abs_path}')
+                    os.remove(abs_path)
+                    removed.append(abs_path)
+        # deepest first, so that parents of removed directories can become empty too.
+        for dir_path in reversed(visited_dirs):
+            if not os.listdir(dir_path):
+                os.rmdir(dir_path)
+        return removed
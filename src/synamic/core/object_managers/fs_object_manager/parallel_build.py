@@ -0,0 +1,169 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import traceback
+import multiprocessing
+from synamic.exceptions import SynamicError
+from .build_manifest import BuildManifest, site_input_digests
+from .emitters import StaticEmitter
+from .profiler import BuildProfiler
+
+# Every worker process holds its own loaded synamic object. It is created once per process by the pool initializer and
+# reused for every chunk the process receives.
+_worker_synamic = None
+_worker_site_build_states = {}
+_worker_static_emitters = {}
+
+
+def _init_worker(root_site_root, env, dev_params):
+    global _worker_synamic
+    from synamic.core.synamic import Synamic
+    synamic = Synamic(root_site_root)
+    # the workers load and build with the settings of the main process - except for parsing in parallel: workers of
+    # a pool are daemonic and cannot start processes of their own.
+    synamic.env.update(env)
+    synamic.env['parse_workers'] = None
+    synamic.set_dev_params(**dev_params)
+    # only the sites that the worker gets chunks of are loaded.
+    synamic.load(lazy=True)
+    _worker_synamic = synamic
+
+
+def _get_site_build_state(site, incremental):
+    """Manifest of the previous build and input digests of the site - calculated once per worker process"""
+    state = _worker_site_build_states.get(site.id, None)
+    if state is None:
+        if incremental:
+            state = BuildManifest(site).load(), site_input_digests(site)
+        else:
+            state = None, None
+        _worker_site_build_states[site.id] = state
+    return state
+
+
+def _get_static_emitter(static_emit):
+    """One emitter per mode per worker process - so that unsupported methods are not tried again and again"""
+    static_emitter = _worker_static_emitters.get(static_emit, None)
+    if static_emitter is None:
+        static_emitter = _worker_static_emitters[static_emit] = StaticEmitter(static_emit)
+    return static_emitter
+
+
+def _build_chunk(site_id_comps, indexes, incremental, static_emit, profile, sync):
+    """Renders and writes the contents at the `indexes` positions of the site's CIter list.
+    Returns a list of (url, error message, build record) - error message is None for succeeded ones and build record
+    is None for failed ones - and profile data of the chunk (None when not profiling)."""
+    synamic = _worker_synamic
+    site = synamic.sites.get_by_id(site_id_comps)
+    manifest, site_digests = _get_site_build_state(site, incremental)
+    static_emitter = _get_static_emitter(static_emit)
+    profiler = BuildProfiler() if profile else None
+    synamic.object_manager.set_build_profiler(site, profiler)
+    try:
+        results = _build_indexes(synamic, site, indexes, manifest, site_digests, static_emitter, sync)
+    finally:
+        synamic.object_manager.set_build_profiler(site, None)
+    return results, None if profiler is None else profiler.data
+
+
+def _build_indexes(synamic, site, indexes, manifest, site_digests, static_emitter, sync):
+    from synamic.core.object_managers.fs_object_manager.fs_object_manager import CIter
+    results = []
+    c_iter = CIter(site, indexes=indexes)
+    elements = list(c_iter.iter_selected_elements())
+    for idx, elem in zip(indexes, elements):
+        url = CIter.element_url(elem, default=f'<content #{idx}>')
+        # the content is made inside the try too - so that a failing content fails alone, under its own url.
+        try:
+            content = c_iter.make_content(elem)
+            url = content.curl.url
+            build_record = synamic.object_manager.build_content(
+                site, content, manifest=manifest, site_digests=site_digests, static_emitter=static_emitter,
+                sync=sync
+            )
+        except SynamicError as e:
+            results.append((url, str(e), None))
+        except Exception:
+            results.append((url, traceback.format_exc(), None))
+        else:
+            results.append((url, None, build_record))
+    for idx in indexes[len(elements):]:
+        results.append((
+            f'<content #{idx}>', 'Content list of the worker does not match the content list of the main process', None
+        ))
+    return results
+
+
+def _split_indexes(total, parts):
+    """Contiguous split - a worker walks the content list only up to the last index of its chunk, and what is made
+    while walking (e.g. the paginations) is reused for the later chunks of the worker. More chunks than workers keep
+    heavy contents that sit next to each other (e.g. pagination pages) from holding one worker for long."""
+    chunks = []
+    for part in range(parts):
+        chunk = tuple(range(total * part // parts, total * (part + 1) // parts))
+        if chunk:
+            chunks.append(chunk)
+    return chunks
+
+
+class ParallelBuilder:
+    """A pool of worker processes that each hold a loaded synamic. One builder can be used for building all the
+    sites, so that the workers load the sites only once."""
+    def __init__(self, synamic, workers):
+        assert workers > 0
+        self.__synamic = synamic
+        self.__workers = workers
+        self.__pool = None
+
+    @property
+    def workers(self):
+        return self.__workers
+
+    def __enter__(self):
+        self.__pool = multiprocessing.Pool(
+            processes=self.__workers,
+            initializer=_init_worker,
+            initargs=(self.__synamic.abs_root_path, dict(self.__synamic.env), self.__synamic.dev_params)
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pool = self.__pool
+        self.__pool = None
+        if exc_type is None:
+            pool.close()
+        else:
+            pool.terminate()
+        pool.join()
+
+    def build(self, site, total_contents, incremental=False, static_emit='auto', profiler=None, sync=False):
+        """Builds the `total_contents` contents of the site's CIter list.
+        Returns a tuple of (build records, {url: error message}). Timings of the workers are merged into the
+        `profiler` when provided."""
+        assert self.__pool is not None, 'Parallel builder must be used inside a with statement'
+        # more chunks than workers so that a slow chunk does not keep the other workers idle.
+        chunks = _split_indexes(total_contents, self.__workers * 4)
+        async_results = [
+            self.__pool.apply_async(
+                _build_chunk, (site.id.components, chunk, incremental, static_emit, profiler is not None, sync)
+            )
+            for chunk in chunks
+        ]
+        build_records = []
+        failed_urls = {}
+        for async_result in async_results:
+            results, profile_data = async_result.get()
+            if profile_data is not None:
+                profiler.merge(profile_data)
+            for url, error, build_record in results:
+                if error is None:
+                    build_records.append(build_record)
+                else:
+                    failed_urls[url] = error
+        return build_records, failed_urls
@@ -0,0 +1,57 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import pickle
+import hashlib
+import multiprocessing
+from synamic.core.services.content.content_splitter import scan_front_matter
+from synamic.core.parsing_systems.curlybrace_parser import SydParser
+from synamic.core.standalones.classes.persistent_parse_cache import PersistentParseCache
+
+# below this many files starting the worker processes costs more than parsing in the main process.
+MIN_FILES_FOR_PARALLEL_PARSE = 64
+
+
+class _FilePath:
+    """Stands in for the cpath in the worker processes"""
+    def __init__(self, relative_path, abs_path):
+        self.relative_path = relative_path
+        self.abs_path = abs_path
+
+
+def _parse_front_matter(item):
+    """Runs in a worker process. Returns (relative path, front matter digest, body offset, digest of the bytes before
+    the body, pickled fields syd) - the last one is None when anything goes wrong: the main process parses that file
+    again to report the error."""
+    relative_path, abs_path = item
+    try:
+        front_matter, body_offset, header = scan_front_matter(_FilePath(relative_path, abs_path))
+        fields_syd = SydParser(front_matter).parse()
+        return (
+            relative_path,
+            hashlib.sha1(front_matter.encode('utf-8')).hexdigest(),
+            body_offset,
+            PersistentParseCache.bytes_digest(header),
+            pickle.dumps(fields_syd, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+    except Exception:
+        return relative_path, None, None, None, None
+
+
+def parse_front_matters(items, workers):
+    """Reads, splits and parses the front matters of the marked files with `workers` processes.
+    `items`: (relative path, absolute path) of the files.
+    Yields (relative path, front matter digest, body offset, digest of the bytes before the body, fields syd) of the
+    successfully parsed ones - in no particular order."""
+    chunksize = max(1, len(items) // (workers * 4))
+    with multiprocessing.Pool(processes=workers) as pool:
+        for relative_path, front_matter_digest, body_offset, header_digest, pickled_syd in pool.imap_unordered(
+                _parse_front_matter, items, chunksize=chunksize):
+            if pickled_syd is not None:
+                yield relative_path, front_matter_digest, body_offset, header_digest, pickle.loads(pickled_syd)
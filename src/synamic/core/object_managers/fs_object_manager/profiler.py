@@ -0,0 +1,90 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import json
+import time
+from contextlib import contextmanager
+
+
+class BuildProfiler:
+    """Wall and CPU times of named things of a few kinds - load phases, urls and templates.
+    Every measurement of a name adds up to its count and totals. Times are inclusive: a template rendered from inside
+    another rendering is counted in both of them."""
+    LOAD_PHASES = 'load_phases'
+    URLS = 'urls'
+    TEMPLATES = 'templates'
+    kinds = (LOAD_PHASES, URLS, TEMPLATES)
+
+    def __init__(self):
+        self.__records = {kind: {} for kind in self.kinds}  # kind to {name: [count, wall, cpu]}
+
+    def add(self, kind, name, wall, cpu, count=1):
+        record = self.__records[kind].get(name, None)
+        if record is None:
+            record = self.__records[kind][name] = [0, 0.0, 0.0]
+        record[0] += count
+        record[1] += wall
+        record[2] += cpu
+
+    @contextmanager
+    def measure(self, kind, name):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add(kind, name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    @property
+    def data(self):
+        """Picklable and json-able data - for sending from worker processes and saving"""
+        return {
+            kind: {name: {'count': r[0], 'wall': r[1], 'cpu': r[2]} for name, r in records.items()}
+            for kind, records in self.__records.items()
+        }
+
+    def merge(self, data):
+        """Adds the `data` of another profiler to this one"""
+        for kind, records in data.items():
+            for name, record in records.items():
+                self.add(kind, name, record['wall'], record['cpu'], count=record['count'])
+
+    def top(self, kind, n=20):
+        """(name, count, wall, cpu) of the n most time consuming names by wall time"""
+        records = sorted(self.__records[kind].items(), key=lambda item: item[1][1], reverse=True)
+        return [(name, r[0], r[1], r[2]) for name, r in records[:n]]
+
+    def total(self, kind):
+        count, wall, cpu = 0, 0.0, 0.0
+        for r in self.__records[kind].values():
+            count += r[0]
+            wall += r[1]
+            cpu += r[2]
+        return count, wall, cpu
+
+    def report(self, n=20):
+        titles = {
+            self.LOAD_PHASES: 'Load phases',
+            self.URLS: f'Top {n} urls',
+            self.TEMPLATES: f'Top {n} templates',
+        }
+        lines = []
+        for kind in self.kinds:
+            count, wall, cpu = self.total(kind)
+            lines.append(f'{titles[kind]} (total {count} in wall {wall:.3f}s, cpu {cpu:.3f}s):')
+            lines.append(f'    {"wall(s)":>10} {"cpu(s)":>10} {"count":>7}  name')
+            for name, count, wall, cpu in self.top(kind, n):
+                lines.append(f'    {wall:>10.4f} {cpu:>10.4f} {count:>7}  {name}')
+        return '\n'.join(lines)
+
+    def save(self, cfile, **extra):
+        with cfile.open('w', encoding='utf-8') as f:
+            data = dict(extra)
+            data.update(self.data)
+            json.dump(data, f, indent=1, sort_keys=True)
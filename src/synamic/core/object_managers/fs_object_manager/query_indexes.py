@@ -0,0 +1,247 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import bisect
+from collections import defaultdict
+
+# positions of the set bits of every byte value.
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte & (1 << bit)) for byte in range(256))
+
+
+def _frozen_value(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen_value(v) for v in value)
+    hash(value)  # TypeError for the ones that cannot be part of a key
+    return value
+
+
+def _normalized_node(node):
+    if hasattr(node, 'logic_op'):  # QueryNode
+        return 'node', node.logic_op, _normalized_node(node.left), _normalized_node(node.right)
+    # QuerySection
+    return 'section', node.key, node.comp_op, _frozen_value(node.value)
+
+
+def normalized_query(node, sort):
+    """Hashable form of a parsed query - same for the queries that differ only in writing (e.g. spaces). None when a
+    value of the query cannot be hashed."""
+    try:
+        return (
+            None if node is None else _normalized_node(node),
+            None if sort is None else (sort.by_key, sort.order)
+        )
+    except TypeError:
+        return None
+
+
+class _FieldIndex:
+    """Values of one field of all the marked cfields of a site, as bitmaps. An index is None when the values do not
+    allow it (unhashable or not comparable to each other) - the queries on them are answered by scanning."""
+    def __init__(self, key, converter_name, query_indexes):
+        make_bitmap = query_indexes.make_bitmap
+        none_ordinals = []
+        values = []
+        for ordinal, cfields in enumerate(query_indexes.ordered_cfields):
+            value = cfields.get(key, None)
+            if value is None:
+                none_ordinals.append(ordinal)
+            else:
+                values.append((value, ordinal))
+        self.none_bitmap = make_bitmap(none_ordinals)
+
+        self.hashed = None
+        if converter_name in QueryIndexes.HASHED_TYPES:
+            try:
+                value_ordinals = defaultdict(list)
+                for value, ordinal in values:
+                    value_ordinals[value].append(ordinal)
+            except TypeError:
+                pass
+            else:
+                self.hashed = {value: make_bitmap(ordinals) for value, ordinals in value_ordinals.items()}
+
+        self.sorted_values = self.sorted_ordinals = None
+        if converter_name in QueryIndexes.SORTED_TYPES:
+            try:
+                values_sorted = sorted(values, key=lambda value_ordinal: value_ordinal[0])
+            except TypeError:
+                pass
+            else:
+                self.sorted_values = [value for value, _ in values_sorted]
+                self.sorted_ordinals = [ordinal for _, ordinal in values_sorted]
+
+        self.inverted = None
+        if converter_name in QueryIndexes.INVERTED_TYPES:
+            try:
+                value_ordinals = defaultdict(list)
+                for values_list, ordinal in values:
+                    for value in values_list:
+                        value_ordinals[value].append(ordinal)
+            except TypeError:
+                pass
+            else:
+                self.inverted = {value: make_bitmap(ordinals) for value, ordinals in value_ordinals.items()}
+
+
+class QueryIndexes:
+    """Indexes over the marked cfields of a site for query_cfields(): hash indexes for ==, != and in on single value
+    fields, sorted indexes for the range operators on number, date, time and datetime fields and inverted indexes for
+    contains on list and marker fields. The index of a field is made on the first query on that field.
+    Sets of cfields are bitmaps - python ints with bit n set for the cfields of ordinal n - so that the results of the
+    sections of a query are combined with bitwise operations.
+    A section matches exactly what comparing every cfields with the field's converter matches."""
+    HASHED_TYPES = frozenset({'number', 'string', 'text', 'date', 'time', 'datetime', 'marker#type', 'user'})
+    SORTED_TYPES = frozenset({'number', 'date', 'time', 'datetime'})
+    INVERTED_TYPES = frozenset({
+        'number[]', 'string[]', 'date[]', 'time[]', 'datetime[]', 'marker#tags', 'marker#categories'
+    })
+    INDEXED_TYPES = HASHED_TYPES | SORTED_TYPES | INVERTED_TYPES
+
+    def __init__(self, all_cfields):
+        self.__ordered_cfields = tuple(all_cfields)
+        self.__all_bitmap = (1 << len(self.__ordered_cfields)) - 1
+        self.__field_indexes = {}
+
+    @property
+    def ordered_cfields(self):
+        """The cfields by their ordinals"""
+        return self.__ordered_cfields
+
+    @property
+    def all_bitmap(self):
+        return self.__all_bitmap
+
+    def make_bitmap(self, ordinals):
+        bitmap_bytes = bytearray((len(self.__ordered_cfields) + 7) // 8)
+        for ordinal in ordinals:
+            bitmap_bytes[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(bitmap_bytes, 'little')
+
+    def iter_ordinals(self, bitmap):
+        """Ordinals of the set bits, ascending"""
+        for byte_index, byte in enumerate(bitmap.to_bytes((len(self.__ordered_cfields) + 7) // 8, 'little')):
+            if byte:
+                base = byte_index << 3
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+
+    def to_cfields(self, bitmap):
+        ordered_cfields = self.__ordered_cfields
+        return [ordered_cfields[ordinal] for ordinal in self.iter_ordinals(bitmap)]
+
+    def __get_field_index(self, key, converter):
+        field_index = self.__field_indexes.get(key, None)
+        if field_index is None:
+            field_index = self.__field_indexes[key] = _FieldIndex(key, converter.name, self)
+        return field_index
+
+    def lookup(self, section, converter):
+        """Bitmap of the cfields that match the (converted) query section or None when no index can answer it"""
+        op = section.comp_op
+        value = section.value
+        if not converter.supports_compare_op(op) or converter.name not in self.INDEXED_TYPES:
+            # unsupported operators fail while scanning - as they always did.
+            return None
+        is_sequence = isinstance(value, (list, tuple))
+
+        if op in ('==', '!=', 'in', '!in') and converter.name in self.HASHED_TYPES:
+            if is_sequence is (op in ('==', '!=')):
+                return None
+            hashed = self.__get_field_index(section.key, converter).hashed
+            if hashed is None:
+                return None
+            try:
+                matched = 0
+                for single_value in (value if is_sequence else (value, )):
+                    matched |= hashed.get(single_value, 0)
+            except TypeError:
+                return None
+            if op in ('!=', '!in'):
+                # cfields without the field match the negations.
+                return self.__all_bitmap & ~matched
+            return matched
+
+        if op in ('>', '<', '>=', '<=') and converter.name in self.SORTED_TYPES and not is_sequence:
+            field_index = self.__get_field_index(section.key, converter)
+            sorted_values = field_index.sorted_values
+            if sorted_values is None:
+                return None
+            try:
+                if op == '>':
+                    ordinals = field_index.sorted_ordinals[bisect.bisect_right(sorted_values, value):]
+                elif op == '>=':
+                    ordinals = field_index.sorted_ordinals[bisect.bisect_left(sorted_values, value):]
+                elif op == '<':
+                    ordinals = field_index.sorted_ordinals[:bisect.bisect_left(sorted_values, value)]
+                else:
+                    ordinals = field_index.sorted_ordinals[:bisect.bisect_right(sorted_values, value)]
+            except TypeError:
+                return None
+            return self.make_bitmap(ordinals)
+
+        if op in ('contains', '!contains') and converter.name in self.INVERTED_TYPES:
+            # the list converters compare with the first of the converted values.
+            if not is_sequence or len(value) == 0 or isinstance(value[0], (list, tuple)):
+                return None
+            field_index = self.__get_field_index(section.key, converter)
+            if field_index.inverted is None:
+                return None
+            try:
+                matched = field_index.inverted.get(value[0], 0)
+            except TypeError:
+                return None
+            if op == '!contains':
+                # unlike != and !in, cfields without the field do not match.
+                return self.__all_bitmap & ~(matched | field_index.none_bitmap)
+            return matched
+
+        return None
+
+    def iter_sorted_ordinals(self, bitmap, key, converter, reverse=False):
+        """Ordinals of the set bits in the order sorted() puts their cfields by the field, read from the sorted index
+        of the field. None when the field has no sorted index or any of them has no value for it - Nil, that sorting
+        uses for them, is not ordered with anything."""
+        if converter is None or converter.name not in self.SORTED_TYPES:
+            return None
+        field_index = self.__get_field_index(key, converter)
+        if field_index.sorted_values is None or bitmap & field_index.none_bitmap:
+            return None
+        return self.__iter_sorted_ordinals(bitmap, field_index, reverse)
+
+    def __iter_sorted_ordinals(self, bitmap, field_index, reverse):
+        bitmap_bytes = bitmap.to_bytes((len(self.__ordered_cfields) + 7) // 8, 'little')
+        sorted_values = field_index.sorted_values
+        sorted_ordinals = field_index.sorted_ordinals
+        if not reverse:
+            for ordinal in sorted_ordinals:
+                if bitmap_bytes[ordinal >> 3] >> (ordinal & 7) & 1:
+                    yield ordinal
+        else:
+            # sorting in reverse keeps the equal ones in their order - runs of equal values, from the last run.
+            end = len(sorted_values)
+            while end:
+                start = bisect.bisect_left(sorted_values, sorted_values[end - 1], 0, end)
+                for ordinal in sorted_ordinals[start:end]:
+                    if bitmap_bytes[ordinal >> 3] >> (ordinal & 7) & 1:
+                        yield ordinal
+                end = start
+
+    def scan(self, section, converter, candidates):
+        """Bitmap of the `candidates` that match the query section - by comparing them one by one"""
+        ordered_cfields = self.__ordered_cfields
+        matched_ordinals = []
+        for ordinal in self.iter_ordinals(candidates):
+            field_value = ordered_cfields[ordinal].get(section.key, None)
+            if field_value is not None:
+                if converter.compare(section.comp_op, field_value, section.value):
+                    matched_ordinals.append(ordinal)
+            else:
+                if section.comp_op in ('!=', '!in'):
+                    matched_ordinals.append(ordinal)
+        return self.make_bitmap(matched_ordinals)
@@ -0,0 +1,170 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import re
+from collections import namedtuple
+from synamic.exceptions import InvalidQueryString
+from .query import QueryNode, SimpleQueryParser
+from .query_indexes import normalized_query
+
+# a query section with its value converted by the converter of its field.
+CompiledSection = namedtuple('CompiledSection', ('section', 'converter'))
+# & or | of two or more compiled sections and nodes - nested nodes of the same operator are flattened into one.
+CompiledNode = namedtuple('CompiledNode', ('logic_op', 'children'))
+
+# a :limit or :offset clause at the end of a query - after the conditions and the :sortby.
+_window_clause_pat = re.compile(r'\s*:(limit|offset)(?:\s+(\S*))?\s*$')
+
+
+def split_query_window(query_str):
+    """(the query string without its :limit and :offset clauses, limit, offset) - limit is None for no limit"""
+    window = {}
+    conditions_str = query_str
+    match = _window_clause_pat.search(conditions_str)
+    while match is not None:
+        clause, value = match.groups()
+        if clause in window:
+            raise InvalidQueryString(f'More than one :{clause} in query: {query_str}')
+        if value is None or re.fullmatch(r'[0-9]+', value) is None:
+            raise InvalidQueryString(f':{clause} must be followed by a non-negative integer in query: {query_str}')
+        window[clause] = int(value)
+        conditions_str = conditions_str[:match.start()]
+        match = _window_clause_pat.search(conditions_str)
+    return conditions_str, window.get('limit', None), window.get('offset', 0)
+
+
+class QueryPlan:
+    """A parsed query compiled against the content model of a site: the tree of the sections with their values
+    converted and their converters resolved, the sort and the window of the result."""
+    def __init__(self, root, sort, key, sort_converter=None, limit=None, offset=0):
+        self.__root = root
+        self.__sort = sort
+        self.__key = key
+        self.__sort_converter = sort_converter
+        self.__limit = limit
+        self.__offset = offset
+
+    @property
+    def root(self):
+        """CompiledNode, CompiledSection or None for a query without conditions"""
+        return self.__root
+
+    @property
+    def sort(self):
+        return self.__sort
+
+    @property
+    def sort_converter(self):
+        """Converter of the field to sort by - None when there is no sort or the model has no such field"""
+        return self.__sort_converter
+
+    @property
+    def limit(self):
+        return self.__limit
+
+    @property
+    def offset(self):
+        return self.__offset
+
+    @property
+    def key(self):
+        """normalized_query() of the parsed query with the limit and offset - None when it has none"""
+        return self.__key
+
+    @classmethod
+    def __compile_node(cls, node, content_model):
+        if isinstance(node, QueryNode):
+            children = []
+            for child in (node.left, node.right):
+                compiled_child = cls.__compile_node(child, content_model)
+                if isinstance(compiled_child, CompiledNode) and compiled_child.logic_op == node.logic_op:
+                    children.extend(compiled_child.children)
+                else:
+                    children.append(compiled_child)
+            return CompiledNode(node.logic_op, tuple(children))
+        # TODO: for converter that returns single value implement mechanism that will help use in !in for them.
+        converter = content_model[node.key].converter
+        return CompiledSection(
+            SimpleQueryParser.QuerySection(key=node.key, comp_op=node.comp_op, value=converter(node.value)),
+            converter
+        )
+
+    @classmethod
+    def compile(cls, node, sort, content_model, limit=None, offset=0):
+        root = None if node is None else cls.__compile_node(node, content_model)
+        key = normalized_query(node, sort)
+        if key is not None:
+            key = (key, limit, offset)
+        sort_converter = None
+        if sort is not None:
+            sort_field = content_model.get(sort.by_key, None)
+            if sort_field is not None:
+                sort_converter = sort_field.converter
+        return cls(root, sort, key, sort_converter=sort_converter, limit=limit, offset=offset)
+
+    def evaluate(self, query_indexes):
+        """Bitmap (see QueryIndexes) of the matching cfields"""
+        if self.__root is None:
+            return query_indexes.all_bitmap
+        return self.__evaluate(self.__root, query_indexes, query_indexes.all_bitmap)
+
+    @classmethod
+    def __evaluate(cls, compiled, query_indexes, candidates):
+        """Bitmap of the `candidates` that match `compiled`. Sections that no index answers are compared only with
+        the candidates left after everything else - an & stops as soon as nothing is left, an | as soon as everything
+        matched."""
+        if isinstance(compiled, CompiledSection):
+            matched = query_indexes.lookup(compiled.section, compiled.converter)
+            if matched is None:
+                return query_indexes.scan(compiled.section, compiled.converter, candidates)
+            return matched & candidates
+
+        deferred_sections = []
+        if compiled.logic_op == '&':
+            remaining = candidates
+            for child in compiled.children:
+                if isinstance(child, CompiledSection):
+                    matched = query_indexes.lookup(child.section, child.converter)
+                    if matched is None:
+                        deferred_sections.append(child)
+                        continue
+                    remaining &= matched
+                else:
+                    remaining = cls.__evaluate(child, query_indexes, remaining)
+                if not remaining:
+                    return 0
+            for child in deferred_sections:
+                remaining = query_indexes.scan(child.section, child.converter, remaining)
+                if not remaining:
+                    return 0
+            return remaining
+        else:
+            assert compiled.logic_op == '|'
+            matched_all = 0
+            unmatched = candidates
+            for child in compiled.children:
+                if isinstance(child, CompiledSection):
+                    matched = query_indexes.lookup(child.section, child.converter)
+                    if matched is None:
+                        deferred_sections.append(child)
+                        continue
+                    matched &= unmatched
+                else:
+                    matched = cls.__evaluate(child, query_indexes, unmatched)
+                matched_all |= matched
+                unmatched &= ~matched
+                if not unmatched:
+                    return matched_all
+            for child in deferred_sections:
+                matched = query_indexes.scan(child.section, child.converter, unmatched)
+                matched_all |= matched
+                unmatched &= ~matched
+                if not unmatched:
+                    break
+            return matched_all
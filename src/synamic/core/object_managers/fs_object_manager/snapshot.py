@@ -0,0 +1,182 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Snapshots of the loaded state of sites - the object manager's cache of a site pickled into the site's cache dir.
+The live objects that the cached objects refer to (synamic, sites, services, path trees, ...) are not pickled but
+referred to by tokens, so that the restored objects refer to the live objects of the restoring process.
+"""
+import os
+import io
+import pickle
+from .build_manifest import file_signature
+
+_DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                 'default_data')
+
+
+def _live_objects(synamic):
+    """Token to live object"""
+    live_objects = {
+        ('synamic', ): synamic,
+        ('object_manager', ): synamic.object_manager,
+        ('default_data', ): synamic.default_data,
+        ('path_tree', ): synamic.path_tree,
+        ('sites', ): synamic.sites,
+        ('router', ): synamic.router,
+        ('upload_manager', ): synamic.upload_manager,
+    }
+    for site_id in synamic.sites.ids:
+        site = synamic.sites.get_by_id(site_id, load=False)
+        comps = site_id.components
+        live_objects[('site', comps)] = site
+        live_objects[('site_object_manager', comps)] = site.object_manager
+        live_objects[('site_path_tree', comps)] = site.path_tree
+        live_objects[('site_cpaths', comps)] = site.cpaths
+        live_objects[('site_menus', comps)] = site.menu
+        live_objects[('site_users', comps)] = site.user
+        live_objects[('site_data', comps)] = site.data
+        for service_name in site.service_names:
+            live_objects[('site_service', comps, service_name)] = site.get_service(service_name)
+    return live_objects
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file, live_objects):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__tokens = {id(obj): token for token, obj in live_objects.items()}
+
+    def persistent_id(self, obj):
+        return self.__tokens.get(id(obj), None)
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, live_objects):
+        super().__init__(file)
+        self.__live_objects = live_objects
+
+    def persistent_load(self, pid):
+        try:
+            return self.__live_objects[pid]
+        except KeyError:
+            # e.g. a site that does not exist anymore - the snapshot is useless.
+            raise pickle.UnpicklingError(f'Live object {pid} not found')
+
+
+def _list_site_paths(abs_dir, exclude_dirs):
+    """Every file and directory under `abs_dir` - without the `exclude_dirs` and hidden directories (e.g. .git)"""
+    exclude_dirs = {os.path.normcase(os.path.abspath(d)) for d in exclude_dirs}
+    paths = [abs_dir]
+    for dir_path, dir_names, file_names in os.walk(abs_dir):
+        dir_names[:] = [
+            dn for dn in dir_names
+            if not dn.startswith('.') and os.path.normcase(os.path.join(dir_path, dn)) not in exclude_dirs
+        ]
+        for name in dir_names:
+            paths.append(os.path.join(dir_path, name))
+        for fn in file_names:
+            paths.append(os.path.join(dir_path, fn))
+    return paths
+
+
+def changed_input_paths(signatures):
+    """Abs paths of the files and dirs of `signatures` ({abs path: signature}) that changed or were removed since and
+    of the ones added since - those are found in the changed directories they were added to."""
+    changed_paths = {abs_path for abs_path, signature in signatures.items() if file_signature(abs_path) != signature}
+    for abs_path in list(changed_paths):
+        if os.path.isdir(abs_path):
+            for entry in os.scandir(abs_path):
+                if entry.path not in signatures and not (entry.name.startswith('.') and entry.is_dir()):
+                    changed_paths.add(entry.path)
+    return changed_paths
+
+
+def contents_changed_only(changed_paths, contents_abs_path, marked_extensions):
+    """Whether every changed path is the contents dir, a directory under it or a marked content file in it - e.g. not
+    a dir meta, template or settings file"""
+    def normalized(abs_path):
+        return os.path.normcase(os.path.normpath(abs_path))
+    contents_abs_path = normalized(contents_abs_path)
+    for abs_path in changed_paths:
+        abs_path = normalized(abs_path)
+        if not (abs_path + os.sep).startswith(contents_abs_path + os.sep):
+            return False
+        extension = os.path.splitext(abs_path)[1][1:].lower()
+        if not os.path.isdir(abs_path) and extension not in marked_extensions:
+            return False
+    return True
+
+
+def site_input_signatures(site):
+    """{abs path: [size, mtime in nanoseconds]} of every file that the loaded state of a site can come from - the files
+    of the site and of its ancestors (without their sites, cache, outputs and hidden dirs) and the default data of
+    synamic. Directories are in it too: adding or removing a file changes the signature of its directory."""
+    outputs_abs_path = site.synamic.path_tree.create_dir_cpath(
+        site.synamic.system_settings['dirs.outputs.outputs']
+    ).abs_path
+    abs_paths = _list_site_paths(_DEFAULT_DATA_DIR, ())
+    for specific_site in site.object_manager.sites_up():
+        cpaths = specific_site.cpaths
+        abs_paths.extend(_list_site_paths(
+            specific_site.abs_root_path,
+            exclude_dirs=(cpaths.sites_cdir.abs_path, cpaths.cache_cdir.abs_path, outputs_abs_path)
+        ))
+    return {abs_path: file_signature(abs_path) for abs_path in abs_paths}
+
+
+class SiteSnapshot:
+    """Saves the loaded state of a site with the signatures of the files it came from. Restoring stats only those
+    files (no walking of the site) and tells which of them changed - what did not come from them stays valid."""
+    file_name = 'snapshot.pickle'
+    # must be increased whenever the pickled classes or what is cached during load change.
+    version = 2
+
+    def __init__(self, site):
+        self.__site = site
+        self.__snapshot_cfile = site.cpaths.cache_cdir.join(self.file_name, is_file=True)
+        self.__signatures = None
+
+    def record_inputs(self):
+        """Takes the signatures of the input files - before loading, so that a file changed during the load is not
+        taken as the version the saved state came from."""
+        self.__signatures = site_input_signatures(self.__site)
+
+    def restore(self):
+        """(saved state, abs paths of the files and dirs that changed since) or None when there is no usable
+        snapshot. Removed and added files and their directories are among the changed paths."""
+        if not self.__snapshot_cfile.exists():
+            return None
+        try:
+            with self.__snapshot_cfile.open('rb') as f:
+                version, signatures = pickle.load(f)
+                if version != self.version:
+                    return None
+                changed_paths = changed_input_paths(signatures)
+                return _Unpickler(f, _live_objects(self.__site.synamic)).load(), changed_paths
+        except Exception as e:  # corrupted or made by different code - cannot be trusted
+            print(f'Ignoring the snapshot of site {self.__site.id}: {e!r}')
+            return None
+
+    def save(self, state):
+        """Returns False when the state could not be pickled. record_inputs() must have been called before loading the
+        state."""
+        assert self.__signatures is not None
+        buffer = io.BytesIO()
+        pickle.dump((self.version, self.__signatures), buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            _Pickler(buffer, _live_objects(self.__site.synamic)).dump(state)
+        except Exception as e:  # PicklingError, TypeError, RecursionError, ... - from objects that cannot be pickled
+            print(f'Snapshot of site {self.__site.id} could not be saved: {e!r}')
+            return False
+        # the workers of parallel builds load - and save the snapshots of - the same sites at the same time.
+        os.makedirs(self.__site.cpaths.cache_cdir.abs_path, exist_ok=True)
+        tmp_path = '%s.%d.tmp' % (self.__snapshot_cfile.abs_path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, self.__snapshot_cfile.abs_path)
+        return True
@@ -61,20 +61,20 @@ class ContentService:
     def is_type_pagination_page(cls, other):
         return isinstance(other, PaginationPage)
 
+    @classmethod
+    def is_type_static_content(cls, other):
+        return isinstance(other, StaticContent)
+
+    @classmethod
+    def is_type_marked_content(cls, other):
+        return isinstance(other, MarkedContent)
+
     def build_cfields(self, fields_syd, file_cpath):
         # get dir meta syd
         # """It should not live here as it is compile time dependency"""
         # each field from meta syd will be converted with individual content model and site type system.
-        dir_meta_file_name = self.__site.system_settings['configs.dir_meta_file_name']
-        _syd = self.__site.object_manager.empty_syd()
-        parent_cpaths = file_cpath.parent_cpaths
-        for dir_cpath in parent_cpaths:
-            dir_meta_cfile = dir_cpath.join(dir_meta_file_name, is_file=True)
-            if dir_meta_cfile.exists():
-                dir_meta_syd = self.__site.object_manager.get_syd(dir_meta_cfile)
-                _syd = _syd.merged_new(dir_meta_syd)
-        else:  # for else when loop ended normally without using break.
-            fields_syd = _syd.merged_new(fields_syd)
+        _syd = self.__site.object_manager.get_dir_meta_syd(file_cpath.parent_cpaths)
+        fields_syd = _syd.merged_new(fields_syd)
 
         # TODO: what is the document type???
         cdoctype = CDocType.HTML_DOCUMENT
@@ -90,8 +90,14 @@ class ContentService:
 
         # TODO: can the following be more systematic and agile.
         # create markers that exists in cfields/contents but not in the system
+        dependency_graph = self.__site.object_manager.get_dependency_graph()
         for marker_id in ('tags', 'categories'):
             if marker_id in fields_syd:
+                # membership of the marker depends on the content.
+                dependency_graph.add_edge(
+                    dependency_graph.marks_node(self.__site, marker_id),
+                    dependency_graph.content_node(self.__site, file_cpath)
+                )
                 marker = self.__site.object_manager.get_marker(marker_id)
                 marks = self.__site.get_service('types').get_converter('marker#' + marker_id)(fields_syd[marker_id])
                 for mark in marks:
@@ -181,7 +187,10 @@ class _ContentFields(CFieldsContract):
         else:
             per_page = per_page_4m_settings
 
-        fields = object_manager.query_cfields(query_str)
+        # pagination is converted once and cached - so, the query is recorded as an input of the content itself.
+        dependency_graph = object_manager.get_dependency_graph()
+        with dependency_graph.recording(dependency_graph.content_node(self.__site, self.cpath)):
+            fields = object_manager.query_cfields(query_str)
         origin_content = object_manager.get_marked_content(self.cpath)
         assert self is origin_content.cfields
         paginations, paginated_contents = PaginationPage.paginate_cfields(
@@ -1,8 +1,10 @@
 import re
 
+_front_matter_sep = re.compile(r'^(?P<sep>-{3,})[ \t]*$')
+
 
 def content_splitter(file_path, content_text):
-    front_matter_sep = re.compile(r'^(?P<sep>-{3,})[ \t]*$')
+    front_matter_sep = _front_matter_sep
     lines = content_text.splitlines()
     front_matter_lines = []
     body_lines = []
@@ -42,3 +44,58 @@ def content_splitter(file_path, content_text):
         raise Exception('Front matter section was not found. File name: %s' % file_path.relative_path)
 
     return '\n'.join(front_matter_lines), '\n'.join(body_lines)
+
+
+def front_matter_splitter(file_path, byte_lines, encoding='utf-8'):
+    """Splits like content_splitter() but from the byte lines of a marked file (e.g. the file opened in binary mode)
+    and does not go past the front matter. Returns the front matter text and the byte offset of the body in the file.
+    The body is the text after that offset with the line endings normalized, as content_splitter() returns it."""
+    front_matter_sep = _front_matter_sep
+    front_matter_lines = []
+    sep = None
+    offset = 0
+    idx = 0
+    for byte_line in byte_lines:
+        # splitting the decoded line again, as str.splitlines() knows more line boundaries than bytes do.
+        for line_w_end in byte_line.decode(encoding).splitlines(keepends=True):
+            line = line_w_end.splitlines()[0]
+            offset += len(line_w_end.encode(encoding))
+            if sep is None:
+                front_matter_match = front_matter_sep.match(line)
+                if line.strip() == '':
+                    pass
+                elif front_matter_match:
+                    sep = front_matter_match.group('sep')
+                else:
+                    raise Exception('Invalid text before front matter section started. '
+                                    'Parsing error at line %d. File name: %s' % (idx + 1, file_path.relative_path))
+            elif line.strip() == sep:
+                return '\n'.join(front_matter_lines), offset
+            else:
+                front_matter_lines.append(line)
+            idx += 1
+    raise Exception('Front matter section was not found. File name: %s' % file_path.relative_path)
+
+
+def scan_front_matter(file_path, encoding='utf-8'):
+    """Reads a marked file only up to the end of its front matter - the body is not touched. Returns the front matter
+    text, the byte offset of the body and the bytes before the body."""
+    header_lines = []
+
+    def byte_lines(f):
+        for byte_line in f:
+            header_lines.append(byte_line)
+            yield byte_line
+
+    with open(file_path.abs_path, 'rb') as f:
+        front_matter, body_offset = front_matter_splitter(file_path, byte_lines(f), encoding=encoding)
+    # the last line can go past the offset when the separator line does not end with a new line character.
+    return front_matter, body_offset, b''.join(header_lines)[:body_offset]
+
+
+def read_body(file_path, body_offset, encoding='utf-8'):
+    """Body of a marked file from the offset found by front_matter_splitter()"""
+    with open(file_path.abs_path, 'rb') as f:
+        f.seek(body_offset)
+        body = f.read().decode(encoding)
+    return '\n'.join(body.splitlines())
@@ -87,6 +87,11 @@ class MarkedContent(ContentContract):
         self.__render_body()
         return self.__toc
 
+    def release_rendered(self):
+        """Drops the rendered body and toc - they are rendered again when needed"""
+        self.__body = None
+        self.__toc = None
+
     def __getitem__(self, key):
         return self.__cfields[key]
 
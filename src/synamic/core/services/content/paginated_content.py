@@ -48,6 +48,10 @@ class PaginatedContent(ContentContract):
     def cfields(self):
         return self.__cfields
 
+    @property
+    def origin_cfields(self):
+        return self.__origin_cfields
+
     def __getitem__(self, key):
         return self.__cfields[key]
 
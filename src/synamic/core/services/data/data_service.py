@@ -125,7 +125,9 @@ class DataService:
     def get_data_names(self):
         names = []
         if self.__data_cdir.exists():
-            data_file_cpaths = self.__data_cdir.list_files(checker=lambda cp: cp.basename.lower().endswith(self.__available_extensions))
+            data_file_cpaths = self.__site.object_manager.list_files(
+                self.__data_cdir, checker=lambda cp: cp.basename.lower().endswith(self.__available_extensions)
+            )
             for file_cpath in data_file_cpaths:
                 basename_wo_ext = file_cpath.basename_wo_ext
                 names.append(basename_wo_ext)
@@ -9,16 +9,16 @@
 """
 
 from synamic.core.standalones.functions.decorators import not_loaded, loaded
-from PIL import Image
 from synamic.core.services.image_resizer.resized_image_content import ResizedImageContent
 
 
 class ImageResizerService:
+    # names of the PIL.Image flags - PIL is imported only when an image is resized.
     __algo_map = {
-        'nearest': Image.NEAREST,
-        'bicubic': Image.BICUBIC,
-        'bilinear': Image.BILINEAR,
-        'lanczos': Image.LANCZOS
+        'nearest': 'NEAREST',
+        'bicubic': 'BICUBIC',
+        'bilinear': 'BILINEAR',
+        'lanczos': 'LANCZOS'
     }
 
     def __init__(self, site):
@@ -36,11 +36,12 @@ class ImageResizerService:
 
     @classmethod
     def __get_algorithm_flag(cls, algorithm):
+        from PIL import Image
         algorithm = algorithm.lower()
         if algorithm not in cls.__algo_map:
             algorithm_flag = Image.BICUBIC
         else:
-            algorithm_flag = cls.__algo_map[algorithm]
+            algorithm_flag = getattr(Image, cls.__algo_map[algorithm])
         return algorithm_flag
 
     @loaded
@@ -1,6 +1,5 @@
 import mimetypes
 import re
-from PIL import Image
 from synamic.core.contracts.content import ContentContract, CDocType
 from synamic.core.synamic.router.url import ContentUrl
 from io import BytesIO
@@ -73,6 +72,7 @@ class ResizedImageContent(ContentContract):
         return None
 
     def get_stream(self):
+        from PIL import Image
         img = Image.open(self.__original_image_path.abs_path)
         new_img = img.resize((self.width, self.height), Image.BICUBIC)
         bio = BytesIO()
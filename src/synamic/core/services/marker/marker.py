@@ -115,6 +115,8 @@ class _Mark:
         return self.cfields.curl
 
     def __marker_content_renderer(self, site, gen_content):
+        dependency_graph = site.object_manager.get_dependency_graph()
+        dependency_graph.record(dependency_graph.marks_node(site, self.__marker.id))
         site_settings = site.settings
         template_service = site.get_service('templates')
         user_template_name = site_settings['templates.mark']
@@ -249,6 +251,8 @@ class Marker:
 
     @property
     def marks(self):
+        dependency_graph = self.__site.object_manager.get_dependency_graph()
+        dependency_graph.record(dependency_graph.marks_node(self.__site, self.__id))
         return tuple(self.__marks)
 
     def get_mark_by_id(self, id, default=None):
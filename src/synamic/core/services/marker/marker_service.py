@@ -25,7 +25,9 @@ class MarkerService:
 
         _ = []
         if markers_cdir.exists():
-            marker_cpaths = markers_cdir.list_files(checker=lambda cp: cp.basename.endswith('.syd'))
+            marker_cpaths = self.__site.object_manager.list_files(
+                markers_cdir, checker=lambda cp: cp.basename.endswith('.syd')
+            )
             for cp in marker_cpaths:
                 _.append(cp.basename[:-len('.syd')])
         ids = tuple(_)
@@ -87,7 +87,7 @@ class MenuService:
         menu_names = []
         menu_cdir = self.__site.cpaths.menus_cdir
         if menu_cdir.exists():
-            menu_cfiles = menu_cdir.list_files(depth=1)
+            menu_cfiles = self.__site.object_manager.list_files(menu_cdir, depth=1)
             for menu_cfile in menu_cfiles:
                 basename = menu_cfile.basename
                 if basename.lower().endswith('.syd'):
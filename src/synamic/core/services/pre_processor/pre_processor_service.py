@@ -30,7 +30,7 @@ class PreProcessorService:
         # load builtin processor
         preprocess_cdir = self.__site.cpaths.pre_process_cdir
         if preprocess_cdir.exists():
-            cdirs = preprocess_cdir.list_dirs(depth=1)
+            cdirs = self.__site.object_manager.list_dirs(preprocess_cdir, depth=1)
             for cdir in cdirs:
                 processor_name = cdir.basename
                 if processor_name in _builtin_processor_classes:
@@ -7,10 +7,7 @@
     email: "md.sabuj.sarker@gmail.com"
     status: "Development"
 """
-import jinja2
-from synamic.core.services.template.template_tags import GetCExtension, ResizeImageExtension
 from synamic.core.standalones.functions.decorators import loaded, not_loaded
-from .loaders import SynamicJinjaFileSystemLoader
 from synamic.exceptions import SynamicTemplateError
 
 
@@ -29,30 +26,39 @@ class SynamicTemplateService:
     @property
     @loaded
     def template_loader(self):
+        self.__get_template_env()
         return self.__template_loader
 
     @loaded
     def get_template_cfile(self, template_name):
-        return self.__template_loader.get_template_cfile(template_name)
+        return self.template_loader.get_template_cfile(template_name)
+
+    def __get_template_env(self):
+        """The jinja environment is made, and jinja2 imported, when the first template is needed - loading sites for
+        anything other than rendering does not pay for it."""
+        if self.__template_env is None:
+            import jinja2
+            from synamic.core.services.template.template_tags import GetCExtension, ResizeImageExtension
+            from .loaders import SynamicJinjaFileSystemLoader
+            self.__template_loader = SynamicJinjaFileSystemLoader(self.__site)
+
+            self.__template_env = jinja2.Environment(
+                loader=self.__template_loader,
+                autoescape=jinja2.select_autoescape(['html', 'xml']),
+                extensions=[GetCExtension, ResizeImageExtension]
+            )
+            # setting config object to global of environment
+            self.__template_env.site_object = self.__site
+            # self.__template_env.globals['site'] = self.__site
+        return self.__template_env
 
     @not_loaded
     def load(self):
-        self.__template_loader = SynamicJinjaFileSystemLoader(self.__site)
-
-        self.__template_env = jinja2.Environment(
-            loader=self.__template_loader,
-            autoescape=jinja2.select_autoescape(['html', 'xml']),
-            extensions=[GetCExtension, ResizeImageExtension]
-        )
-        # setting config object to global of environment
-        self.__template_env.site_object = self.__site
-        # self.__template_env.globals['site'] = self.__site
-
         # themes
         system_settings = self.__site.synamic.system_settings
         template_cdir = self.__site.cpaths.templates_cdir
         if template_cdir.exists():
-            t_cdirs = template_cdir.list_dirs(depth=1)  # 1 or 0?
+            t_cdirs = self.__site.object_manager.list_dirs(template_cdir, depth=1)  # 1 or 0?
             for theme_cdir in t_cdirs:
                 theme_syd_cfile = theme_cdir.join_as_cfile(system_settings['theme.info_file'])
                 if theme_syd_cfile.exists():
@@ -65,6 +71,30 @@ class SynamicTemplateService:
     def is_loaded(self):
         return self.__is_loaded
 
+    def __record_template(self, template_name):
+        """Records the template as a dependency of what is being rendered. The edges to its file and the templates it
+        extends, includes or imports (the ones with constant names) are added once."""
+        import jinja2.meta
+        dependency_graph = self.__site.object_manager.get_dependency_graph()
+        template_node = dependency_graph.template_node(self.__site, template_name)
+        dependency_graph.record(template_node)
+        if dependency_graph.direct_dependencies(template_node):
+            return
+        try:
+            source, filename, _ = self.__template_loader.get_source(self.__template_env, template_name)
+        except jinja2.exceptions.TemplateNotFound:
+            return
+        if filename is not None:
+            dependency_graph.add_edge(template_node, dependency_graph.file_node(filename))
+        try:
+            referenced_names = jinja2.meta.find_referenced_templates(self.__template_env.parse(source))
+        except jinja2.exceptions.TemplateSyntaxError:
+            return
+        for referenced_name in referenced_names:
+            if referenced_name is not None:
+                with dependency_graph.recording(template_node):
+                    self.__record_template(referenced_name)
+
     # def exists(self, template_name):
     #     return True if os.path.exists(os.path.join(self.__site.template_dir, template_name)) else False
 
@@ -75,9 +105,18 @@ class SynamicTemplateService:
 
         # is_from_parent, template_name = parent_config_str_splitter(template_name)
 
+        import jinja2
+        template_env = self.__get_template_env()
+        self.__record_template(template_name)
+        profiler = self.__site.object_manager.get_build_profiler()
         try:
-            template = self.__template_env.get_template(template_name)
-            result = template.render(context)
+            if profiler is None:
+                template = template_env.get_template(template_name)
+                result = template.render(context)
+            else:
+                with profiler.measure(profiler.TEMPLATES, template_name):
+                    template = template_env.get_template(template_name)
+                    result = template.render(context)
         except jinja2.exceptions.TemplateError as e:
             raise SynamicTemplateError(e)
 
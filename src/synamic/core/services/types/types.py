@@ -9,7 +9,6 @@
 """
 
 from markupsafe import Markup
-from synamic.core.standalones.functions.md import render_content_markdown
 
 
 class Html:
@@ -60,6 +59,8 @@ class Markdown:
     @property
     def rendered_markdown(self):
         if self.__rendered_text is None:
+            # the markdown renderer is imported when the first markdown is rendered.
+            from synamic.core.standalones.functions.md import render_content_markdown
             self.__rendered_text = render_content_markdown(self.__site, self.__md_str, value_pack=self.__value_pack, md_cpath=self.__md_cpath, cfields=self.__cfields)
         return self.__rendered_text
 
@@ -42,7 +42,7 @@ class UserService:
         user_ids = []
         users_cdir = self.__users_cdir
         if users_cdir.exists():
-            user_cfiles = users_cdir.list_files(depth=1)
+            user_cfiles = self.__site.object_manager.list_files(users_cdir, depth=1)
             for menu_cfile in user_cfiles:
                 basename = menu_cfile.basename
                 if basename.lower().endswith('.syd'):
@@ -46,5 +46,15 @@ class _Nil:
     def __getattr__(self, item):
         return self
 
+    def __reduce__(self):
+        # unpickles to the one Nil.
+        return 'Nil'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 
 Nil = _Nil()
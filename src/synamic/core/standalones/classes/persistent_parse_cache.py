@@ -0,0 +1,127 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+import os
+import pickle
+import hashlib
+
+
+class PersistentParseCache:
+    """On disk cache of what was parsed out of files, one pickle file for all the entries.
+    An entry is valid while the size and mtime of its file stay the same. When only the mtime changed (e.g. a fresh
+    checkout) the bytes the value was parsed from are read again and their hash decides.
+    Values are kept pickled until asked for, so loading the cache does not build every value."""
+    def __init__(self, cache_file_path, version):
+        self.__cache_file_path = cache_file_path
+        self.__version = version
+        self.__entries = {
+            # key: (size, mtime_ns, length of the parsed bytes, sha1 of them, pickled value)
+        }
+        self.__hits = 0
+        self.__misses = 0
+        self.__is_dirty = False
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def keys(self):
+        return tuple(self.__entries.keys())
+
+    def load(self):
+        """Entries of a different version or of an unreadable cache file are dropped silently"""
+        try:
+            with open(self.__cache_file_path, 'rb') as f:
+                version, entries = pickle.load(f)
+        except FileNotFoundError:
+            return self
+        except Exception:  # corrupted, truncated or made by an incompatible python
+            self.__is_dirty = True
+            return self
+        if version == self.__version:
+            self.__entries = entries
+        else:
+            self.__is_dirty = True
+        return self
+
+    @staticmethod
+    def bytes_digest(data):
+        return hashlib.sha1(data).hexdigest()
+
+    def get(self, key, abs_path, default=None):
+        entry = self.__entries.get(key, None)
+        if entry is not None:
+            size, mtime_ns, length, digest, pickled_value = entry
+            try:
+                stat = os.stat(abs_path)
+            except OSError:
+                stat = None
+            if stat is not None and stat.st_size == size:
+                is_valid = stat.st_mtime_ns == mtime_ns
+                if not is_valid:
+                    with open(abs_path, 'rb') as f:
+                        is_valid = self.bytes_digest(f.read(length)) == digest
+                    if is_valid:
+                        self.__entries[key] = (size, stat.st_mtime_ns, length, digest, pickled_value)
+                        self.__is_dirty = True
+                if is_valid:
+                    self.__hits += 1
+                    return pickle.loads(pickled_value)
+        self.__misses += 1
+        return default
+
+    def put(self, key, abs_path, value, data=None, length=None, digest=None):
+        """`data`: the bytes at the start of the file at `abs_path` that the value was parsed from - the whole file or
+        only a header of it. Their `length` and bytes_digest() can be provided instead when the bytes are not at hand.
+        Values that cannot be pickled are not cached."""
+        assert data is not None or (length is not None and digest is not None)
+        try:
+            pickled_value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self.__entries.pop(key, None)
+            return False
+        stat = os.stat(abs_path)
+        if data is not None:
+            length, digest = len(data), self.bytes_digest(data)
+        self.__entries[key] = (stat.st_size, stat.st_mtime_ns, length, digest, pickled_value)
+        self.__is_dirty = True
+        return True
+
+    def retain(self, keys):
+        """Drops the entries of the keys that are not in `keys` - of deleted files"""
+        keys = set(keys)
+        for key in tuple(self.__entries.keys()):
+            if key not in keys:
+                del self.__entries[key]
+                self.__is_dirty = True
+
+    def clear(self):
+        if self.__entries:
+            self.__entries = {}
+            self.__is_dirty = True
+
+    def save(self):
+        if not self.__is_dirty:
+            return
+        dir_path = os.path.dirname(self.__cache_file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        # per process - more than one process can save the same cache.
+        tmp_path = '%s.%d.tmp' % (self.__cache_file_path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((self.__version, self.__entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.__cache_file_path)
+        self.__is_dirty = False
@@ -144,6 +144,10 @@ class _Site(SiteContract):
             return default
         return service
 
+    @property
+    def service_names(self):
+        return tuple(self.__services_container.keys())
+
     def add_service(self, service_name, service_class, init_args=(), init_kwargs=None):
         if init_kwargs is None:
             init_kwargs = {}
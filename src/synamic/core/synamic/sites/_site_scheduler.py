@@ -0,0 +1,114 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+
+Builds sites in separate processes. A site is started as soon as its parent is built, so siblings are built side by side
+and the total time follows the deepest chain of sites instead of the number of sites.
+"""
+import queue
+import traceback
+import multiprocessing
+from synamic.core.synamic._dependency_resolver import create_dep_list
+from synamic.core.object_managers.fs_object_manager.output_sync import OutputSync
+from synamic.exceptions import SynamicError
+
+
+class _SiteDependency:
+    """What create_dep_list() expects - a name and the names it depends on. The name is the site id components."""
+    def __init__(self, site_id_comps):
+        self.name = site_id_comps
+        self.dependencies = [site_id_comps[:-1]] if site_id_comps else []
+
+
+def site_build_order(sites_id_comps):
+    """Site id components in parent before child order. Ancestors that are not listed are added."""
+    deps = {}
+    for site_id_comps in sites_id_comps:
+        site_id_comps = tuple(site_id_comps)
+        for i in range(len(site_id_comps) + 1):
+            deps.setdefault(site_id_comps[:i], _SiteDependency(site_id_comps[:i]))
+    return create_dep_list(deps)
+
+
+def _load_and_build_site(root_site_root, env, dev_params, site_id_comps, sync, build_kwargs):
+    """Runs in a worker process: loads the site and its ancestors only, then builds the site.
+    Returns (site id components, succeeded, error message, output paths) - output paths are collected only when
+    `sync`."""
+    try:
+        from synamic.core.synamic import Synamic
+        synamic = Synamic(root_site_root)
+        # the workers load and build with the settings of the main process - except for parsing in parallel: workers
+        # of a pool are daemonic and cannot start processes of their own.
+        synamic.env.update(env)
+        synamic.env['parse_workers'] = None
+        synamic.set_dev_params(**dev_params)
+        synamic.load(site_ids=[site_id_comps])
+        site = synamic.sites.get_by_id(site_id_comps)
+        output_sync = OutputSync(root_site_root) if sync else None
+        succeeded = site.object_manager.build(output_sync=output_sync, **build_kwargs)
+        return site_id_comps, succeeded, None, () if output_sync is None else tuple(output_sync.produced_paths)
+    except SynamicError as e:
+        return site_id_comps, False, str(e), ()
+    except Exception:
+        return site_id_comps, False, traceback.format_exc(), ()
+
+
+class SiteScheduler:
+    """Builds every site in its own process with at most `processes` of them at a time. Each process loads only the
+    site it builds and the ancestors of it."""
+    def __init__(self, synamic, processes):
+        assert processes > 0
+        self.__synamic = synamic
+        self.__processes = processes
+
+    def build(self, sites_id_comps, output_sync=None, on_site_start=None, **build_kwargs):
+        """Returns a tuple of (succeeded, {site id components: error message}). Children of a failed site are not
+        built. Outputs of the sites are added to the `output_sync` when provided.
+        `on_site_start`: called with the site id components of every site when it is sent to a worker."""
+        order = site_build_order(sites_id_comps)
+        children = {site_id_comps: [] for site_id_comps in order}
+        for site_id_comps in order:
+            if site_id_comps:
+                children[site_id_comps[:-1]].append(site_id_comps)
+
+        finished = queue.Queue()
+        errors = {}
+        # a process is used once - the loaded sites and their caches are not kept around.
+        pool = multiprocessing.Pool(processes=self.__processes, maxtasksperchild=1)
+        try:
+            def submit(site_id_comps):
+                if on_site_start is not None:
+                    on_site_start(site_id_comps)
+                pool.apply_async(
+                    _load_and_build_site,
+                    (self.__synamic.abs_root_path, dict(self.__synamic.env), self.__synamic.dev_params, site_id_comps,
+                     output_sync is not None, build_kwargs),
+                    callback=finished.put,
+                    error_callback=lambda e: finished.put((site_id_comps, False, repr(e), ()))
+                )
+
+            pending = 1
+            submit(order[0])
+            while pending:
+                site_id_comps, succeeded, error, output_paths = finished.get()
+                pending -= 1
+                if succeeded:
+                    if output_sync is not None:
+                        output_sync.update_produced(output_paths)
+                    for child_id_comps in children[site_id_comps]:
+                        submit(child_id_comps)
+                        pending += 1
+                else:
+                    errors[site_id_comps] = error or 'Build failed'
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        return not errors, errors
@@ -9,6 +9,9 @@ import shutil
 from collections import OrderedDict
 from synamic.core.synamic.sites._site import _Site
 from synamic.core.default_data._manager import DefaultDataManager
+from synamic.core.object_managers.fs_object_manager.parallel_build import ParallelBuilder
+from synamic.core.object_managers.fs_object_manager.output_sync import OutputSync
+from synamic.core.synamic.sites._site_scheduler import SiteScheduler, site_build_order
 from synamic.core.standalones.functions.decorators import loaded, not_loaded
 from synamic.exceptions import SynamicError, SynamicErrors
 
@@ -25,6 +28,8 @@ class Sites:
             #  site_id: site
         })  # must be ordered dict to keep serial of adding intact.
         self.__root_site = None
+        self.__is_lazy = False
+        self.__loading_site_ids = set()
         self.__is_loaded = False
 
         # adding the root site
@@ -38,6 +43,10 @@ class Sites:
     def is_loaded(self):
         return self.__is_loaded
 
+    @property
+    def is_lazy(self):
+        return self.__is_lazy
+
     @property
     def ids(self):
         return tuple(self.__sites_map.keys())
@@ -63,18 +72,34 @@ class Sites:
         site_id = self.make_id(site_id)
         return self.get_by_id(site_id).abs_path
 
+    def list_site_id_comps(self):
+        """Id components of all the child sites, parents before children - the root site is not included"""
+        # this implements the default sites dire mechanism - externally located site is not implemented yet.
+        children_site_comps_ids = []
+        self.__list_site_paths(children_site_comps_ids, tuple(), '')
+        return tuple(children_site_comps_ids)
+
     @not_loaded
-    def load(self):
+    def load(self, site_ids=None, lazy=False):
+        """`site_ids`: when provided, only these sites and their ancestors are loaded.
+        `lazy`: sites are not loaded now - a site is loaded along with its ancestors when it is first got through
+        get_by_id() or root_site."""
         assert os.path.exists(self.__root_site_path)
         # default configs
         self.__default_data = DefaultDataManager()
 
         # list all the site id components paths
-        # this implements the default sites dire mechanism - externally located site is not implemented yet.
-        children_site_comps_ids = []
-        _subsites_dirname = self.__synamic.system_settings['configs.subsites_dir']
-        self.__list_site_paths(children_site_comps_ids, tuple(), '')
-        __sites_id_comps = tuple(children_site_comps_ids)
+        __sites_id_comps = self.list_site_id_comps()
+        if site_ids is not None:
+            existing_sites_id_comps = set(__sites_id_comps)
+            selected_sites_id_comps = []
+            for site_id in site_ids:
+                site_id_comps = self.make_id(site_id).components
+                if site_id_comps and site_id_comps not in existing_sites_id_comps:
+                    raise KeyError('Site with id %s not found' % self.make_id(site_id))
+                selected_sites_id_comps.append(site_id_comps)
+            # the root site is always there - it was added in the constructor.
+            __sites_id_comps = site_build_order(selected_sites_id_comps)[1:]
         for site_id_comps in __sites_id_comps:
             site_id = self.make_id(site_id_comps)
             parent_site_id = site_id.parent_id
@@ -86,23 +111,43 @@ class Sites:
             site = self.make_site(site_id, site_root_abs_path, parent_site=parent_site, root_site=root_site)
             self.add_site(site)
         # load all the sites.
-        for site in self.__sites_map.values():
-            site.load()
+        self.__is_lazy = lazy
+        if not lazy:
+            for site in self.__sites_map.values():
+                site.load()
         self.__is_loaded = True
         return self
 
+    def __get_loaded(self, site):
+        """Loads the site - after its ancestors - when the sites are loaded lazily and it is not loaded yet"""
+        if self.__is_lazy and self.__is_loaded and not site.is_loaded and site.id not in self.__loading_site_ids:
+            # a site can get itself by id while loading.
+            self.__loading_site_ids.add(site.id)
+            try:
+                if site.parent is not None:
+                    self.__get_loaded(site.parent)
+                site.load()
+            finally:
+                self.__loading_site_ids.discard(site.id)
+            if not self.__loading_site_ids:
+                # after the site and its ancestors - synamic saved before any of them were loaded.
+                self.__synamic.save_syd_caches()
+        return site
+
     @property
     def root_site(self):
-        return self.__root_site
+        return self.__get_loaded(self.__root_site)
 
     @property
     def root_site_path(self):
         return self.__root_site_path
 
-    def get_by_id(self, site_id):
+    def get_by_id(self, site_id, load=True):
+        """`load`: whether a site that is not loaded yet (lazily loaded sites) is loaded before returning"""
         site_id = self.make_id(site_id)
         if site_id in self.__sites_map:
-            return self.__sites_map[site_id]
+            site = self.__sites_map[site_id]
+            return self.__get_loaded(site) if load else site
         raise KeyError('Site with id %s not found' % site_id)
 
     def __get_real_site_path_comps(self, site_virtual_comps: tuple):
@@ -144,13 +189,18 @@ class Sites:
 
     @loaded
     def clean_output_dir(self):
-        # clean output directory
+        self.__clean_output_dir()
 
+    def __get_output_abs_path(self):
         output_dir = self.__synamic.system_settings['dirs.outputs.outputs']
         output_cdir = self.__synamic.path_tree.create_dir_cpath(output_dir)
         if not output_cdir.exists():
             output_cdir.makedirs()
-        output_abs_path = output_cdir.abs_path
+        return output_cdir.abs_path
+
+    def __clean_output_dir(self):
+        # clean output directory
+        output_abs_path = self.__get_output_abs_path()
         # except_root_paths = ('.git', '.gitignore', '.gitattributes') // let's remove these too.  TODO: 25 Sep 2019
         #  modded this, let's see what happens.
         except_root_paths = ()
@@ -165,27 +215,93 @@ class Sites:
                     shutil.rmtree(full_path)
 
     @loaded
-    def build(self, clean=True):
+    def build(self, clean=True, workers=None, incremental=False, static_emit='auto', profile=False, profile_top=20,
+              sync=False):
+        """`workers`: when more than 1, contents of every site are rendered and written by that many worker
+        processes.
+        `incremental`: the output directory is not cleaned, outputs that are up to date according to the build
+        manifest in each site's cache dir are skipped and outputs that are no longer produced are removed.
+        `static_emit`: how static files are emitted - auto, hardlink, reflink, copy_file_range, sendfile or copy.
+        `profile`: wall and cpu times per url, per template and per load phase are reported for every site - top
+        `profile_top` of each are printed and all of them are saved to build_profile.json in the site's cache dir.
+        `sync`: the output directory is not cleaned - only the outputs whose bytes changed are written and the files
+        that no sites produced are removed after a successful build. Unchanged files keep their mtimes."""
         try:
-            if clean:
+            output_sync = OutputSync(self.__get_output_abs_path()) if sync else None
+            if clean and not incremental and not sync:
                 self.clean_output_dir()
             # build sites
-            build_succeeded = True
-            for site_id, site in self.__sites_map.items():
-                print(f'>>> Building Site: {site_id}\n\n')
-                build_succeeded = site.object_manager.build()
-                if not build_succeeded:
-                    build_succeeded = False
-                    break
+            if workers is not None and workers > 1:
+                with ParallelBuilder(self.__synamic, workers) as parallel_builder:
+                    build_succeeded = self.__build_sites(
+                        parallel_builder=parallel_builder, incremental=incremental, static_emit=static_emit,
+                        profile=profile, profile_top=profile_top, output_sync=output_sync
+                    )
+            else:
+                build_succeeded = self.__build_sites(
+                    incremental=incremental, static_emit=static_emit, profile=profile, profile_top=profile_top,
+                    output_sync=output_sync
+                )
+            if build_succeeded and output_sync is not None:
+                output_sync.prune()
         except SynamicError as e:
             e = SynamicErrors(
-                f'Error building sites:',
+                'Error building sites:',
                 e
             )
             print(e, file=sys.stderr)
             build_succeeded = False
         return build_succeeded
 
+    @loaded
+    def build_concurrently(self, processes, clean=True, incremental=False, static_emit='auto', profile=False,
+                           profile_top=20, sync=False):
+        """Builds every site in its own process with at most `processes` of them at a time - a site is built after its
+        parent, siblings are built side by side. Loading the sites lazily is enough, every worker loads only the site it
+        builds along with its ancestors.
+        Other parameters are the same as of build()."""
+        try:
+            output_sync = OutputSync(self.__get_output_abs_path()) if sync else None
+            if clean and not incremental and not sync:
+                self.__clean_output_dir()
+            scheduler = SiteScheduler(self.__synamic, processes)
+            build_succeeded, errors = scheduler.build(
+                ((), *self.list_site_id_comps()), output_sync=output_sync,
+                on_site_start=lambda site_id_comps: self.__print_building_site(self.make_id(site_id_comps)),
+                incremental=incremental, static_emit=static_emit, profile=profile, profile_top=profile_top
+            )
+            for site_id_comps, error in errors.items():
+                print(f'Error building site {self.make_id(site_id_comps)}:\n{error}', file=sys.stderr)
+            if build_succeeded and output_sync is not None:
+                output_sync.prune()
+        except SynamicError as e:
+            e = SynamicErrors(
+                'Error building sites:',
+                e
+            )
+            print(e, file=sys.stderr)
+            build_succeeded = False
+        return build_succeeded
+
+    def __build_sites(self, parallel_builder=None, incremental=False, static_emit='auto', profile=False,
+                      profile_top=20, output_sync=None):
+        build_succeeded = True
+        for site_id, site in self.__sites_map.items():
+            site = self.__get_loaded(site)
+            self.__print_building_site(site_id)
+            build_succeeded = site.object_manager.build(
+                parallel_builder=parallel_builder, incremental=incremental, static_emit=static_emit,
+                profile=profile, profile_top=profile_top, output_sync=output_sync
+            )
+            if not build_succeeded:
+                build_succeeded = False
+                break
+        return build_succeeded
+
+    @staticmethod
+    def __print_building_site(site_id):
+        print(f'>>> Building Site: {site_id}\n\n')
+
     @loaded
     def upload(self):
         return self.__synamic.upload_manager.get_uploader('firebase').upload()
@@ -8,11 +8,10 @@
     status: "Development"
 """
 import os
-import jinja2
 from synamic.core.contracts import AbcSynamic
 from synamic.core.synamic.sites.sites import Sites
 from synamic.core.synamic.router import RouterService
-from synamic.core.default_data import DefaultDataManager
+from synamic.core.default_data import DefaultDataManager, get_syd_cache
 from synamic.core.standalones.functions.decorators import not_loaded
 from synamic.core.object_managers import FsObjectManager
 from synamic.core.services.filesystem.path_tree import PathTree
@@ -41,7 +40,11 @@ class Synamic(AbcSynamic):
 
         # env
         self.__env = {
-            'backend': 'file'
+            'backend': 'file',
+            # processes for parsing the front matters during load - None or 1 parses in this process.
+            'parse_workers': None,
+            # restore the loaded state of unchanged sites from the snapshots in their cache dirs.
+            'snapshots': False,
         }
 
         # dev server param
@@ -58,11 +61,21 @@ class Synamic(AbcSynamic):
         return self.__is_loaded
 
     @not_loaded
-    def load(self):
-        self.__sites.load()  # TODO: sites should be loaded individually.
+    def load(self, site_ids=None, lazy=False):
+        """`site_ids`: when provided, only these sites and their ancestors are loaded.
+        `lazy`: a site is loaded, with its ancestors, when it is first accessed - through sites.get_by_id(),
+        sites.root_site or the router."""
+        self.__sites.load(site_ids=site_ids, lazy=lazy)
         self.__upload_manager.load()
+        # parsed syd files are saved once - not after every site. Sites loaded lazily save them after their loads.
+        self.save_syd_caches()
         self.__is_loaded = True
 
+    def save_syd_caches(self):
+        """Saves the syd files parsed since the last save to the syd caches - for the next processes"""
+        get_syd_cache().save()
+        self.__object_manager.save_syd_caches()
+
     @property
     def default_data(self):
         return self.__default_data
@@ -113,6 +126,7 @@ class Synamic(AbcSynamic):
 
 
 def render_string_template(text, context=None, **ctx):
+    import jinja2
     template = jinja2.Environment(loader=jinja2.BaseLoader()).from_string(text)
     if context is None:
         context = {}
@@ -9,7 +9,6 @@
 """
 import os
 import collections
-import jinja2.exceptions
 
 __all__ = [
     # functions
@@ -20,7 +19,7 @@ __all__ = [
     'SynamicInvalidNumberFormat', 'SynamicModelParsingError',
     'SynamicSettingsError', 'SynamicInvalidCPathComponentError', 'SynamicPathDoesNotExistError',
     'SynamicFSError', 'SynamicDataError', 'SynamicMarkerIsNotPublic', 'SynamicSiteNotFound',
-    'SynamicUserNotFound',
+    'SynamicUserNotFound', 'CircularDependency', 'InvalidQueryString',
 ]
 
 
@@ -95,6 +94,8 @@ class SynamicErrors(SynamicError):
 
 class SynamicTemplateError(SynamicError):
     def __init__(self, jinja_ex):
+        # jinja2 is imported only when rendering templates - not when importing synamic.
+        import jinja2.exceptions
         assert isinstance(jinja_ex, jinja2.exceptions.TemplateError),\
             f'Exception instance passed to {self.__class__.__name__} must be of jinja2.TemplateError'
         self.error_map = error_map = collections.OrderedDict()
@@ -218,3 +219,7 @@ class InvalidFileNameFormat(SynamicError):
 
 class DuplicateContentId(SynamicError):
     pass
+
+
+class CircularDependency(SynamicError):
+    pass
@@ -0,0 +1,154 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from synamic.core.object_managers.fs_object_manager.build_manifest import (
+    BuildManifest, BuildRecord, file_input_key, file_signature
+)
+
+
+class _CPath:
+    def __init__(self, abs_path):
+        self.abs_path = abs_path
+
+    def join(self, name, is_file=True):
+        return _CPath(os.path.join(self.abs_path, name))
+
+    def exists(self):
+        return os.path.exists(self.abs_path)
+
+    def makedirs(self):
+        os.makedirs(self.abs_path)
+
+    def open(self, mode, *args, **kwargs):
+        return open(self.abs_path, mode, *args, **kwargs)
+
+
+class _PathTree:
+    def __init__(self, root_path):
+        self.root_path = root_path
+
+    def create_dir_cpath(self, path):
+        return _CPath(os.path.join(self.root_path, path))
+
+
+class _Synamic:
+    def __init__(self, root_path):
+        self.abs_root_path = root_path
+        self.path_tree = _PathTree(root_path)
+        self.system_settings = {'dirs.outputs.outputs': '_outputs'}
+
+
+class _CPaths:
+    def __init__(self, root_path):
+        self.cache_cdir = _CPath(os.path.join(root_path, '_cache'))
+
+
+class _Site:
+    def __init__(self, root_path):
+        self.synamic = _Synamic(root_path)
+        self.cpaths = _CPaths(root_path)
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.root_path = tempfile.mkdtemp()
+        self.site = _Site(self.root_path)
+        self.template_path = self.write('templates/page.html')
+        self.content_path = self.write('contents/post.md')
+
+    def tearDown(self):
+        shutil.rmtree(self.root_path)
+
+    def write(self, rel_path, text='text'):
+        abs_path = os.path.join(self.root_path, rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with open(abs_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return abs_path
+
+    def content_inputs(self):
+        return {file_input_key(self.content_path, self.root_path): file_signature(self.content_path), '@layout': 'a'}
+
+    def build(self, records):
+        """Writes the outputs of the records and saves them as the manifest of a build - returns the manifest of the
+        next build"""
+        manifest = BuildManifest(self.site).load()
+        for url, rel_path, inputs in records:
+            self.write(rel_path, url)
+            manifest.add(BuildRecord(url, rel_path, 'hash', inputs))
+        manifest.save()
+        return BuildManifest(self.site).load()
+
+    def test_up_to_date(self):
+        # the template is recorded as a dependency while rendering - the inputs of the next build do not have it.
+        inputs = dict(self.content_inputs())
+        inputs[file_input_key(self.template_path, self.root_path)] = file_signature(self.template_path)
+        manifest = self.build([('/post/', '_outputs/post/index.html', inputs)])
+        self.assertTrue(manifest.is_up_to_date('/post/', self.content_inputs()))
+        self.assertFalse(manifest.is_up_to_date('/other/', self.content_inputs()))
+
+    def test_changed_inputs(self):
+        manifest = self.build([('/post/', '_outputs/post/index.html', self.content_inputs())])
+        self.assertFalse(manifest.is_up_to_date('/post/', dict(self.content_inputs(), **{'@layout': 'b'})))
+        self.write('contents/post.md', 'changed text')
+        self.assertFalse(manifest.is_up_to_date('/post/', self.content_inputs()))
+
+    def test_changed_recorded_dependency(self):
+        inputs = dict(self.content_inputs())
+        inputs[file_input_key(self.template_path, self.root_path)] = file_signature(self.template_path)
+        manifest = self.build([('/post/', '_outputs/post/index.html', inputs)])
+        self.write('templates/page.html', 'changed text')
+        self.assertFalse(manifest.is_up_to_date('/post/', self.content_inputs()))
+
+    def test_removed_output(self):
+        manifest = self.build([('/post/', '_outputs/post/index.html', self.content_inputs())])
+        os.remove(os.path.join(self.root_path, '_outputs/post/index.html'))
+        self.assertFalse(manifest.is_up_to_date('/post/', self.content_inputs()))
+
+    def test_other_version_is_ignored(self):
+        self.build([('/post/', '_outputs/post/index.html', self.content_inputs())])
+        with open(os.path.join(self.root_path, '_cache', BuildManifest.file_name), 'w', encoding='utf-8') as f:
+            f.write('{"version": 0, "outputs": {}}')
+        self.assertFalse(BuildManifest(self.site).load().is_up_to_date('/post/', self.content_inputs()))
+
+    def test_skipped_outputs_keep_their_records(self):
+        manifest = self.build([('/post/', '_outputs/post/index.html', self.content_inputs())])
+        manifest.add(BuildRecord('/post/', None, None, self.content_inputs()))
+        self.assertEqual(manifest.get_path('/post/'), '_outputs/post/index.html')
+        self.assertEqual(manifest.orphaned_paths, ())
+        manifest.save()
+        self.assertTrue(BuildManifest(self.site).load().is_up_to_date('/post/', self.content_inputs()))
+
+    def test_orphans(self):
+        manifest = self.build([
+            ('/post/', '_outputs/post/index.html', self.content_inputs()),
+            ('/old/', '_outputs/old/deep/index.html', self.content_inputs()),
+            ('/moved/', '_outputs/moved/index.html', self.content_inputs()),
+        ])
+        manifest.add(BuildRecord('/post/', None, None, self.content_inputs()))
+        # another url writes the path of a dropped url now - it is not an orphan.
+        manifest.add(BuildRecord('/moved-here/', '_outputs/moved/index.html', 'hash', self.content_inputs()))
+        self.assertEqual(manifest.orphaned_paths, ('_outputs/old/deep/index.html', ))
+
+        manifest.remove_orphans()
+        outputs_path = os.path.join(self.root_path, '_outputs')
+        self.assertFalse(os.path.exists(os.path.join(outputs_path, 'old')))
+        self.assertTrue(os.path.isfile(os.path.join(outputs_path, 'post', 'index.html')))
+        self.assertTrue(os.path.isfile(os.path.join(outputs_path, 'moved', 'index.html')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from synamic.core.services.content.content_splitter import content_splitter, scan_front_matter, read_body
+
+
+class _FilePath:
+    def __init__(self, abs_path):
+        self.abs_path = abs_path
+        self.relative_path = os.path.basename(abs_path)
+
+
+class TestScanFrontMatter(unittest.TestCase):
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.file_path = _FilePath(os.path.join(self.dir_path, 'content.md'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def write(self, data):
+        with open(self.file_path.abs_path, 'wb') as f:
+            f.write(data)
+
+    def assert_same_as_content_splitter(self, data):
+        self.write(data)
+        with open(self.file_path.abs_path, 'r', encoding='utf-8') as f:
+            front_matter, body = content_splitter(self.file_path, f.read())
+        scanned_front_matter, body_offset, header = scan_front_matter(self.file_path)
+        self.assertEqual(scanned_front_matter, front_matter)
+        self.assertEqual(header, data[:body_offset])
+        self.assertEqual(read_body(self.file_path, body_offset), body)
+
+    def test_same_as_content_splitter(self):
+        self.assert_same_as_content_splitter(b'---\ntitle: A\n---\n# Body\n\ntext\n')
+        self.assert_same_as_content_splitter(b'\n\n----\ntitle: A\n----  \nbody')
+        self.assert_same_as_content_splitter(b'---\r\ntitle: \xc3\xbc\r\n---\r\nbody\r\nmore\r\n')
+        self.assert_same_as_content_splitter(b'---\rtitle: A\r---\rbody\rmore')
+        self.assert_same_as_content_splitter(b'---\n---\n')
+        self.assert_same_as_content_splitter(b'---\ntitle: A\n---')
+
+    def test_body_offset(self):
+        self.write(b'---\ntitle: A\n---\nbody')
+        front_matter, body_offset, header = scan_front_matter(self.file_path)
+        self.assertEqual(front_matter, 'title: A')
+        self.assertEqual(body_offset, len(b'---\ntitle: A\n---\n'))
+
+    def test_body_is_not_read(self):
+        # a body that is not valid utf-8 would fail if it were decoded.
+        self.write(b'---\ntitle: A\n---\n' + b'\xff' * 100)
+        front_matter, body_offset, header = scan_front_matter(self.file_path)
+        self.assertEqual(front_matter, 'title: A')
+
+    def test_invalid(self):
+        self.write(b'text before\n---\ntitle: A\n---\n')
+        self.assertRaises(Exception, scan_front_matter, self.file_path)
+        self.write(b'---\ntitle: A\n')
+        self.assertRaises(Exception, scan_front_matter, self.file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import unittest
+
+from synamic.core.object_managers.fs_object_manager.dependency_graph import DependencyGraph
+
+
+class _Site:
+    def __init__(self, site_id):
+        self.id = site_id
+
+
+class _CPath:
+    def __init__(self, relative_path):
+        self.relative_path = relative_path
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.root_path = os.path.abspath(os.sep + 'site')
+        self.graph = DependencyGraph(self.root_path)
+        self.site = _Site('site')
+        self.other_site = _Site('other site')
+
+    def abs_path(self, rel_path):
+        return os.path.join(self.root_path, rel_path)
+
+    def file_node(self, rel_path):
+        return self.graph.file_node(self.abs_path(rel_path))
+
+    def render(self, site, url, *input_nodes, fresh=False):
+        with self.graph.recording(self.graph.output_node(site, url), fresh=fresh):
+            for input_node in input_nodes:
+                self.graph.record(input_node)
+
+    def test_file_nodes_are_shared_by_sites(self):
+        node = self.file_node(os.path.join('templates', 'page.html'))
+        self.assertEqual(node, (DependencyGraph.FILE, None, os.path.join('templates', 'page.html')))
+        self.assertEqual(self.graph.abs_file_path(node), self.abs_path(os.path.join('templates', 'page.html')))
+
+    def test_recording(self):
+        self.assertFalse(self.graph.is_recording)
+        page = self.graph.output_node(self.site, '/page/')
+        content = self.graph.content_node(self.site, _CPath('page.md'))
+        template = self.graph.template_node(self.site, 'page.html')
+        with self.graph.recording(page):
+            self.assertTrue(self.graph.is_recording)
+            # the inputs of the content - recorded for the content and the output both.
+            with self.graph.recording(content):
+                self.graph.record(self.file_node('contents/page.md'))
+            self.graph.record(content)
+            self.graph.record(template)
+        self.assertFalse(self.graph.is_recording)
+        self.assertEqual(self.graph.direct_dependencies(page), {content, template, self.file_node('contents/page.md')})
+        self.assertEqual(self.graph.direct_dependencies(content), {self.file_node('contents/page.md')})
+        self.assertEqual(self.graph.file_dependencies(page), [self.abs_path('contents/page.md')])
+
+    def test_fresh_recording_drops_previous_inputs(self):
+        self.render(self.site, '/page/', self.file_node('templates/old.html'))
+        self.render(self.site, '/page/', self.file_node('templates/new.html'), fresh=True)
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('templates/old.html')]), {})
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('templates/new.html')]), {'site': {'/page/'}})
+
+    def test_outputs_to_rebuild_is_transitive(self):
+        # the base template is read through the page template and the data through a query.
+        page_template = self.graph.template_node(self.site, 'page.html')
+        query = self.graph.query_node(self.site, 'type == post')
+        data = self.graph.data_node(self.site, 'menu')
+        self.graph.add_edge(page_template, self.file_node('templates/page.html'))
+        self.graph.add_edge(page_template, self.file_node('templates/base.html'))
+        self.graph.add_edge(data, self.file_node('data/menu.syd'))
+        self.graph.add_edge(query, data)
+        self.render(self.site, '/page/', page_template)
+        self.render(self.site, '/posts/', query)
+        self.render(self.other_site, '/page/', self.file_node('templates/base.html'))
+        self.render(self.site, '/about/', self.file_node('contents/about.md'))
+
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('templates/base.html')]), {
+            'site': {'/page/'}, 'other site': {'/page/'}
+        })
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('data/menu.syd')]), {'site': {'/posts/'}})
+        self.assertEqual(
+            self.graph.outputs_to_rebuild([self.abs_path('data/menu.syd'), self.abs_path('contents/about.md')]),
+            {'site': {'/posts/', '/about/'}}
+        )
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('contents/unknown.md')]), {})
+
+    def test_cycles_end(self):
+        a = self.graph.template_node(self.site, 'a.html')
+        b = self.graph.template_node(self.site, 'b.html')
+        self.graph.add_edge(a, b)
+        self.graph.add_edge(b, a)
+        self.graph.add_edge(a, a)
+        self.graph.add_edge(b, self.file_node('templates/b.html'))
+        self.render(self.site, '/page/', a)
+        self.assertFalse(self.graph.has_dependencies(self.file_node('templates/b.html')))
+        self.assertEqual(self.graph.dependencies(a), {a, b, self.file_node('templates/b.html')})
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('templates/b.html')]), {'site': {'/page/'}})
+
+    def test_front_matter_changed(self):
+        query = self.graph.query_node(self.site, 'type == post')
+        self.graph.add_edge(query, self.graph.front_matters_node(self.site))
+        self.render(self.site, '/posts/', query)
+        self.render(self.site, '/about/', self.file_node('contents/about.md'))
+        # a new post - no output read the file yet, only the query can match it.
+        changed_paths = [self.abs_path('contents/new.md')]
+        self.assertEqual(self.graph.outputs_to_rebuild(changed_paths), {})
+        self.assertEqual(self.graph.outputs_to_rebuild(changed_paths, front_matter_changed=True), {'site': {'/posts/'}})
+
+    def test_site_edges(self):
+        self.render(self.site, '/page/', self.file_node('templates/page.html'))
+        self.render(self.other_site, '/page/', self.file_node('templates/page.html'))
+        edges = self.graph.site_edges('site')
+        self.assertEqual(edges, [(self.graph.output_node(self.site, '/page/'), self.file_node('templates/page.html'))])
+
+        self.graph.remove_site('site')
+        self.assertEqual(self.graph.site_edges('site'), [])
+        self.assertEqual(
+            self.graph.outputs_to_rebuild([self.abs_path('templates/page.html')]), {'other site': {'/page/'}}
+        )
+        self.graph.add_edges(edges)
+        self.assertEqual(self.graph.outputs_to_rebuild([self.abs_path('templates/page.html')]), {
+            'site': {'/page/'}, 'other site': {'/page/'}
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from synamic.exceptions import SynamicSettingsError
+from synamic.core.object_managers.fs_object_manager import emitters
+from synamic.core.object_managers.fs_object_manager.emitters import StaticEmitter
+
+
+class TestStaticEmitter(unittest.TestCase):
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.src_path = self.write('src.bin', b'source bytes')
+        self.dst_path = os.path.join(self.dir_path, 'dst.bin')
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def write(self, name, data):
+        path = os.path.join(self.dir_path, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def fake_methods(self, *unsupported):
+        """Methods that record their calls - the `unsupported` ones raise like a platform without them"""
+        def fake(name):
+            def method(src_path, dst_path):
+                self.calls.append(name)
+                if name in unsupported:
+                    raise emitters._Unsupported()
+                shutil.copyfile(src_path, dst_path)
+            return name, method
+        names = ('hardlink', 'reflink', 'copy_file_range', 'sendfile', 'copy')
+        return mock.patch.object(StaticEmitter, '_StaticEmitter__methods', tuple(fake(name) for name in names))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(SynamicSettingsError):
+            StaticEmitter('symlink')
+
+    def test_fallback_chain(self):
+        with self.fake_methods('reflink', 'copy_file_range'):
+            emitter = StaticEmitter()
+            self.assertEqual(emitter.emit(self.src_path, self.dst_path), 'sendfile')
+            # unsupported methods are not tried again.
+            self.assertEqual(emitter.emit(self.src_path, self.dst_path), 'sendfile')
+        # auto starts at reflink - never at hardlink.
+        self.assertEqual(self.calls, ['reflink', 'copy_file_range', 'sendfile', 'sendfile'])
+        self.assertEqual(emitter.counts, {'sendfile': 2})
+        self.assertEqual(self.read(self.dst_path), b'source bytes')
+
+    def test_fallback_from_explicit_mode(self):
+        with self.fake_methods('hardlink', 'reflink', 'copy_file_range', 'sendfile'):
+            emitter = StaticEmitter('hardlink')
+            self.assertEqual(emitter.emit(self.src_path, self.dst_path), 'copy')
+        self.assertEqual(self.calls, ['hardlink', 'reflink', 'copy_file_range', 'sendfile', 'copy'])
+
+    def test_every_mode_emits_the_bytes(self):
+        for mode in StaticEmitter.modes:
+            emitter = StaticEmitter(mode)
+            name = emitter.emit(self.src_path, self.dst_path)
+            self.assertIn(name, StaticEmitter.modes)
+            self.assertEqual(self.read(self.dst_path), b'source bytes', mode)
+            if mode != 'hardlink':
+                self.assertFalse(os.path.samefile(self.src_path, self.dst_path), mode)
+
+    def test_existing_hardlink_is_replaced(self):
+        # the output of an earlier hardlink build - writing through it would change the source.
+        os.link(self.src_path, self.dst_path)
+        other_src_path = self.write('other.bin', b'other bytes')
+        StaticEmitter('copy').emit(other_src_path, self.dst_path)
+        self.assertEqual(self.read(self.dst_path), b'other bytes')
+        self.assertEqual(self.read(self.src_path), b'source bytes')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from collections import deque
+from unittest import mock
+
+from synamic.exceptions import SynamicFSError
+from synamic.core.object_managers.fs_object_manager import fs_inventory
+from synamic.core.object_managers.fs_object_manager.fs_inventory import FsInventory
+
+
+class _CPath:
+    def __init__(self, root_path, path_comps, is_file):
+        self.path_comps = tuple(path_comps)
+        self.is_file = is_file
+        self.abs_path = os.path.join(root_path, *path_comps)
+
+    def __eq__(self, other):
+        return (self.path_comps, self.is_file) == (other.path_comps, other.is_file)
+
+    def __hash__(self):
+        return hash(self.path_comps)
+
+    def __repr__(self):
+        return '/'.join(self.path_comps)
+
+
+class _PathTree:
+    def __init__(self, root_path):
+        self.root_path = root_path
+
+    def create_cpath(self, path_comps, is_file=True):
+        return _CPath(self.root_path, path_comps, is_file)
+
+    def list_cpaths(self, cdir, files_only=None, directories_only=None, depth=None, checker=None,
+                    respect_settings=True, ignore_dirs_sw=(), ignore_files_sw=()):
+        """The listing loop of the path tree - one listdir for every directory and a stat for every entry"""
+        if depth is None:
+            depth = 2147483647
+        to_travel = deque([((*cdir.path_comps, comp), 1) for comp in os.listdir(cdir.abs_path)])
+        directories = []
+        files = []
+        while to_travel:
+            path_comps, path_depth = to_travel.popleft()
+            if path_depth > depth:
+                break
+            path_base = path_comps[-1]
+            path_abs = os.path.join(self.root_path, *path_comps)
+            if os.path.isfile(path_abs) and files_only in (True, None):
+                path_obj = self.create_cpath(path_comps, is_file=True)
+                if checker is not None and not checker(path_obj):
+                    continue
+                if respect_settings and path_base.startswith(ignore_files_sw):
+                    continue
+                files.append(path_obj)
+            elif os.path.isdir(path_abs) and directories_only in (True, None):
+                path_obj = self.create_cpath(path_comps, is_file=False)
+                if checker is not None and not checker(path_obj):
+                    continue
+                if respect_settings and path_base.startswith(ignore_dirs_sw):
+                    continue
+                directories.append(path_obj)
+                to_travel.extend(((*path_comps, comp), path_depth + 1) for comp in os.listdir(path_abs))
+        return directories, files
+
+
+class _Site:
+    def __init__(self, root_path, configs):
+        self.path_tree = _PathTree(root_path)
+        self.system_settings = {'configs': configs}
+
+
+class TestFsInventory(unittest.TestCase):
+    def setUp(self):
+        self.root_path = tempfile.mkdtemp()
+        self.configs = {'ignore_dirs_sw': ('_', '.'), 'ignore_files_sw': ('.', '~')}
+        for rel_path in ('a.md', 'b.md', '.meta.syd', '~draft.md', 'posts/c.md', 'posts/2018/d.md',
+                         'posts/2018/deep/e.md', '_drafts/f.md', '.git/config', 'static/x.png'):
+            self.write(rel_path)
+        os.makedirs(os.path.join(self.root_path, 'empty'))
+        self.site = _Site(self.root_path, self.configs)
+        self.inventory = FsInventory(self.site)
+        self.cdir = self.site.path_tree.create_cpath((), is_file=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_path)
+
+    def write(self, rel_path):
+        abs_path = os.path.join(self.root_path, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with open(abs_path, 'w', encoding='utf-8') as f:
+            f.write(rel_path)
+
+    def assert_parity(self, cdir, **kwargs):
+        expected = self.site.path_tree.list_cpaths(
+            cdir, ignore_dirs_sw=self.configs['ignore_dirs_sw'], ignore_files_sw=self.configs['ignore_files_sw'],
+            **kwargs
+        )
+        self.assertEqual(self.inventory.list_cpaths(cdir, **kwargs), expected, kwargs)
+        return expected
+
+    def test_parity(self):
+        posts_cdir = self.site.path_tree.create_cpath(('posts', ), is_file=False)
+        for cdir in (self.cdir, posts_cdir):
+            for kwargs in ({}, {'files_only': True}, {'directories_only': True}, {'depth': 1}, {'depth': 2},
+                           {'respect_settings': False}, {'checker': lambda cpath: cpath.path_comps[-1] != '2018'}):
+                self.assert_parity(cdir, **kwargs)
+
+    def test_listing(self):
+        self.assertEqual(
+            sorted(cpath.path_comps for cpath in self.inventory.list_files(self.cdir, depth=2)),
+            [('a.md', ), ('b.md', ), ('posts', 'c.md'), ('static', 'x.png')]
+        )
+        self.assertEqual(
+            sorted(cpath.path_comps for cpath in self.inventory.list_dirs(self.cdir)),
+            [('empty', ), ('posts', ), ('posts', '2018'), ('posts', '2018', 'deep'), ('static', )]
+        )
+
+    def test_dirs_are_scanned_once(self):
+        with mock.patch.object(fs_inventory.os, 'scandir', wraps=os.scandir) as scandir:
+            self.inventory.list_files(self.cdir)
+            self.inventory.list_dirs(self.cdir)
+            self.inventory.list_files(self.site.path_tree.create_cpath(('posts', ), is_file=False))
+        scanned = sorted(call[0][0] for call in scandir.call_args_list)
+        self.assertEqual(scanned, sorted(set(scanned)))
+        # later changes are not seen for as long as the inventory lives.
+        self.write('posts/new.md')
+        self.assertNotIn(('posts', 'new.md'), [cpath.path_comps for cpath in self.inventory.list_files(self.cdir)])
+
+    def test_missing_dir(self):
+        with self.assertRaises(SynamicFSError):
+            self.inventory.list_files(self.site.path_tree.create_cpath(('missing', ), is_file=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
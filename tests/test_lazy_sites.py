@@ -0,0 +1,96 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from synamic.core.synamic.sites import sites as sites_module
+from synamic.core.synamic.sites.sites import Sites
+
+
+class _Site:
+    def __init__(self, synamic, site_id, abs_path, parent_site=None, root_site=None):
+        self.synamic = synamic
+        self.id = site_id
+        self.abs_path = abs_path
+        self.parent = parent_site
+        self.is_loaded = False
+
+    def load(self):
+        assert self.parent is None or self.parent.is_loaded
+        # a site can get itself by id while loading.
+        self.synamic.sites.get_by_id(self.id)
+        self.synamic.loaded_site_ids.append(self.id.components)
+        self.is_loaded = True
+
+
+class _Synamic:
+    def __init__(self, root_path):
+        self.abs_root_path = root_path
+        self.system_settings = {'configs.site_id_sep': '~', 'configs.subsites_dir': 'sites'}
+        self.loaded_site_ids = []
+        self.syd_cache_saves = 0
+        with mock.patch.object(sites_module, '_Site', _Site):
+            self.sites = Sites(self, root_path)
+
+    def save_syd_caches(self):
+        self.syd_cache_saves += 1
+
+
+class TestLazySites(unittest.TestCase):
+    def setUp(self):
+        self.root_path = tempfile.mkdtemp()
+        for rel_path in ('sites/blog/sites/en', 'sites/docs'):
+            os.makedirs(os.path.join(self.root_path, *rel_path.split('/')))
+        self.synamic = _Synamic(self.root_path)
+        self.sites = self.synamic.sites
+        patchers = (mock.patch.object(sites_module, '_Site', _Site),
+                    mock.patch.object(sites_module, 'DefaultDataManager', lambda: None))
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_path)
+
+    def test_eager_load(self):
+        self.sites.load()
+        self.assertEqual(sorted(self.synamic.loaded_site_ids), [(), ('blog', ), ('blog', 'en'), ('docs', )])
+
+    def test_lazy_load_leaves_sites_unloaded(self):
+        self.sites.load(lazy=True)
+        self.assertTrue(self.sites.is_lazy)
+        self.assertEqual(self.synamic.loaded_site_ids, [])
+        self.assertEqual(len(self.sites.ids), 4)
+        self.assertFalse(self.sites.get_by_id('blog~en', load=False).is_loaded)
+
+        # ancestors first, only once for all of them.
+        site = self.sites.get_by_id('blog~en')
+        self.assertTrue(site.is_loaded)
+        self.assertEqual(self.synamic.loaded_site_ids, [(), ('blog', ), ('blog', 'en')])
+        self.assertEqual(self.synamic.syd_cache_saves, 1)
+        self.assertFalse(self.sites.get_by_id('docs', load=False).is_loaded)
+
+        self.sites.get_by_id('blog~en')
+        self.sites.get_by_id('docs')
+        self.assertEqual(self.synamic.loaded_site_ids, [(), ('blog', ), ('blog', 'en'), ('docs', )])
+        self.assertEqual(self.synamic.syd_cache_saves, 2)
+
+    def test_build_concurrently_needs_load(self):
+        with self.assertRaises(AssertionError):
+            self.sites.build_concurrently(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
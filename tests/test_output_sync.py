@@ -0,0 +1,132 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from synamic.core.object_managers.fs_object_manager import output_sync
+from synamic.core.object_managers.fs_object_manager.output_sync import OutputSync, same_file_contents, sync_stream
+
+
+class TestSyncStream(unittest.TestCase):
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.dst_path = os.path.join(self.dir_path, 'index.html')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def write(self, path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+        # far in the past - an unchanged output must keep it.
+        os.utime(path, ns=(0, 0))
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_new_output(self):
+        hash_obj = hashlib.sha1()
+        self.assertTrue(sync_stream(io.BytesIO(b'page'), self.dst_path, hash_obj))
+        self.assertEqual(self.read(self.dst_path), b'page')
+        self.assertEqual(hash_obj.hexdigest(), hashlib.sha1(b'page').hexdigest())
+
+    def test_unchanged_output_is_not_written(self):
+        self.write(self.dst_path, b'page')
+        hash_obj = hashlib.sha1()
+        self.assertFalse(sync_stream(io.BytesIO(b'page'), self.dst_path, hash_obj))
+        self.assertEqual(os.stat(self.dst_path).st_mtime_ns, 0)
+        # hashed all the same.
+        self.assertEqual(hash_obj.hexdigest(), hashlib.sha1(b'page').hexdigest())
+
+    def test_changed_output(self):
+        for data in (b'page changed', b'pag', b'page!', b''):
+            self.write(self.dst_path, b'page')
+            self.assertTrue(sync_stream(io.BytesIO(data), self.dst_path), data)
+            self.assertEqual(self.read(self.dst_path), data)
+
+    def test_streams_longer_than_a_chunk(self):
+        original_chunk_size = output_sync._CHUNK_SIZE
+        output_sync._CHUNK_SIZE = 4
+        try:
+            self.write(self.dst_path, b'0123456789')
+            self.assertFalse(sync_stream(io.BytesIO(b'0123456789'), self.dst_path))
+            self.assertTrue(sync_stream(io.BytesIO(b'0123456780'), self.dst_path))
+            self.assertEqual(self.read(self.dst_path), b'0123456780')
+        finally:
+            output_sync._CHUNK_SIZE = original_chunk_size
+
+    def test_hard_link_is_not_written_through(self):
+        src_path = os.path.join(self.dir_path, 'source.html')
+        self.write(src_path, b'source')
+        os.link(src_path, self.dst_path)
+        self.assertTrue(sync_stream(io.BytesIO(b'page'), self.dst_path))
+        self.assertEqual(self.read(self.dst_path), b'page')
+        self.assertEqual(self.read(src_path), b'source')
+
+    def test_same_file_contents(self):
+        src_path = os.path.join(self.dir_path, 'source.html')
+        self.write(src_path, b'source')
+        self.assertFalse(same_file_contents(src_path, self.dst_path))
+        self.write(self.dst_path, b'source')
+        self.assertTrue(same_file_contents(src_path, self.dst_path))
+        self.write(self.dst_path, b'changed')
+        self.assertFalse(same_file_contents(src_path, self.dst_path))
+        os.remove(self.dst_path)
+        os.link(src_path, self.dst_path)
+        self.assertTrue(same_file_contents(src_path, self.dst_path))
+
+
+class TestOutputSync(unittest.TestCase):
+    def setUp(self):
+        self.outputs_path = tempfile.mkdtemp()
+        for rel_path in ('index.html', 'old.html', '.git/config', 'posts/a/index.html', 'gone/deep/index.html',
+                         'posts/.hidden'):
+            self.write(rel_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.outputs_path)
+
+    def abs_path(self, rel_path):
+        return os.path.join(self.outputs_path, *rel_path.split('/'))
+
+    def write(self, rel_path):
+        abs_path = self.abs_path(rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with open(abs_path, 'w', encoding='utf-8') as f:
+            f.write(rel_path)
+
+    def test_prune(self):
+        sync = OutputSync(self.outputs_path)
+        sync.add_produced(self.abs_path('index.html'))
+        sync.update_produced([self.abs_path('posts/a/index.html')])
+        with redirect_stdout(io.StringIO()):
+            removed = sync.prune()
+        self.assertEqual(sorted(removed), sorted(
+            self.abs_path(p) for p in ('old.html', 'gone/deep/index.html', 'posts/.hidden')
+        ))
+        for rel_path in ('index.html', 'posts/a/index.html', '.git/config'):
+            self.assertTrue(os.path.isfile(self.abs_path(rel_path)), rel_path)
+        self.assertFalse(os.path.exists(self.abs_path('gone')))
+
+    def test_prune_without_outputs(self):
+        sync = OutputSync(os.path.join(self.outputs_path, 'missing'))
+        self.assertEqual(sync.prune(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from synamic.core.standalones.classes.persistent_parse_cache import PersistentParseCache
+
+
+class TestPersistentParseCache(unittest.TestCase):
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.cache_file_path = os.path.join(self.dir_path, 'cache', 'parsed.pickle')
+        self.file_path = os.path.join(self.dir_path, 'post.md')
+        self.write(b'---\ntitle: post\n---\nbody')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def write(self, data, mtime_ns=0):
+        with open(self.file_path, 'wb') as f:
+            f.write(data)
+        os.utime(self.file_path, ns=(mtime_ns, mtime_ns))
+
+    def cache(self, version=1):
+        return PersistentParseCache(self.cache_file_path, version).load()
+
+    def test_hit_and_miss(self):
+        cache = self.cache()
+        self.assertIsNone(cache.get('post', self.file_path))
+        self.assertTrue(cache.put('post', self.file_path, {'title': 'post'}, data=b'---\ntitle: post\n---\n'))
+        self.assertEqual(cache.get('post', self.file_path), {'title': 'post'})
+        self.assertEqual(cache.get('other', self.file_path, 'default'), 'default')
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_size_change(self):
+        cache = self.cache()
+        cache.put('post', self.file_path, 'value', data=b'---\n')
+        self.write(b'---\ntitle: post\n---\nlonger body')
+        self.assertIsNone(cache.get('post', self.file_path))
+
+    def test_removed_file(self):
+        cache = self.cache()
+        cache.put('post', self.file_path, 'value', data=b'---\n')
+        os.remove(self.file_path)
+        self.assertIsNone(cache.get('post', self.file_path))
+
+    def test_mtime_change(self):
+        header = b'---\ntitle: post\n---\n'
+        cache = self.cache()
+        cache.put('post', self.file_path, 'value', length=len(header), digest=PersistentParseCache.bytes_digest(header))
+        cache.save()
+        # a fresh checkout - same bytes, new mtime.
+        self.write(b'---\ntitle: post\n---\nbody', mtime_ns=10 ** 18)
+        cache = self.cache()
+        self.assertEqual(cache.get('post', self.file_path), 'value')
+        # only the bytes the value was parsed from are compared - a changed body of the same size keeps it.
+        self.write(b'---\ntitle: post\n---\nBODY', mtime_ns=2 * 10 ** 18)
+        self.assertEqual(self.cache().get('post', self.file_path), 'value')
+        self.write(b'---\ntitle: Post\n---\nbody', mtime_ns=3 * 10 ** 18)
+        self.assertIsNone(self.cache().get('post', self.file_path))
+
+    def test_save_and_load(self):
+        cache = self.cache()
+        cache.put('post', self.file_path, ['value'], data=b'---\n')
+        cache.save()
+        self.assertEqual(self.cache().keys(), ('post', ))
+        self.assertEqual(self.cache().get('post', self.file_path), ['value'])
+        # another version.
+        self.assertEqual(len(self.cache(version=2)), 0)
+
+    def test_corrupted_cache_file(self):
+        os.makedirs(os.path.dirname(self.cache_file_path))
+        with open(self.cache_file_path, 'wb') as f:
+            f.write(b'not a pickle')
+        cache = self.cache()
+        self.assertEqual(len(cache), 0)
+        # replaced on save.
+        cache.save()
+        self.assertEqual(len(self.cache()), 0)
+
+    def test_retain_and_clear(self):
+        cache = self.cache()
+        cache.put('post', self.file_path, 'value', data=b'---\n')
+        cache.put('deleted', self.file_path, 'value', data=b'---\n')
+        cache.retain(['post'])
+        self.assertEqual(cache.keys(), ('post', ))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_unpicklable_value(self):
+        cache = self.cache()
+        cache.put('post', self.file_path, 'value', data=b'---\n')
+        self.assertFalse(cache.put('post', self.file_path, lambda: None, data=b'---\n'))
+        # the stale value is not kept either.
+        self.assertIsNone(cache.get('post', self.file_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
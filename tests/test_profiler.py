@@ -0,0 +1,95 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from synamic.core.object_managers.fs_object_manager.profiler import BuildProfiler
+
+
+class _CFile:
+    def __init__(self, abs_path):
+        self.abs_path = abs_path
+
+    def open(self, mode, *args, **kwargs):
+        return open(self.abs_path, mode, *args, **kwargs)
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = BuildProfiler()
+        self.profiler.add(BuildProfiler.URLS, '/fast/', 0.5, 0.25)
+        self.profiler.add(BuildProfiler.URLS, '/slow/', 2.0, 1.0)
+        self.profiler.add(BuildProfiler.URLS, '/fast/', 0.5, 0.25)
+        self.profiler.add(BuildProfiler.TEMPLATES, 'page.html', 1.0, 0.5, count=3)
+
+    def test_add_and_top(self):
+        self.assertEqual(self.profiler.top(BuildProfiler.URLS), [('/slow/', 1, 2.0, 1.0), ('/fast/', 2, 1.0, 0.5)])
+        self.assertEqual(self.profiler.top(BuildProfiler.URLS, n=1), [('/slow/', 1, 2.0, 1.0)])
+        self.assertEqual(self.profiler.top(BuildProfiler.LOAD_PHASES), [])
+
+    def test_total(self):
+        self.assertEqual(self.profiler.total(BuildProfiler.URLS), (3, 3.0, 1.5))
+        self.assertEqual(self.profiler.total(BuildProfiler.TEMPLATES), (3, 1.0, 0.5))
+        self.assertEqual(self.profiler.total(BuildProfiler.LOAD_PHASES), (0, 0.0, 0.0))
+
+    def test_unknown_kind(self):
+        with self.assertRaises(KeyError):
+            self.profiler.add('unknown', 'name', 1.0, 1.0)
+
+    def test_measure(self):
+        with self.profiler.measure(BuildProfiler.LOAD_PHASES, 'contents'):
+            pass
+        # measured even when the block raises.
+        with self.assertRaises(ValueError):
+            with self.profiler.measure(BuildProfiler.LOAD_PHASES, 'contents'):
+                raise ValueError()
+        [(name, count, wall, cpu)] = self.profiler.top(BuildProfiler.LOAD_PHASES)
+        self.assertEqual((name, count), ('contents', 2))
+        self.assertGreaterEqual(wall, 0.0)
+        self.assertGreaterEqual(cpu, 0.0)
+
+    def test_data_and_merge(self):
+        # the data of the workers is pickled to the parent.
+        data = pickle.loads(pickle.dumps(self.profiler.data))
+        self.assertEqual(data[BuildProfiler.URLS]['/fast/'], {'count': 2, 'wall': 1.0, 'cpu': 0.5})
+        merged = BuildProfiler()
+        merged.add(BuildProfiler.URLS, '/fast/', 1.0, 0.5)
+        merged.merge(data)
+        merged.merge(data)
+        self.assertEqual(merged.top(BuildProfiler.URLS), [('/slow/', 2, 4.0, 2.0), ('/fast/', 5, 3.0, 1.5)])
+        self.assertEqual(merged.total(BuildProfiler.TEMPLATES), (6, 2.0, 1.0))
+
+    def test_report(self):
+        report = self.profiler.report(n=1)
+        self.assertIn('Top 1 urls (total 3 in wall 3.000s, cpu 1.500s):', report)
+        self.assertIn('/slow/', report)
+        self.assertNotIn('/fast/', report)
+
+    def test_save(self):
+        dir_path = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dir_path, 'profile.json')
+            self.profiler.save(_CFile(path), site_id='site')
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(dir_path)
+        self.assertEqual(data['site_id'], 'site')
+        self.assertEqual(data[BuildProfiler.URLS], self.profiler.data[BuildProfiler.URLS])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import unittest
+
+from synamic.core.object_managers.fs_object_manager.fs_object_manager import FsObjectManager
+
+# the cache of the object manager - private to it.
+_Cache = FsObjectManager._FsObjectManager__Cache
+
+
+class _Site:
+    def __init__(self, site_id):
+        self.id = site_id
+
+
+class _CFields:
+    def __init__(self, name):
+        self.curl = 'url:' + name
+        self.cpath = 'cpath:' + name
+
+
+class TestQueryResultCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = _Cache(None)
+        self.site = _Site('site')
+        self.other_site = _Site('other site')
+        self.query_key = ('normalized query', None, 0)
+        self.result = (_CFields('a'), )
+
+    def assert_stats(self, site, hits, misses, entries):
+        self.assertEqual(self.cache.get_query_cache_stats(site), {'hits': hits, 'misses': misses, 'entries': entries})
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(self.cache.get_query_result(self.site, self.query_key))
+        self.assert_stats(self.site, 0, 1, 0)
+        self.cache.add_query_result(self.site, self.query_key, self.result)
+        self.assertIs(self.cache.get_query_result(self.site, self.query_key), self.result)
+        self.assertIs(self.cache.get_query_result(self.site, self.query_key), self.result)
+        self.assert_stats(self.site, 2, 1, 1)
+        # per site.
+        self.assertIsNone(self.cache.get_query_result(self.other_site, self.query_key))
+        self.assert_stats(self.other_site, 0, 1, 0)
+
+    def test_changed_marked_cfields_invalidate(self):
+        self.cache.add_query_result(self.site, self.query_key, self.result)
+        self.cache.add_query_result(self.other_site, self.query_key, self.result)
+        self.cache.add_marked_cfields(self.site, _CFields('b'))
+        self.assertIsNone(self.cache.get_query_result(self.site, self.query_key))
+        self.assert_stats(self.site, 0, 1, 0)
+        # the other site did not change.
+        self.assertIs(self.cache.get_query_result(self.other_site, self.query_key), self.result)
+
+    def test_clear_query_results(self):
+        self.cache.add_query_result(self.site, self.query_key, self.result)
+        self.cache.clear_query_results(self.site)
+        self.assertIsNone(self.cache.get_query_result(self.site, self.query_key))
+        self.assert_stats(self.site, 0, 1, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
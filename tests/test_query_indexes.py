@@ -0,0 +1,176 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import operator
+import unittest
+
+from synamic.exceptions import InvalidQueryString
+from synamic.core.object_managers.fs_object_manager.query import QueryNode, SimpleQueryParser
+from synamic.core.object_managers.fs_object_manager.query_indexes import QueryIndexes
+from synamic.core.object_managers.fs_object_manager.query_plan import QueryPlan, split_query_window
+
+QuerySection = SimpleQueryParser.QuerySection
+
+
+class _Converter:
+    """Values are already converted - compares like the number, string and string[] converters do"""
+    OPS = {
+        '==': operator.eq, '!=': operator.ne, '>': operator.gt, '<': operator.lt, '>=': operator.ge,
+        '<=': operator.le, 'in': lambda a, b: a in b, '!in': lambda a, b: a not in b,
+        'contains': lambda a, b: b[0] in a, '!contains': lambda a, b: b[0] not in a,
+    }
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, value):
+        return value
+
+    def supports_compare_op(self, op):
+        if self.name.endswith('[]'):
+            return op in ('contains', '!contains')
+        return op in self.OPS and op not in ('contains', '!contains')
+
+    def compare(self, op, a, b):
+        return self.OPS[op](a, b)
+
+
+class _Field:
+    def __init__(self, name):
+        self.converter = _Converter(name)
+
+
+class _CFields(dict):
+    def __hash__(self):
+        return id(self)
+
+
+MODEL = {'n': _Field('number'), 's': _Field('string'), 'l': _Field('string[]')}
+
+
+def _all_cfields():
+    all_cfields = []
+    for i in range(40):
+        fields = {'n': i % 7, 's': 'abcd'[i % 4], 'l': ('x', 'y', 'z')[i % 3:]}
+        # some cfields miss one of the fields.
+        if i % 5 == 0:
+            del fields['n']
+        if i % 11 == 0:
+            del fields['l']
+        all_cfields.append(_CFields(fields))
+    return all_cfields
+
+
+def _brute_force(node, all_cfields):
+    if isinstance(node, QueryNode):
+        left = _brute_force(node.left, all_cfields)
+        right = _brute_force(node.right, all_cfields)
+        if node.logic_op == '&':
+            return [cfields for cfields in left if cfields in right]
+        return [cfields for cfields in all_cfields if cfields in left or cfields in right]
+    converter = MODEL[node.key].converter
+    matched = []
+    for cfields in all_cfields:
+        value = cfields.get(node.key, None)
+        if value is None:
+            if node.comp_op in ('!=', '!in'):
+                matched.append(cfields)
+        elif converter.compare(node.comp_op, value, node.value):
+            matched.append(cfields)
+    return matched
+
+
+class TestQueryIndexes(unittest.TestCase):
+    def setUp(self):
+        self.all_cfields = _all_cfields()
+        self.query_indexes = QueryIndexes(self.all_cfields)
+
+    def test_bitmaps(self):
+        query_indexes = self.query_indexes
+        self.assertEqual(query_indexes.to_cfields(query_indexes.all_bitmap), self.all_cfields)
+        self.assertEqual(list(query_indexes.iter_ordinals(query_indexes.make_bitmap([0, 9, 39]))), [0, 9, 39])
+        self.assertEqual(query_indexes.make_bitmap([]), 0)
+
+    def test_lookup_and_scan_match_brute_force(self):
+        query_indexes = self.query_indexes
+        sections = [
+            QuerySection('n', '==', 3), QuerySection('n', '!=', 3), QuerySection('n', '>', 2),
+            QuerySection('n', '<=', 4), QuerySection('n', 'in', (1, 5)), QuerySection('n', '!in', (1, 5)),
+            QuerySection('s', '==', 'b'), QuerySection('s', '!=', 'b'),
+            QuerySection('l', 'contains', ('y',)), QuerySection('l', '!contains', ('y',)),
+        ]
+        for section in sections:
+            converter = MODEL[section.key].converter
+            expected = _brute_force(section, self.all_cfields)
+            looked_up = query_indexes.lookup(section, converter)
+            self.assertIsNotNone(looked_up, section)
+            self.assertEqual(query_indexes.to_cfields(looked_up), expected, section)
+            scanned = query_indexes.scan(section, converter, query_indexes.all_bitmap)
+            self.assertEqual(query_indexes.to_cfields(scanned), expected, section)
+
+    def test_sorted_ordinals_match_sorted(self):
+        query_indexes = self.query_indexes
+        converter = MODEL['n'].converter
+        with_n = query_indexes.make_bitmap(i for i, cfields in enumerate(self.all_cfields) if 'n' in cfields)
+        for reverse in (False, True):
+            ordinals = query_indexes.iter_sorted_ordinals(with_n, 'n', converter, reverse)
+            self.assertEqual(
+                [self.all_cfields[ordinal] for ordinal in ordinals],
+                sorted(query_indexes.to_cfields(with_n), key=lambda cfields: cfields['n'], reverse=reverse)
+            )
+        # cfields without the field are sorted with Nil.
+        self.assertIsNone(query_indexes.iter_sorted_ordinals(query_indexes.all_bitmap, 'n', converter))
+        self.assertIsNone(query_indexes.iter_sorted_ordinals(with_n, 's', MODEL['s'].converter))
+
+
+class TestQueryPlan(unittest.TestCase):
+    def setUp(self):
+        self.all_cfields = _all_cfields()
+
+    def assert_evaluates(self, node):
+        query_indexes = QueryIndexes(self.all_cfields)
+        query_plan = QueryPlan.compile(node, None, MODEL)
+        self.assertEqual(
+            query_indexes.to_cfields(query_plan.evaluate(query_indexes)), _brute_force(node, self.all_cfields)
+        )
+
+    def test_no_conditions(self):
+        query_indexes = QueryIndexes(self.all_cfields)
+        self.assertEqual(query_indexes.to_cfields(QueryPlan.compile(None, None, MODEL).evaluate(query_indexes)),
+                         self.all_cfields)
+
+    def test_nested_nodes_are_evaluated_fully(self):
+        a = QuerySection('n', '==', 1)
+        b = QuerySection('s', '==', 'c')
+        c = QuerySection('l', 'contains', ('x',))
+        d = QuerySection('n', '>', 4)
+        self.assert_evaluates(QueryNode('&', QueryNode('|', a, b), c))
+        self.assert_evaluates(QueryNode('|', a, QueryNode('&', b, c)))
+        self.assert_evaluates(QueryNode('&', QueryNode('|', a, b), QueryNode('|', c, d)))
+        self.assert_evaluates(QueryNode('|', QueryNode('|', a, b), QueryNode('|', c, d)))
+
+    def test_empty_and_short_circuits(self):
+        nothing = QuerySection('n', '==', 100)
+        self.assert_evaluates(QueryNode('&', nothing, QuerySection('s', '!=', 'a')))
+        self.assert_evaluates(QueryNode('|', QuerySection('n', '!=', 100), QuerySection('s', '==', 'a')))
+
+    def test_split_query_window(self):
+        self.assertEqual(split_query_window('a == 1 :sortby n desc :limit 5 :offset 10'),
+                         ('a == 1 :sortby n desc', 5, 10))
+        self.assertEqual(split_query_window(':offset 3'), ('', None, 3))
+        self.assertEqual(split_query_window('a == 1'), ('a == 1', None, 0))
+        for query_str in ('a == 1 :limit 5 :limit 6', 'a == 1 :limit five', 'a == 1 :offset'):
+            with self.assertRaises(InvalidQueryString):
+                split_query_window(query_str)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import unittest
+
+from synamic.exceptions import CircularDependency
+from synamic.core.synamic._dependency_resolver import create_dep_list
+from synamic.core.synamic.sites._site_scheduler import SiteScheduler, site_build_order
+
+
+class _Dependency:
+    def __init__(self, name, dependencies):
+        self.name = name
+        self.dependencies = dependencies
+
+
+class TestSiteScheduler(unittest.TestCase):
+    def test_importable(self):
+        self.assertTrue(callable(SiteScheduler))
+
+    def test_parents_before_children(self):
+        order = site_build_order([('blog', 'en'), ('docs', ), ('blog', )])
+        self.assertEqual(set(order), {(), ('blog', ), ('blog', 'en'), ('docs', )})
+        self.assertEqual(order[0], ())
+        self.assertLess(order.index(('blog', )), order.index(('blog', 'en')))
+
+    def test_circular_dependency(self):
+        with self.assertRaises(CircularDependency):
+            create_dep_list({
+                'a': _Dependency('a', ['b']),
+                'b': _Dependency('b', ['a']),
+                'c': _Dependency('c', []),
+            })
+
+
+if __name__ == '__main__':
+    unittest.main()
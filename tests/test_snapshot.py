@@ -0,0 +1,86 @@
+"""
+    author: "Md. Sabuj Sarker"
+    copyright: "Copyright 2017-2018, The Synamic Project"
+    credits: ["Md. Sabuj Sarker"]
+    license: "MIT"
+    maintainer: "Md. Sabuj Sarker"
+    email: "md.sabuj.sarker@gmail.com"
+    status: "Development"
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from synamic.core.object_managers.fs_object_manager.build_manifest import file_signature
+from synamic.core.object_managers.fs_object_manager.snapshot import changed_input_paths, contents_changed_only
+
+
+class TestPartialRestore(unittest.TestCase):
+    """What decides between restoring a snapshot partially - making only the marked contents again - and loading the
+    site fully"""
+    def setUp(self):
+        self.site_path = tempfile.mkdtemp()
+        self.contents_path = os.path.join(self.site_path, 'contents')
+        self.posts_path = os.path.join(self.contents_path, 'posts')
+        os.makedirs(self.posts_path)
+        for path in ('a.md', 'b.md', os.path.join('posts', 'c.md'), os.path.join('posts', '.meta.syd')):
+            self.write(os.path.join(self.contents_path, path))
+        self.write(os.path.join(self.site_path, 'settings.syd'))
+        # the snapshot was taken long ago - every change made now changes the signatures.
+        paths = [self.site_path]
+        for dir_path, dir_names, file_names in os.walk(self.site_path):
+            paths.extend(os.path.join(dir_path, name) for name in dir_names + file_names)
+        for path in paths:
+            os.utime(path, ns=(0, 0))
+        self.signatures = {path: file_signature(path) for path in paths}
+
+    def tearDown(self):
+        shutil.rmtree(self.site_path)
+
+    @staticmethod
+    def write(path, text='text'):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def assert_partial(self, expected):
+        changed_paths = changed_input_paths(self.signatures)
+        self.assertEqual(contents_changed_only(changed_paths, self.contents_path, ('md', 'markdown')), expected)
+        return changed_paths
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.assert_partial(True), set())
+
+    def test_changed_and_added_contents(self):
+        self.write(os.path.join(self.contents_path, 'a.md'), 'changed text')
+        self.write(os.path.join(self.posts_path, 'd.md'))
+        os.makedirs(os.path.join(self.contents_path, '.hidden'))
+        changed_paths = self.assert_partial(True)
+        self.assertEqual(changed_paths, {
+            self.contents_path, os.path.join(self.contents_path, 'a.md'),
+            self.posts_path, os.path.join(self.posts_path, 'd.md')
+        })
+
+    def test_removed_content(self):
+        os.remove(os.path.join(self.contents_path, 'b.md'))
+        changed_paths = self.assert_partial(True)
+        self.assertEqual(changed_paths, {self.contents_path, os.path.join(self.contents_path, 'b.md')})
+
+    def test_added_dir_meta(self):
+        self.write(os.path.join(self.contents_path, '.meta.syd'))
+        changed_paths = self.assert_partial(False)
+        self.assertIn(os.path.join(self.contents_path, '.meta.syd'), changed_paths)
+
+    def test_changed_dir_meta(self):
+        self.write(os.path.join(self.posts_path, '.meta.syd'), 'changed text')
+        self.assert_partial(False)
+
+    def test_changed_settings(self):
+        self.write(os.path.join(self.site_path, 'settings.syd'), 'changed text')
+        self.assert_partial(False)
+
+
+if __name__ == '__main__':
+    unittest.main()